@@ -1,31 +1,55 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Commonly-used functions and data types from this package."""
+import six
+
 from .compiler import (  # noqa
+    CompilationCache,
+    CompilationInstrumentation,
+    CompilationProfile,
     CompilationResult,
+    DiskCompilationCache,
+    DocumentCache,
     OutputMetadata,
+    SharedMemoryCompilationCache,
     compile_graphql_to_gremlin,
+    compile_graphql_to_languages,
     compile_graphql_to_match,
     compile_graphql_to_sql,
+    compile_many,
+    set_trusted_mode,
+    trusted_mode,
+)
+from .query_formatting import (  # noqa
+    PersistedQueryRegistry, PreparedQuery, insert_arguments_into_query
+)
+from .query_formatting.graphql_formatting import (  # noqa
+    canonicalize_graphql, compute_query_fingerprint, pretty_print_graphql
 )
-from .query_formatting import insert_arguments_into_query  # noqa
-from .query_formatting.graphql_formatting import pretty_print_graphql  # noqa
 from .exceptions import (  # noqa
     GraphQLCompilationError, GraphQLError, GraphQLInvalidArgumentError, GraphQLParsingError,
     GraphQLValidationError
 )
 from .schema import (  # noqa
     DIRECTIVES, EXTENDED_META_FIELD_DEFINITIONS, GraphQLDate, GraphQLDateTime, GraphQLDecimal,
-    insert_meta_fields_into_existing_schema, is_meta_field
+    compute_schema_fingerprint, insert_meta_fields_into_existing_schema, is_meta_field
 )
 from .schema_generation.schema_graph import SchemaGraph
 from .schema_generation.graphql_schema import get_graphql_schema_from_schema_graph
 
 
+if six.PY3:
+    # The asyncio API is only available on Python 3.
+    from .async_api import (  # noqa
+        graphql_to_gremlin_async, graphql_to_match_async, graphql_to_sql_async
+    )
+
+
 __package_name__ = 'graphql-compiler'
 __version__ = '1.10.0'
 
 
-def graphql_to_match(schema, graphql_query, parameters, type_equivalence_hints=None):
+def graphql_to_match(schema, graphql_query, parameters, type_equivalence_hints=None,
+                     compilation_cache=None, instrumentation=None, document_cache=None):
     """Compile the GraphQL input using the schema into a MATCH query and associated metadata.
 
     Args:
@@ -47,6 +71,12 @@ def graphql_to_match(schema, graphql_query, parameters, type_equivalence_hints=N
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compiled query is
+                           looked up in the cache before compiling, and added to it afterward.
+        instrumentation: optional CompilationInstrumentation object, to which the wall time of
+                         each compilation phase and the size of the IR are reported.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in the cache before parsing, and added to it afterward.
 
     Returns:
         a CompilationResult object, containing:
@@ -56,13 +86,16 @@ def graphql_to_match(schema, graphql_query, parameters, type_equivalence_hints=N
             - input_metadata: dict, name of input variables -> inferred GraphQL type, based on use
     """
     compilation_result = compile_graphql_to_match(
-        schema, graphql_query, type_equivalence_hints=type_equivalence_hints)
+        schema, graphql_query, type_equivalence_hints=type_equivalence_hints,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
     return compilation_result._replace(
         query=insert_arguments_into_query(compilation_result, parameters))
 
 
 def graphql_to_sql(schema, graphql_query, parameters, compiler_metadata,
-                   type_equivalence_hints=None):
+                   type_equivalence_hints=None, compilation_cache=None, instrumentation=None,
+                   document_cache=None):
     """Compile the GraphQL input using the schema into a SQL query and associated metadata.
 
     Args:
@@ -86,6 +119,12 @@ def graphql_to_sql(schema, graphql_query, parameters, compiler_metadata,
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compiled query is
+                           looked up in the cache before compiling, and added to it afterward.
+        instrumentation: optional CompilationInstrumentation object, to which the wall time of
+                         each compilation phase and the size of the IR are reported.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in the cache before parsing, and added to it afterward.
 
     Returns:
         a CompilationResult object, containing:
@@ -95,12 +134,15 @@ def graphql_to_sql(schema, graphql_query, parameters, compiler_metadata,
             - input_metadata: dict, name of input variables -> inferred GraphQL type, based on use
     """
     compilation_result = compile_graphql_to_sql(
-        schema, graphql_query, compiler_metadata, type_equivalence_hints=type_equivalence_hints)
+        schema, graphql_query, compiler_metadata, type_equivalence_hints=type_equivalence_hints,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
     return compilation_result._replace(
         query=insert_arguments_into_query(compilation_result, parameters))
 
 
-def graphql_to_gremlin(schema, graphql_query, parameters, type_equivalence_hints=None):
+def graphql_to_gremlin(schema, graphql_query, parameters, type_equivalence_hints=None,
+                       compilation_cache=None, instrumentation=None, document_cache=None):
     """Compile the GraphQL input using the schema into a Gremlin query and associated metadata.
 
     Args:
@@ -122,6 +164,12 @@ def graphql_to_gremlin(schema, graphql_query, parameters, type_equivalence_hints
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compiled query is
+                           looked up in the cache before compiling, and added to it afterward.
+        instrumentation: optional CompilationInstrumentation object, to which the wall time of
+                         each compilation phase and the size of the IR are reported.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in the cache before parsing, and added to it afterward.
 
     Returns:
         a CompilationResult object, containing:
@@ -131,7 +179,9 @@ def graphql_to_gremlin(schema, graphql_query, parameters, type_equivalence_hints
             - input_metadata: dict, name of input variables -> inferred GraphQL type, based on use
     """
     compilation_result = compile_graphql_to_gremlin(
-        schema, graphql_query, type_equivalence_hints=type_equivalence_hints)
+        schema, graphql_query, type_equivalence_hints=type_equivalence_hints,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
     return compilation_result._replace(
         query=insert_arguments_into_query(compilation_result, parameters))
 
@@ -0,0 +1,179 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Compile GraphQL queries from asyncio code without blocking the event loop.
+
+This module requires Python 3, and is only imported by the package on Python 3. Its functions
+return awaitable asyncio Future objects rather than being coroutine functions, so that the module
+remains valid Python 2 syntax, e.g. when the package is byte-compiled on installation.
+"""
+import asyncio
+
+from .compiler import (
+    GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE, compile_graphql_to_gremlin,
+    compile_graphql_to_match, compile_graphql_to_sql
+)
+from .compiler.common import _compile_single_flight, _look_up_compilation, get_compilation_cache_key
+from .compiler.trusted_mode import is_trusted_mode_enabled, trusted_mode
+from .query_formatting import insert_arguments_into_query
+
+
+def _compile_and_bind_async(language, compile_func, schema, graphql_query, parameters,
+                            compiler_metadata, type_equivalence_hints, compilation_cache,
+                            instrumentation, executor, loop):
+    """Return a Future of the query compiled by compile_func, with the parameters inserted into it.
+
+    Args:
+        language: string, the language to which compile_func compiles queries
+        compile_func: function compiling the query without a compilation cache, taking the schema
+                      and query string as positional arguments, and the type equivalence hints
+                      and instrumentation as keyword arguments
+        schema: GraphQL schema object describing the schema of the graph to be queried
+        graphql_query: the GraphQL query to compile, as a string
+        parameters: dict, mapping argument name to its value, for every parameter the query expects.
+        compiler_metadata: optional target specific metadata, part of the compilation cache key
+        type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+        compilation_cache: optional compilation cache object, looked up on the event loop
+        instrumentation: optional CompilationInstrumentation object
+        executor: optional concurrent.futures.Executor in which to compile queries that are not
+                  found in the compilation cache. If None, the loop's default executor is used.
+        loop: optional asyncio event loop. If None, the current event loop is used.
+
+    Returns:
+        asyncio Future of a CompilationResult, whose query has the parameters inserted into it
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    result_future = asyncio.Future(loop=loop)
+
+    def bind_parameters(compilation_result):
+        """Insert the parameters into the compiled query, and resolve the result future with it."""
+        try:
+            bound_query = insert_arguments_into_query(compilation_result, parameters)
+        except Exception as e:  # pylint: disable=broad-except
+            result_future.set_exception(e)
+        else:
+            result_future.set_result(compilation_result._replace(query=bound_query))
+
+    # Trusted mode is a per-thread setting, so the caller's setting is applied explicitly
+    # in the executor thread that compiles the query.
+    trusted_mode_enabled = is_trusted_mode_enabled()
+
+    def compile_query():
+        """Compile the query without consulting any cache."""
+        with trusted_mode(trusted_mode_enabled):
+            return compile_func(
+                schema, graphql_query, type_equivalence_hints=type_equivalence_hints,
+                instrumentation=instrumentation)
+
+    if compilation_cache is None:
+        compilation_future = loop.run_in_executor(executor, compile_query)
+    else:
+        # Queries that were compiled before do not need to leave the event loop at all.
+        cache_key = get_compilation_cache_key(
+            language, schema, graphql_query, type_equivalence_hints, compiler_metadata)
+        compilation_result, lookup_token = _look_up_compilation(compilation_cache, cache_key)
+        if compilation_result is not None:
+            bind_parameters(compilation_result)
+            return result_future
+
+        def compile_and_store():
+            """Compile the query, and store the result in the cache."""
+            new_compilation_result = compile_query()
+            compilation_cache.put(cache_key, new_compilation_result)
+            return new_compilation_result
+
+        compilation_future = loop.run_in_executor(
+            executor, _compile_single_flight, compilation_cache, cache_key, compile_and_store,
+            lookup_token)
+
+    def on_compilation_done(future):
+        """Resolve the result future with the outcome of the compilation."""
+        if result_future.cancelled():
+            return
+        if future.cancelled():
+            result_future.cancel()
+        elif future.exception() is not None:
+            result_future.set_exception(future.exception())
+        else:
+            bind_parameters(future.result())
+
+    def on_result_done(future):
+        """Cancel the compilation if the result is no longer needed."""
+        if future.cancelled():
+            compilation_future.cancel()
+
+    compilation_future.add_done_callback(on_compilation_done)
+    result_future.add_done_callback(on_result_done)
+    return result_future
+
+
+######
+# Public API
+######
+
+def graphql_to_match_async(schema, graphql_query, parameters, type_equivalence_hints=None,
+                           compilation_cache=None, instrumentation=None,
+                           executor=None, loop=None):
+    """Compile the GraphQL input into a MATCH query in an executor, then insert the parameters.
+
+    Queries found in the compilation cache are not compiled again, and their Future is resolved
+    without leaving the event loop. Cancelling the returned Future cancels the compilation if it
+    has not started yet; a compilation that already started runs to completion in its executor,
+    and its result is still stored in the compilation cache, if any.
+
+    Args:
+        schema: GraphQL schema object describing the schema of the graph to be queried
+        graphql_query: the GraphQL query to compile to MATCH, as a string
+        parameters: dict, mapping argument name to its value, for every parameter the query expects.
+        type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+                                See graphql_to_match() for details.
+        compilation_cache: optional CompilationCache object. It is looked up on the event loop,
+                           so it should not perform slow I/O when looking up entries.
+        instrumentation: optional CompilationInstrumentation object, to which the wall time of
+                         each compilation phase and the size of the IR are reported.
+        executor: optional concurrent.futures.Executor in which to compile the query.
+                  If None, the default executor of the event loop is used.
+        loop: optional asyncio event loop. If None, the current event loop is used.
+
+    Returns:
+        asyncio Future of a CompilationResult object, see graphql_to_match() for details
+    """
+    return _compile_and_bind_async(
+        MATCH_LANGUAGE, compile_graphql_to_match, schema, graphql_query, parameters, None,
+        type_equivalence_hints, compilation_cache, instrumentation, executor, loop)
+
+
+def graphql_to_sql_async(schema, graphql_query, parameters, compiler_metadata,
+                         type_equivalence_hints=None, compilation_cache=None, instrumentation=None,
+                         executor=None, loop=None):
+    """Compile the GraphQL input into a SQL query in an executor, then insert the parameters.
+
+    See graphql_to_match_async() for details on caching, cancellation and the arguments,
+    and graphql_to_sql() for details on the compiler metadata.
+
+    Returns:
+        asyncio Future of a CompilationResult object, see graphql_to_sql() for details
+    """
+    def compile_to_sql(schema, graphql_query, type_equivalence_hints=None, instrumentation=None):
+        """Compile the GraphQL input into a SQL query, using the given compiler metadata."""
+        return compile_graphql_to_sql(
+            schema, graphql_query, compiler_metadata,
+            type_equivalence_hints=type_equivalence_hints, instrumentation=instrumentation)
+
+    return _compile_and_bind_async(
+        SQL_LANGUAGE, compile_to_sql, schema, graphql_query, parameters, compiler_metadata,
+        type_equivalence_hints, compilation_cache, instrumentation, executor, loop)
+
+
+def graphql_to_gremlin_async(schema, graphql_query, parameters, type_equivalence_hints=None,
+                             compilation_cache=None, instrumentation=None,
+                             executor=None, loop=None):
+    """Compile the GraphQL input into a Gremlin query in an executor, then insert the parameters.
+
+    See graphql_to_match_async() for details on caching, cancellation and the arguments.
+
+    Returns:
+        asyncio Future of a CompilationResult object, see graphql_to_gremlin() for details
+    """
+    return _compile_and_bind_async(
+        GREMLIN_LANGUAGE, compile_graphql_to_gremlin, schema, graphql_query, parameters, None,
+        type_equivalence_hints, compilation_cache, instrumentation, executor, loop)
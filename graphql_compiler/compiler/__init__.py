@@ -1,9 +1,19 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 from .common import (  # noqa
+    CompilationCache,
+    CompilationCacheStats,
     CompilationResult,
     compile_graphql_to_gremlin,
+    compile_graphql_to_languages,
     compile_graphql_to_match,
     compile_graphql_to_sql,
 )
+from .batch_compilation import BatchCompilationResult, compile_many  # noqa
 from .common import GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE  # noqa
-from .compiler_frontend import OutputMetadata  # noqa
+from .compiler_frontend import DocumentCache, OutputMetadata, parse_and_validate_graphql  # noqa
+from .disk_cache import DiskCompilationCache  # noqa
+from .instrumentation import CompilationInstrumentation, CompilationProfile  # noqa
+from .serialization import deserialize_compilation_result, serialize_compilation_result  # noqa
+from .shared_memory_cache import SharedMemoryCompilationCache  # noqa
+from .trusted_mode import is_trusted_mode_enabled, set_trusted_mode, trusted_mode  # noqa
+from .validation import COMPILER_VALIDATION_RULES  # noqa
@@ -0,0 +1,175 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Compile many GraphQL queries in parallel, using a pool of worker processes."""
+from collections import namedtuple
+import multiprocessing
+import pickle
+
+from graphql.language.parser import parse
+from graphql.utils.build_ast_schema import build_ast_schema
+from graphql.utils.schema_printer import print_schema
+import six
+
+from .common import (
+    GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE, compile_graphql_to_gremlin,
+    compile_graphql_to_match, compile_graphql_to_sql
+)
+from .serialization import deserialize_compilation_result, serialize_compilation_result
+
+
+# The BatchCompilationResult will have the following types for its members:
+# - compilation_result: CompilationResult object, or None if the query failed to compile
+# - error: the exception raised while compiling the query, or None if compilation succeeded
+BatchCompilationResult = namedtuple('BatchCompilationResult', ('compilation_result', 'error'))
+
+_COMPILATION_FUNCTIONS = {
+    MATCH_LANGUAGE: compile_graphql_to_match,
+    GREMLIN_LANGUAGE: compile_graphql_to_gremlin,
+}
+
+# Number of chunks of queries handed to each worker process. More than one chunk per worker
+# evens out the load when some queries take much longer to compile than others.
+_CHUNKS_PER_WORKER = 4
+
+# The schema, type equivalence hints and language used by the current worker process,
+# set by _initialize_worker() when the worker starts.
+_worker_state = {}
+
+
+def _get_type_equivalence_hint_names(type_equivalence_hints):
+    """Return a picklable representation of the type equivalence hints, using type names."""
+    if not type_equivalence_hints:
+        return None
+
+    return {
+        key.name: value.name
+        for key, value in six.iteritems(type_equivalence_hints)
+    }
+
+
+def _initialize_worker(schema_text, type_equivalence_hint_names, language):
+    """Rebuild the schema and type equivalence hints in the worker process from their names."""
+    schema = build_ast_schema(parse(schema_text))
+
+    type_equivalence_hints = None
+    if type_equivalence_hint_names is not None:
+        type_equivalence_hints = {
+            schema.get_type(key_name): schema.get_type(value_name)
+            for key_name, value_name in six.iteritems(type_equivalence_hint_names)
+        }
+
+    _worker_state['schema'] = schema
+    _worker_state['type_equivalence_hints'] = type_equivalence_hints
+    _worker_state['compilation_function'] = _COMPILATION_FUNCTIONS[language]
+
+
+def _make_picklable_error(error):
+    """Return the exception if it can be sent to the parent process, or a substitute otherwise."""
+    try:
+        pickle.dumps(error)
+    except Exception:  # pylint: disable=broad-except
+        return RuntimeError(u'{}: {}'.format(type(error).__name__, error))
+    return error
+
+
+def _compile_in_worker(graphql_string):
+    """Compile the query in a worker process, returning (serialized result, error)."""
+    try:
+        compilation_result = _worker_state['compilation_function'](
+            _worker_state['schema'], graphql_string,
+            type_equivalence_hints=_worker_state['type_equivalence_hints'])
+    except Exception as e:  # pylint: disable=broad-except
+        return None, _make_picklable_error(e)
+
+    return serialize_compilation_result(compilation_result), None
+
+
+def _compile_serially(schema, graphql_strings, language, type_equivalence_hints,
+                      compiler_metadata):
+    """Compile the queries one at a time in the current process."""
+    results = []
+    for graphql_string in graphql_strings:
+        try:
+            if language == SQL_LANGUAGE:
+                compilation_result = compile_graphql_to_sql(
+                    schema, graphql_string, compiler_metadata,
+                    type_equivalence_hints=type_equivalence_hints)
+            else:
+                compilation_result = _COMPILATION_FUNCTIONS[language](
+                    schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+        except Exception as e:  # pylint: disable=broad-except
+            results.append(BatchCompilationResult(compilation_result=None, error=e))
+        else:
+            results.append(BatchCompilationResult(compilation_result=compilation_result,
+                                                  error=None))
+    return results
+
+
+######
+# Public API
+######
+
+def compile_many(schema, graphql_strings, language, workers=None, type_equivalence_hints=None,
+                 compiler_metadata=None):
+    """Compile each of the GraphQL queries, distributing the work over a pool of processes.
+
+    The schema and type equivalence hints are sent to each worker process once, when the worker
+    is started, rather than once per query. Since GraphQL schema objects cannot be pickled,
+    each worker rebuilds the schema from its printed definition. The compiled queries are then
+    sent back to the calling process, where the types in their metadata are resolved against
+    the given schema object.
+
+    SQL queries are SQLAlchemy objects bound to the compiler metadata, and cannot be sent
+    between processes. They are therefore always compiled serially in the calling process.
+
+    Args:
+        schema: GraphQL schema object describing the schema of the graph to be queried
+        graphql_strings: iterable of GraphQL query strings to compile
+        language: string, the language to compile to: MATCH_LANGUAGE, GREMLIN_LANGUAGE or
+                  SQL_LANGUAGE
+        workers: optional positive int, the number of worker processes to use. Defaults to
+                 the number of CPUs. If 1, the queries are compiled in the calling process.
+        type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+                                See compile_graphql_to_match() for details.
+        compiler_metadata: SQLAlchemy metadata containing tables for use during compilation.
+                           Required for, and only used by, SQL compilation.
+
+    Returns:
+        list of BatchCompilationResult namedtuples, one per query and in the same order as
+        the queries. Each holds either the CompilationResult of the query, or the exception
+        that was raised when compiling it.
+    """
+    if language not in _COMPILATION_FUNCTIONS and language != SQL_LANGUAGE:
+        raise AssertionError(u'Unrecognized language: {}'.format(language))
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if not isinstance(workers, six.integer_types) or workers < 1:
+        raise ValueError(u'Expected workers to be a positive integer, got: {}'.format(workers))
+
+    graphql_strings = list(graphql_strings)
+    workers = min(workers, len(graphql_strings))
+    if workers <= 1 or language == SQL_LANGUAGE:
+        return _compile_serially(
+            schema, graphql_strings, language, type_equivalence_hints, compiler_metadata)
+
+    initializer_args = (
+        print_schema(schema), _get_type_equivalence_hint_names(type_equivalence_hints), language)
+    chunk_size = max(1, len(graphql_strings) // (workers * _CHUNKS_PER_WORKER))
+
+    pool = multiprocessing.Pool(
+        processes=workers, initializer=_initialize_worker, initargs=initializer_args)
+    try:
+        worker_results = pool.map(_compile_in_worker, graphql_strings, chunk_size)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+    results = []
+    for serialized_compilation_result, error in worker_results:
+        compilation_result = None
+        if serialized_compilation_result is not None:
+            compilation_result = deserialize_compilation_result(
+                schema, serialized_compilation_result)
+        results.append(BatchCompilationResult(compilation_result=compilation_result, error=error))
+    return results
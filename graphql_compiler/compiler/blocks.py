@@ -43,7 +43,7 @@ class QueryRoot(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         if len(self.start_class) == 1:
             # The official Gremlin documentation claims that this approach
             # is generally faster than the one below, since it makes using indexes easier.
@@ -146,7 +146,7 @@ class ConstructResult(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
 
         template = (
             u'transform{{'
@@ -187,7 +187,7 @@ class Filter(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         return u'filter{{it, m -> {}}}'.format(self.predicate.to_gremlin())
 
 
@@ -215,7 +215,7 @@ class MarkLocation(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         mark_name, _ = self.location.get_location_name()
         return u'as({})'.format(safe_quoted_string(mark_name))
 
@@ -270,7 +270,7 @@ class Traverse(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         if self.optional:
             # Optional edges have to be handled differently than non-optionals, since the compiler
             # provides the guarantee that properties read from an optional, non-existing location
@@ -349,7 +349,7 @@ class Recurse(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         template = 'copySplit({recurse}).exhaustMerge'
         recurse_base = '_()'
         recurse_traversal = '.{direction}(\'{edge_name}\')'.format(
@@ -401,7 +401,7 @@ class Backtrack(BasicBlock):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this BasicBlock."""
-        self.validate()
+        self.revalidate()
         if self.optional:
             operation = u'optional'
         else:
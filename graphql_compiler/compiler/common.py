@@ -1,10 +1,18 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 from collections import namedtuple
+from functools import partial
+import sys
+import threading
+
+import six
 
 from . import (
     emit_gremlin, emit_match, emit_sql, ir_lowering_gremlin, ir_lowering_match, ir_lowering_sql
 )
+from ..schema import compute_schema_fingerprint
 from .compiler_frontend import graphql_to_ir
+from .instrumentation import EMIT_PHASE, LOWERING_PHASE, get_current_time
+from .lru_cache import CompilationCacheStats, LruCache  # noqa
 
 
 # The CompilationResult will have the following types for its members:
@@ -19,8 +27,136 @@ MATCH_LANGUAGE = 'MATCH'
 GREMLIN_LANGUAGE = 'Gremlin'
 SQL_LANGUAGE = 'SQL'
 
+# Target language -> (function lowering the IR, function emitting the query from the lowered IR)
+_BACKEND_FUNCTIONS = {
+    MATCH_LANGUAGE: (ir_lowering_match.lower_ir, emit_match.emit_code_from_ir),
+    GREMLIN_LANGUAGE: (ir_lowering_gremlin.lower_ir, emit_gremlin.emit_code_from_ir),
+    SQL_LANGUAGE: (ir_lowering_sql.lower_ir, emit_sql.emit_code_from_ir),
+}
+
+
+class CompilationCache(LruCache):
+    """A thread-safe, size-bounded LRU cache of CompilationResult objects.
+
+    Compiling a query involves parsing, validation, IR generation and lowering, and the result
+    depends only on the schema, the query string, the type equivalence hints, the target language
+    and the compiler metadata. Passing a CompilationCache to any of the compile_graphql_to_*
+    functions allows that work to be performed once per distinct query, rather than once per call.
+
+    The cached CompilationResult objects are shared between all callers that hit the same entry,
+    and therefore must not be mutated.
+    """
+
+
+class _InFlightCompilation(object):
+    """A compilation in progress, whose outcome is shared with all threads waiting for it."""
+
+    def __init__(self):
+        """Create a new _InFlightCompilation that has not finished yet."""
+        self.finished = threading.Event()
+        self.compilation_result = None
+        self.exc_info = None  # the sys.exc_info() tuple, if the compilation raised an error
+
+
+# (id of the compilation cache, cache key) -> _InFlightCompilation, for all compilations
+# currently in progress in any thread. The cache is alive for as long as its compilations are
+# in flight, so its id cannot be reused by another cache in the meantime.
+_in_flight_compilations = {}
+_in_flight_compilations_lock = threading.Lock()
+
+# The number of in-flight compilations that have finished so far, in any thread and for any cache.
+# Only modified while holding _in_flight_compilations_lock, after the result was stored.
+_finished_compilation_count = 0
+
+
+def _look_up_compilation(compilation_cache, cache_key):
+    """Look up the cache key in the cache, in preparation for a _compile_single_flight() call.
+
+    Args:
+        compilation_cache: the cache object in which to look up the cache key
+        cache_key: tuple, the key of the compilation, as returned by get_compilation_cache_key()
+
+    Returns:
+        tuple (cached CompilationResult or None if the key was not found, int lookup token).
+        If the key was not found, the lookup token must be passed to _compile_single_flight().
+    """
+    lookup_token = _finished_compilation_count
+    return compilation_cache.get(cache_key), lookup_token
+
+
+def _compile_single_flight(compilation_cache, cache_key, compile_func, lookup_token):
+    """Return the result of compile_func(), sharing a single call among concurrent callers.
+
+    If another thread is already compiling the same cache key for the same cache, wait for it to
+    finish, and return its CompilationResult or raise its error, instead of compiling again.
+    This prevents a burst of identical queries from all being compiled at the same time.
+
+    Args:
+        compilation_cache: the cache object in which compile_func() stores its result
+        cache_key: tuple, the key of the compilation, as returned by get_compilation_cache_key()
+        compile_func: function with no arguments, that compiles the query, stores it
+                      in the cache and returns the CompilationResult
+        lookup_token: int, the token returned by the _look_up_compilation() call that found
+                      the cache key to be missing from the cache
+
+    Returns:
+        a CompilationResult object
+    """
+    global _finished_compilation_count  # pylint: disable=global-statement
+
+    in_flight_key = (id(compilation_cache), cache_key)
+    with _in_flight_compilations_lock:
+        in_flight_compilation = _in_flight_compilations.get(in_flight_key, None)
+        is_leader = in_flight_compilation is None
+        if is_leader:
+            in_flight_compilation = _InFlightCompilation()
+            _in_flight_compilations[in_flight_key] = in_flight_compilation
+
+        # Another compilation of the same key may have stored its result and finished between
+        # the cache lookup and now. Looking the key up again is only needed in that case,
+        # so that a single miss is recorded in the cache statistics otherwise.
+        may_have_been_compiled = lookup_token != _finished_compilation_count
+
+    if not is_leader:
+        in_flight_compilation.finished.wait()
+        if in_flight_compilation.exc_info is not None:
+            six.reraise(*in_flight_compilation.exc_info)
+        return in_flight_compilation.compilation_result
+
+    try:
+        compilation_result = None
+        if may_have_been_compiled:
+            compilation_result = compilation_cache.get(cache_key)
+        if compilation_result is None:
+            compilation_result = compile_func()
+        in_flight_compilation.compilation_result = compilation_result
+    except BaseException:  # pylint: disable=broad-except
+        # Waiting threads must not be left without a result, even if the compilation was
+        # interrupted by an exception that is not an error, such as KeyboardInterrupt.
+        in_flight_compilation.exc_info = sys.exc_info()
+        raise
+    finally:
+        with _in_flight_compilations_lock:
+            del _in_flight_compilations[in_flight_key]
+            _finished_compilation_count += 1
+        in_flight_compilation.finished.set()
+
+    return in_flight_compilation.compilation_result
+
+
+def get_compilation_cache_key(language, schema, graphql_string,
+                              type_equivalence_hints, compiler_metadata):
+    """Return a hashable key uniquely identifying the compilation with the given inputs."""
+    schema_fingerprint = compute_schema_fingerprint(
+        schema, type_equivalence_hints=type_equivalence_hints)
 
-def compile_graphql_to_match(schema, graphql_string, type_equivalence_hints=None):
+    # The compiler metadata object is hashed by identity. Keeping a reference to it
+    # in the key ensures that its identity cannot be reused while the cache entry is alive.
+    return (language, schema_fingerprint, graphql_string, compiler_metadata)
+
+
+def compile_graphql_to_match(schema, graphql_string, type_equivalence_hints=None,
+                             compilation_cache=None, instrumentation=None, document_cache=None):
     """Compile the GraphQL input using the schema into a MATCH query and associated metadata.
 
     Args:
@@ -41,6 +177,16 @@ def compile_graphql_to_match(schema, graphql_string, type_equivalence_hints=None
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compilation result
+                           is looked up in the cache, and is only computed and added to the cache
+                           if it was not already present. Concurrent calls that miss the cache
+                           for the same query wait for, and share, a single compilation.
+        instrumentation: optional CompilationInstrumentation object. If provided, the wall time
+                         of each compilation phase and the size of the IR are reported to it.
+                         Nothing is reported if the result is found in the compilation cache.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in it and added to it, so that queries that are not
+                        in the compilation cache need not be parsed and validated again.
 
     Returns:
         a CompilationResult object
@@ -50,10 +196,14 @@ def compile_graphql_to_match(schema, graphql_string, type_equivalence_hints=None
 
     return _compile_graphql_generic(
         MATCH_LANGUAGE, lowering_func, query_emitter_func,
-        schema, graphql_string, type_equivalence_hints, None)
+        schema, graphql_string, type_equivalence_hints, None,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
 
 
-def compile_graphql_to_gremlin(schema, graphql_string, type_equivalence_hints=None):
+def compile_graphql_to_gremlin(schema, graphql_string, type_equivalence_hints=None,
+                               compilation_cache=None, instrumentation=None,
+                               document_cache=None):
     """Compile the GraphQL input using the schema into a Gremlin query and associated metadata.
 
     Args:
@@ -74,6 +224,16 @@ def compile_graphql_to_gremlin(schema, graphql_string, type_equivalence_hints=No
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compilation result
+                           is looked up in the cache, and is only computed and added to the cache
+                           if it was not already present. Concurrent calls that miss the cache
+                           for the same query wait for, and share, a single compilation.
+        instrumentation: optional CompilationInstrumentation object. If provided, the wall time
+                         of each compilation phase and the size of the IR are reported to it.
+                         Nothing is reported if the result is found in the compilation cache.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in it and added to it, so that queries that are not
+                        in the compilation cache need not be parsed and validated again.
 
     Returns:
         a CompilationResult object
@@ -83,10 +243,13 @@ def compile_graphql_to_gremlin(schema, graphql_string, type_equivalence_hints=No
 
     return _compile_graphql_generic(
         GREMLIN_LANGUAGE, lowering_func, query_emitter_func,
-        schema, graphql_string, type_equivalence_hints, None)
+        schema, graphql_string, type_equivalence_hints, None,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
 
 
-def compile_graphql_to_sql(schema, graphql_string, compiler_metadata, type_equivalence_hints=None):
+def compile_graphql_to_sql(schema, graphql_string, compiler_metadata, type_equivalence_hints=None,
+                           compilation_cache=None, instrumentation=None, document_cache=None):
     """Compile the GraphQL input using the schema into a SQL query and associated metadata.
 
     Args:
@@ -108,6 +271,16 @@ def compile_graphql_to_sql(schema, graphql_string, compiler_metadata, type_equiv
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        compilation_cache: optional CompilationCache object. If provided, the compilation result
+                           is looked up in the cache, and is only computed and added to the cache
+                           if it was not already present. Concurrent calls that miss the cache
+                           for the same query wait for, and share, a single compilation.
+        instrumentation: optional CompilationInstrumentation object. If provided, the wall time
+                         of each compilation phase and the size of the IR are reported to it.
+                         Nothing is reported if the result is found in the compilation cache.
+        document_cache: optional DocumentCache object. If provided, the parsed and validated
+                        query is looked up in it and added to it, so that queries that are not
+                        in the compilation cache need not be parsed and validated again.
 
     Returns:
         a CompilationResult object
@@ -116,11 +289,96 @@ def compile_graphql_to_sql(schema, graphql_string, compiler_metadata, type_equiv
     query_emitter_func = emit_sql.emit_code_from_ir
     return _compile_graphql_generic(
         SQL_LANGUAGE, lowering_func, query_emitter_func,
-        schema, graphql_string, type_equivalence_hints, compiler_metadata)
+        schema, graphql_string, type_equivalence_hints, compiler_metadata,
+        compilation_cache=compilation_cache, instrumentation=instrumentation,
+        document_cache=document_cache)
+
+
+def compile_graphql_to_languages(schema, graphql_string, languages, type_equivalence_hints=None,
+                                 compiler_metadata=None, compilation_cache=None,
+                                 instrumentation=None, document_cache=None):
+    """Compile the GraphQL input into a query for each of the given languages.
+
+    The query is parsed, validated and converted to IR only once, and the same IR and metadata
+    are then lowered and emitted for each language. This is cheaper than calling
+    the compile_graphql_to_* function of each language, which would each repeat that work.
+
+    Args:
+        schema: GraphQL schema object describing the schema of the graph to be queried
+        graphql_string: the GraphQL query to compile, as a string
+        languages: iterable of languages to compile the query to, any of MATCH_LANGUAGE,
+                   GREMLIN_LANGUAGE and SQL_LANGUAGE
+        type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+                                See compile_graphql_to_match() for details.
+        compiler_metadata: SQLAlchemy metadata containing tables for use during compilation.
+                           Required for, and only used by, SQL compilation.
+        compilation_cache: optional CompilationCache object. If provided, the compilation result
+                           for each language is looked up in the cache, and the query is only
+                           compiled for the languages that were not already present. Concurrent
+                           compilations of the same query and language, through this function
+                           or the compile_graphql_to_* functions, are shared as described in
+                           _compile_single_flight().
+        instrumentation: optional CompilationInstrumentation object. If provided, the wall time
+                         of each compilation phase and the size of the IR are reported to it.
+                         The lowering and emit phases are reported once per compiled language.
+        document_cache: optional DocumentCache object, used to look up and store the parsed and
+                        validated query.
+
+    Returns:
+        dict, language -> CompilationResult object, for each of the given languages
+    """
+    languages = tuple(languages)
+    unsupported_languages = set(languages) - set(six.iterkeys(_BACKEND_FUNCTIONS))
+    if unsupported_languages:
+        raise AssertionError(u'Unrecognized languages: {}'.format(unsupported_languages))
+
+    # The IrAndMetadata of the query, computed only once and only if some language is compiled.
+    computed_ir_and_metadata = []
+
+    def compile_language(language, language_compiler_metadata):
+        """Lower and emit the query in the given language, computing its IR on first use."""
+        if not computed_ir_and_metadata:
+            computed_ir_and_metadata.append(graphql_to_ir(
+                schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+                instrumentation=instrumentation, document_cache=document_cache))
+
+        lowering_func, query_emitter_func = _BACKEND_FUNCTIONS[language]
+        return _lower_and_emit(
+            language, lowering_func, query_emitter_func, computed_ir_and_metadata[0],
+            type_equivalence_hints, language_compiler_metadata, instrumentation=instrumentation)
+
+    def compile_and_store(language, language_compiler_metadata, cache_key):
+        """Compile the query to the given language, and store the result in the cache."""
+        compilation_result = compile_language(language, language_compiler_metadata)
+        compilation_cache.put(cache_key, compilation_result)
+        return compilation_result
+
+    compilation_results = {}
+    for language in languages:
+        language_compiler_metadata = compiler_metadata if language == SQL_LANGUAGE else None
+        if compilation_cache is None:
+            compilation_results[language] = compile_language(
+                language, language_compiler_metadata)
+            continue
+
+        cache_key = get_compilation_cache_key(
+            language, schema, graphql_string, type_equivalence_hints, language_compiler_metadata)
+        compilation_result, lookup_token = _look_up_compilation(compilation_cache, cache_key)
+        if compilation_result is None:
+            # As in _compile_graphql_generic(), concurrent misses on the same key wait for
+            # a single compilation of it, whether it was started by this function or not.
+            compilation_result = _compile_single_flight(
+                compilation_cache, cache_key,
+                partial(compile_and_store, language, language_compiler_metadata, cache_key),
+                lookup_token)
+        compilation_results[language] = compilation_result
+
+    return compilation_results
 
 
 def _compile_graphql_generic(language, lowering_func, query_emitter_func,
-                             schema, graphql_string, type_equivalence_hints, compiler_metadata):
+                             schema, graphql_string, type_equivalence_hints, compiler_metadata,
+                             compilation_cache=None, instrumentation=None, document_cache=None):
     """Compile the GraphQL input, lowering and emitting the query using the given functions.
 
     Args:
@@ -132,19 +390,84 @@ def _compile_graphql_generic(language, lowering_func, query_emitter_func,
         graphql_string: the GraphQL query to compile to the target language, as a string.
         type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
         compiler_metadata: optional target specific metadata for usage by the query_emitter_func.
+        compilation_cache: optional CompilationCache object, used to look up and store the result.
+        instrumentation: optional CompilationInstrumentation object, to which the measurements
+                         of each compilation phase are reported.
+        document_cache: optional DocumentCache object, used to look up and store the parsed and
+                        validated query.
 
     Returns:
         a CompilationResult object
     """
+    if compilation_cache is None:
+        return _compile_graphql_uncached(
+            language, lowering_func, query_emitter_func,
+            schema, graphql_string, type_equivalence_hints, compiler_metadata,
+            instrumentation=instrumentation, document_cache=document_cache)
+
+    cache_key = get_compilation_cache_key(
+        language, schema, graphql_string, type_equivalence_hints, compiler_metadata)
+    compilation_result, lookup_token = _look_up_compilation(compilation_cache, cache_key)
+    if compilation_result is None:
+        def compile_and_store():
+            """Compile the query, and store the result in the cache."""
+            new_compilation_result = _compile_graphql_uncached(
+                language, lowering_func, query_emitter_func,
+                schema, graphql_string, type_equivalence_hints, compiler_metadata,
+                instrumentation=instrumentation, document_cache=document_cache)
+            compilation_cache.put(cache_key, new_compilation_result)
+            return new_compilation_result
+
+        # Concurrent misses on the same key wait for a single compilation, rather than each
+        # compiling the query. Their instrumentation receives no measurements in that case.
+        compilation_result = _compile_single_flight(
+            compilation_cache, cache_key, compile_and_store, lookup_token)
+
+    return compilation_result
+
+
+def _compile_graphql_uncached(language, lowering_func, query_emitter_func,
+                              schema, graphql_string, type_equivalence_hints, compiler_metadata,
+                              instrumentation=None, document_cache=None):
+    """Compile the GraphQL input without consulting the compilation cache.
+
+    See _compile_graphql_generic() for details.
+    """
     ir_and_metadata = graphql_to_ir(
-        schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+        schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+        instrumentation=instrumentation, document_cache=document_cache)
+
+    return _lower_and_emit(
+        language, lowering_func, query_emitter_func, ir_and_metadata,
+        type_equivalence_hints, compiler_metadata, instrumentation=instrumentation)
+
+
+def _lower_and_emit(language, lowering_func, query_emitter_func, ir_and_metadata,
+                    type_equivalence_hints, compiler_metadata, instrumentation=None):
+    """Lower the IR and emit the query in the target language, returning a CompilationResult.
 
+    The IR blocks and QueryMetadataTable in ir_and_metadata are not modified, so the same
+    IrAndMetadata may be lowered and emitted for several target languages.
+    """
+    if instrumentation is not None:
+        phase_start_time = get_current_time()
+
+    # The lowering functions only ever build new lists of IR blocks, but each target language
+    # receives its own copy of the list so that no lowering can affect another one.
     lowered_ir_blocks = lowering_func(
-        ir_and_metadata.ir_blocks, ir_and_metadata.query_metadata_table,
-        type_equivalence_hints=type_equivalence_hints)
+        list(ir_and_metadata.ir_blocks), ir_and_metadata.query_metadata_table,
+        type_equivalence_hints=type_equivalence_hints, instrumentation=instrumentation)
+
+    if instrumentation is not None:
+        phase_end_time = get_current_time()
+        instrumentation.record_phase_time(LOWERING_PHASE, phase_end_time - phase_start_time)
+        phase_start_time = phase_end_time
 
     query = query_emitter_func(lowered_ir_blocks, compiler_metadata)
 
+    if instrumentation is not None:
+        instrumentation.record_phase_time(EMIT_PHASE, get_current_time() - phase_start_time)
+
     return CompilationResult(
         query=query,
         language=language,
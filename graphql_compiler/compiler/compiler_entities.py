@@ -6,24 +6,66 @@ from abc import ABCMeta, abstractmethod
 from graphql import is_type
 import six
 
+from .trusted_mode import is_trusted_mode_enabled
+
+
+def _get_structural_hash(value):
+    """Return a hash of the value that is equal for all values that CompilerEntity considers equal.
+
+    CompilerEntity arguments may be lists, dicts and sets, which are not hashable, as well as
+    GraphQL types, which are compared with is_same_type() rather than with "==".
+    """
+    if isinstance(value, CompilerEntity):
+        return hash(value)
+    elif isinstance(value, (list, tuple)):
+        return hash(tuple(_get_structural_hash(element) for element in value))
+    elif isinstance(value, dict):
+        return hash(frozenset(
+            (key, _get_structural_hash(element))
+            for key, element in six.iteritems(value)
+        ))
+    elif isinstance(value, (set, frozenset)):
+        return hash(frozenset(_get_structural_hash(element) for element in value))
+    elif is_type(value):
+        # GraphQL types are the same if they have the same wrappers around the same named type,
+        # which is exactly when they have the same string representation.
+        return hash(six.text_type(value))
+    else:
+        return hash(value)
+
 
 @six.python_2_unicode_compatible
 @six.add_metaclass(ABCMeta)
 class CompilerEntity(object):
-    """An abstract compiler entity. Can represent things like basic blocks and expressions."""
+    """An abstract compiler entity. Can represent things like basic blocks and expressions.
+
+    CompilerEntity objects are never mutated after they are constructed. Their structural hash
+    is therefore computed at most once, which makes them usable as set members and dict keys,
+    and allows most unequal objects to be told apart without comparing their arguments.
+    """
 
-    __slots__ = ('_print_args', '_print_kwargs')
+    __slots__ = ('_print_args', '_print_kwargs', '_hash')
 
     def __init__(self, *args, **kwargs):
         """Construct a new CompilerEntity."""
         self._print_args = args
         self._print_kwargs = kwargs
+        self._hash = None
 
     @abstractmethod
     def validate(self):
         """Ensure that the CompilerEntity is valid."""
         raise NotImplementedError()
 
+    def revalidate(self):
+        """Validate the already-constructed CompilerEntity again, unless in trusted mode.
+
+        Constructors validate their arguments, so this only catches compiler bugs that produced
+        an invalid entity anyway. It is called right before the entity is used to emit query code.
+        """
+        if not is_trusted_mode_enabled():
+            self.validate()
+
     def __str__(self):
         """Return a human-readable unicode representation of this CompilerEntity."""
         printed_args = []
@@ -44,9 +86,15 @@ class CompilerEntity(object):
     # pylint: disable=protected-access
     def __eq__(self, other):
         """Return True if the CompilerEntity objects are equal, and False otherwise."""
+        if self is other:
+            return True
+
         if type(self) != type(other):
             return False
 
+        if hash(self) != hash(other):
+            return False
+
         if len(self._print_args) != len(other._print_args):
             return False
 
@@ -67,6 +115,16 @@ class CompilerEntity(object):
         """Check another object for non-equality against this one."""
         return not self.__eq__(other)
 
+    def __hash__(self):
+        """Return the structural hash of the CompilerEntity, computing it on first use."""
+        if self._hash is None:
+            self._hash = hash((
+                type(self),
+                _get_structural_hash(self._print_args),
+                _get_structural_hash(self._print_kwargs),
+            ))
+        return self._hash
+
     @abstractmethod
     def to_gremlin(self):
         """Return the Gremlin unicode string representation of this object."""
@@ -70,7 +70,7 @@ import six
 
 from . import blocks, expressions
 from ..exceptions import GraphQLCompilationError, GraphQLParsingError, GraphQLValidationError
-from ..schema import COUNT_META_FIELD_NAME, DIRECTIVES
+from ..schema import COUNT_META_FIELD_NAME, DIRECTIVES, compute_schema_fingerprint
 from .context_helpers import (
     get_context_fold_info, get_optional_scope_or_none, has_encountered_output_source,
     has_fold_count_filter, is_in_fold_innermost_scope, is_in_fold_scope, is_in_optional_scope,
@@ -90,6 +90,10 @@ from .helpers import (
     get_vertex_field_type, invert_dict, is_tag_argument, is_vertex_field_name,
     strip_non_null_from_type, validate_output_name, validate_safe_string
 )
+from .instrumentation import (
+    IR_BLOCK_COUNT, IR_GENERATION_PHASE, PARSE_PHASE, VALIDATION_PHASE, get_current_time
+)
+from .lru_cache import LruCache
 from .metadata import LocationInfo, QueryMetadataTable, RecurseInfo, TagInfo
 
 
@@ -919,7 +923,7 @@ def _preprocess_graphql_string(graphql_string):
     return graphql_string + '\n'
 
 
-def _validate_schema_and_ast(schema, ast):
+def _validate_schema_and_ast(schema, ast, validation_rules=None):
     """Validate the supplied graphql schema and ast.
 
     This method wraps around graphql-core's validation to enforce a stricter requirement of the
@@ -929,11 +933,17 @@ def _validate_schema_and_ast(schema, ast):
     Args:
         schema: GraphQL schema object, created using the GraphQL library
         ast: abstract syntax tree representation of a graphql query
+        validation_rules: optional sequence of graphql-core validation rule classes with which
+                          to validate the query, such as COMPILER_VALIDATION_RULES. If None,
+                          all of graphql-core's validation rules are used.
 
     Returns:
         list containing schema and/or query validation errors
     """
-    core_graphql_errors = validate(schema, ast)
+    if validation_rules is None:
+        core_graphql_errors = validate(schema, ast)
+    else:
+        core_graphql_errors = validate(schema, ast, rules=validation_rules)
 
     # The following directives appear in the core-graphql library, but are not supported by the
     # graphql compiler.
@@ -995,12 +1005,96 @@ def _validate_schema_and_ast(schema, ast):
 
     return core_graphql_errors
 
+
+def _parse_and_validate_uncached(schema, graphql_string, validation_rules, instrumentation):
+    """Parse the GraphQL string and validate it, without consulting any cache."""
+    # When instrumentation is disabled, no timers are read, so that it costs nothing.
+    if instrumentation is not None:
+        phase_start_time = get_current_time()
+
+    try:
+        ast = parse(_preprocess_graphql_string(graphql_string))
+    except GraphQLSyntaxError as e:
+        raise GraphQLParsingError(e)
+
+    if instrumentation is not None:
+        phase_end_time = get_current_time()
+        instrumentation.record_phase_time(PARSE_PHASE, phase_end_time - phase_start_time)
+        phase_start_time = phase_end_time
+
+    validation_errors = _validate_schema_and_ast(schema, ast, validation_rules=validation_rules)
+
+    if instrumentation is not None:
+        instrumentation.record_phase_time(VALIDATION_PHASE, get_current_time() - phase_start_time)
+
+    if validation_errors:
+        raise GraphQLValidationError(u'String does not validate: {}'.format(validation_errors))
+
+    return ast
+
+
 ##############
 # Public API #
 ##############
 
 
-def graphql_to_ir(schema, graphql_string, type_equivalence_hints=None):
+class DocumentCache(LruCache):
+    """A thread-safe, size-bounded LRU cache of parsed and validated GraphQL query documents.
+
+    Parsing and validating a query often takes most of the time spent compiling a small query.
+    The outcome only depends on the schema and the query string, and not on the target language
+    or the type equivalence hints, so a DocumentCache can save that work even when the query
+    is compiled to multiple languages. Only documents that passed validation are cached.
+
+    The cached documents are shared between all callers that hit the same entry,
+    and therefore must not be mutated.
+    """
+
+
+def parse_and_validate_graphql(schema, graphql_string, document_cache=None, instrumentation=None,
+                               validation_rules=None):
+    """Parse the GraphQL string, and validate it against the schema.
+
+    Args:
+        schema: GraphQL schema object, created using the GraphQL library
+        graphql_string: string containing the GraphQL query
+        document_cache: optional DocumentCache object. If provided, the document is looked up in
+                        the cache, and is only parsed, validated and added to the cache
+                        if it was not already present.
+        instrumentation: optional CompilationInstrumentation object, to which the time spent
+                         parsing and validating is reported. Nothing is reported if the document
+                         is found in the cache.
+        validation_rules: optional sequence of graphql-core validation rule classes with which
+                          to validate the query. COMPILER_VALIDATION_RULES validates the query
+                          faster than the default, which uses all of graphql-core's rules.
+
+    Returns:
+        graphql-core Document AST of the query, suitable as the validated_document argument
+        of graphql_to_ir() for the same schema
+
+    Raises:
+        - GraphQLParsingError if the query is invalid GraphQL;
+        - GraphQLValidationError if the query or schema does not validate.
+    """
+    if validation_rules is not None:
+        validation_rules = tuple(validation_rules)
+
+    if document_cache is None:
+        return _parse_and_validate_uncached(
+            schema, graphql_string, validation_rules, instrumentation)
+
+    cache_key = (compute_schema_fingerprint(schema), graphql_string, validation_rules)
+    ast = document_cache.get(cache_key)
+    if ast is None:
+        ast = _parse_and_validate_uncached(
+            schema, graphql_string, validation_rules, instrumentation)
+        document_cache.put(cache_key, ast)
+
+    return ast
+
+
+def graphql_to_ir(schema, graphql_string, type_equivalence_hints=None, instrumentation=None,
+                  document_cache=None, validated_document=None, validation_rules=None):
     """Convert the given GraphQL string into compiler IR, using the given schema object.
 
     Args:
@@ -1021,6 +1115,19 @@ def graphql_to_ir(schema, graphql_string, type_equivalence_hints=None):
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        instrumentation: optional CompilationInstrumentation object, to which the time spent
+                         parsing, validating and generating IR, as well as the number of
+                         generated IR blocks, are reported
+        document_cache: optional DocumentCache object, used to look up and store the parsed and
+                        validated query instead of parsing and validating it every time
+        validated_document: optional graphql-core Document AST of the query, which has already
+                            been validated against the schema, e.g. as returned by
+                            parse_and_validate_graphql(). If provided, parsing and validation are
+                            skipped entirely, and graphql_string is only used in error messages.
+        validation_rules: optional sequence of graphql-core validation rule classes with which
+                          to validate the query. COMPILER_VALIDATION_RULES validates the query
+                          faster than the default, which uses all of graphql-core's rules, and
+                          rejects the same queries once combined with the compiler's own checks.
 
     Returns:
         IrAndMetadata named tuple, containing fields:
@@ -1040,20 +1147,28 @@ def graphql_to_ir(schema, graphql_string, type_equivalence_hints=None):
 
     In the case of implementation bugs, could also raise ValueError, TypeError, or AssertionError.
     """
-    graphql_string = _preprocess_graphql_string(graphql_string)
-    try:
-        ast = parse(graphql_string)
-    except GraphQLSyntaxError as e:
-        raise GraphQLParsingError(e)
-
-    validation_errors = _validate_schema_and_ast(schema, ast)
+    if validated_document is None:
+        ast = parse_and_validate_graphql(
+            schema, graphql_string, document_cache=document_cache,
+            instrumentation=instrumentation, validation_rules=validation_rules)
+    else:
+        ast = validated_document
 
-    if validation_errors:
-        raise GraphQLValidationError(u'String does not validate: {}'.format(validation_errors))
+    # When instrumentation is disabled, no timers are read, so that it costs nothing.
+    if instrumentation is not None:
+        phase_start_time = get_current_time()
 
     if len(ast.definitions) != 1:
         raise AssertionError(u'Unsupported graphql string with multiple definitions, should have '
                              u'been caught in validation: \n{}\n{}'.format(graphql_string, ast))
     base_ast = ast.definitions[0]
 
-    return _compile_root_ast_to_ir(schema, base_ast, type_equivalence_hints=type_equivalence_hints)
+    ir_and_metadata = _compile_root_ast_to_ir(
+        schema, base_ast, type_equivalence_hints=type_equivalence_hints)
+
+    if instrumentation is not None:
+        instrumentation.record_phase_time(
+            IR_GENERATION_PHASE, get_current_time() - phase_start_time)
+        instrumentation.record_count(IR_BLOCK_COUNT, len(ir_and_metadata.ir_blocks))
+
+    return ir_and_metadata
@@ -0,0 +1,198 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Persistent cache of compiled queries, stored as files in a directory on disk."""
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from .common import CompilationCache, CompilationCacheStats
+from .serialization import (
+    SERIALIZABLE_LANGUAGES, deserialize_compilation_result, serialize_compilation_result
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Version of the format of cache entry files. Must be incremented whenever the format changes,
+# so that entries written in an older format are treated as stale rather than misread.
+_CACHE_ENTRY_FORMAT_VERSION = 1
+
+_CACHE_ENTRY_FILE_SUFFIX = '.json'
+
+# os.rename() does not overwrite existing files on Windows, but os.replace() does not exist in py2.
+_replace_file = getattr(os, 'replace', os.rename)
+
+
+def get_compiler_version():
+    """Return the version of the compiler package that is compiling queries."""
+    # Imported here since the package's __init__ imports this module's package.
+    from .. import __version__
+    return __version__
+
+
+def get_persistent_cache_entry_key(cache_key):
+    """Return a JSON-compatible key for storing the compilation outside of the current process.
+
+    Args:
+        cache_key: tuple, the compilation cache key returned by get_compilation_cache_key()
+
+    Returns:
+        list of strings identifying the compilation across processes and compiler versions,
+        or None if the compilation result cannot be serialized, as is the case for SQL
+    """
+    language, schema_fingerprint, graphql_string, _ = cache_key
+    if language not in SERIALIZABLE_LANGUAGES:
+        return None
+
+    return [get_compiler_version(), language, schema_fingerprint, graphql_string]
+
+
+class DiskCompilationCache(object):
+    """A cache of CompilationResult objects that persists across processes and restarts.
+
+    Each compiled MATCH or Gremlin query is stored in its own file in the cache directory, keyed by
+    the schema fingerprint, the compiler version, the target language and the query text. New
+    processes can therefore load queries compiled by other processes, rather than recompiling them.
+    SQL queries are SQLAlchemy objects that cannot be stored on disk, and are never cached.
+
+    The types in the metadata of the stored queries are resolved against the schema given to the
+    cache, so the cache may only be used to compile queries against that schema. Entry files that
+    are unreadable, corrupt or that do not match their key are ignored, so that the query is
+    compiled again and the entry is overwritten. Entries are written atomically, so multiple
+    processes may share the same cache directory.
+
+    Recently used entries are also kept in memory, to avoid reading the same file repeatedly.
+    """
+
+    def __init__(self, directory, schema, max_memory_size=1000):
+        """Create a new DiskCompilationCache, creating the directory if it does not exist.
+
+        Args:
+            directory: string, path to the directory in which to store the cache entries
+            schema: GraphQL schema object, the schema against which all cached queries are compiled
+            max_memory_size: positive int, the number of recently used entries kept in memory
+        """
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        self._directory = directory
+        self._schema = schema
+        self._memory_cache = CompilationCache(max_size=max_memory_size)
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _get_entry_key(self, cache_key):
+        """Return the JSON-compatible key identifying the entry, or None if it cannot be stored."""
+        persistent_cache_entry_key = get_persistent_cache_entry_key(cache_key)
+        if persistent_cache_entry_key is None:
+            return None
+
+        return [_CACHE_ENTRY_FORMAT_VERSION] + persistent_cache_entry_key
+
+    def _get_entry_path(self, entry_key):
+        """Return the path of the file that stores the entry with the given key."""
+        entry_key_digest = hashlib.sha256(
+            json.dumps(entry_key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, entry_key_digest + _CACHE_ENTRY_FILE_SUFFIX)
+
+    def _load_entry(self, entry_key):
+        """Return the CompilationResult stored under the key, or None if there is no valid entry."""
+        try:
+            with open(self._get_entry_path(entry_key), 'r') as entry_file:
+                entry = json.load(entry_file)
+
+            # The stored key guards against stale entries and hash collisions.
+            if entry['key'] != entry_key:
+                return None
+            return deserialize_compilation_result(self._schema, entry['compilation_result'])
+        except (IOError, OSError, ValueError, KeyError, TypeError, AssertionError):
+            # Missing, unreadable or corrupt entries all cause the query to be recompiled.
+            return None
+
+    def _store_entry(self, entry_key, compilation_result):
+        """Atomically write the CompilationResult to the file for the given key."""
+        entry = {
+            'key': entry_key,
+            'compilation_result': serialize_compilation_result(compilation_result),
+        }
+
+        # Write to a temporary file first, so that other processes never read a partial entry.
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as entry_file:
+                json.dump(entry, entry_file)
+            _replace_file(temporary_path, self._get_entry_path(entry_key))
+        except BaseException:
+            try:
+                os.remove(temporary_path)
+            except (IOError, OSError):
+                pass  # The original error is more informative, and is raised instead.
+            raise
+
+    def get(self, cache_key):
+        """Return the CompilationResult for the given key, or None if it is not in the cache."""
+        compilation_result = self._memory_cache.get(cache_key)
+        if compilation_result is None:
+            entry_key = self._get_entry_key(cache_key)
+            if entry_key is not None:
+                compilation_result = self._load_entry(entry_key)
+                if compilation_result is not None:
+                    self._memory_cache.put(cache_key, compilation_result)
+
+        with self._lock:
+            if compilation_result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        return compilation_result
+
+    def put(self, cache_key, compilation_result):
+        """Store the CompilationResult under the given key, both in memory and on disk."""
+        entry_key = self._get_entry_key(cache_key)
+        if entry_key is None:
+            return
+
+        self._memory_cache.put(cache_key, compilation_result)
+        try:
+            self._store_entry(entry_key, compilation_result)
+        except (IOError, OSError):
+            # As with entries that cannot be loaded, entries that cannot be stored only cause
+            # the query to be recompiled later, so the compilation itself must not fail.
+            logger.warning(u'Failed to store a compiled query in the disk cache directory %s',
+                           self._directory, exc_info=True)
+
+    def clear(self):
+        """Remove all entries from the cache, both in memory and on disk."""
+        self._memory_cache.clear()
+        for file_name in os.listdir(self._directory):
+            if file_name.endswith(_CACHE_ENTRY_FILE_SUFFIX):
+                os.remove(os.path.join(self._directory, file_name))
+
+    @property
+    def stats(self):
+        """Return a CompilationCacheStats namedtuple describing the cache's usage so far."""
+        with self._lock:
+            return CompilationCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=0,
+                size=len(self),
+                max_size=None)
+
+    def __len__(self):
+        """Return the number of entries currently stored on disk."""
+        return sum(
+            1
+            for file_name in os.listdir(self._directory)
+            if file_name.endswith(_CACHE_ENTRY_FILE_SUFFIX)
+        )
@@ -27,7 +27,7 @@ def _first_step_to_match(match_step):
             raise AssertionError(u'Expected None or QueryRoot root block, received: '
                                  u'{} {}'.format(match_step.root_block, match_step))
 
-        match_step.root_block.validate()
+        match_step.root_block.revalidate()
 
         start_class = get_only_element_from_collection(match_step.root_block.start_class)
         parts.append(u'class: %s' % (start_class,))
@@ -37,14 +37,14 @@ def _first_step_to_match(match_step):
         raise AssertionError(u'Invalid MATCH step: {}'.format(match_step))
 
     if match_step.where_block:
-        match_step.where_block.validate()
+        match_step.where_block.revalidate()
         parts.append(u'where: (%s)' % (match_step.where_block.predicate.to_match(),))
 
     if match_step.as_block is None:
         raise AssertionError(u'Found a MATCH step without a corresponding Location. '
                              u'This should never happen: {}'.format(match_step))
     else:
-        match_step.as_block.validate()
+        match_step.as_block.revalidate()
         parts.append(u'as: %s' % (_get_vertex_location_name(match_step.as_block.location),))
 
     return u'{{ %s }}' % (u', '.join(parts),)
@@ -58,7 +58,7 @@ def _subsequent_step_to_match(match_step):
 
     is_recursing = isinstance(match_step.root_block, Recurse)
 
-    match_step.root_block.validate()
+    match_step.root_block.revalidate()
 
     traversal_command = u'.%s(\'%s\')' % (match_step.root_block.direction,
                                           match_step.root_block.edge_name)
@@ -78,14 +78,14 @@ def _subsequent_step_to_match(match_step):
         parts.append(u'while: ($depth < %d)' % (match_step.root_block.depth,))
 
     if match_step.where_block:
-        match_step.where_block.validate()
+        match_step.where_block.revalidate()
         parts.append(u'where: (%s)' % (match_step.where_block.predicate.to_match(),))
 
     if not is_recursing and match_step.root_block.optional:
         parts.append(u'optional: true')
 
     if match_step.as_block:
-        match_step.as_block.validate()
+        match_step.as_block.revalidate()
         parts.append(u'as: %s' % (_get_vertex_location_name(match_step.as_block.location),))
 
     return u'%s {{ %s }}' % (traversal_command, u', '.join(parts))
@@ -149,7 +149,7 @@ def _represent_fold(fold_location, fold_ir_blocks):
 
 def _construct_output_to_match(output_block):
     """Transform a ConstructResult block into a MATCH query string."""
-    output_block.validate()
+    output_block.revalidate()
 
     selections = (
         u'%s AS `%s`' % (output_block.fields[key].to_match(), key)
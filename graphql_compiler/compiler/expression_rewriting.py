@@ -0,0 +1,140 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Apply many expression rewrite rules to IR blocks, in a single traversal of each expression.
+
+Many lowering passes each rewrite a few kinds of expression nodes, and leave all others as-is.
+Running each of them as its own visit_and_update_expressions() pass walks every Filter and
+ConstructResult expression tree once per pass. An ExpressionRewriter instead applies all of its
+rules during one bottom-up traversal, dispatching each expression node only to the rules
+registered for its type.
+"""
+from collections import namedtuple
+
+
+# An ExpressionRewriteRule rewrites expressions of some types, and leaves all others unchanged:
+# - name: string, describing the rewriting the rule performs
+# - expression_types: tuple of Expression classes to which the rule applies, including subclasses
+# - function: function taking an expression of one of the expression_types, and returning
+#             the exact same expression object if it does not need rewriting, or its replacement
+# - block_types: tuple of BasicBlock classes, such that the rule only applies to the expressions
+#                within blocks of those classes, or None if it applies within blocks of any class
+ExpressionRewriteRule = namedtuple(
+    'ExpressionRewriteRule', ('name', 'expression_types', 'function', 'block_types'))
+
+# Rewriters are often created for a single query, e.g. with rules that use its metadata, so the
+# tables choosing the rules to apply to each expression are shared between all rewriters
+# whose rules apply to the same types. Each table is a dict of BasicBlock class -> dict of
+# Expression class -> tuple of indices of the rules applying to that expression and block class,
+# filled in lazily as blocks and expressions of each class are encountered.
+_DISPATCH_TABLES = dict()  # tuple of (expression_types, block_types) of each rule -> table
+
+
+class ExpressionRewriter(object):
+    """Rewrite the expressions within IR blocks according to a sequence of rules.
+
+    The children of each expression are rewritten before the expression itself. Each expression
+    is then passed through every applicable rule, in the order in which the rules were given,
+    so that rules see the rewritten output of all rules before them. If a rule replaces the
+    expression with one of a different type, the following rules are chosen based on the new type.
+
+    Unless fixed_point is set, each rule is applied at most once to each expression, and rules
+    are not applied to the new expressions that appear within a replacement. Rewriting with
+    multiple rules is then equivalent to rewriting with each rule in turn, as long as no rule
+    creates an expression that a rule before it would have rewritten.
+    """
+
+    def __init__(self, rules, fixed_point=False):
+        """Create a new ExpressionRewriter applying the given rules.
+
+        Args:
+            rules: iterable of ExpressionRewriteRule objects, to be applied in order
+            fixed_point: bool, whether to keep rewriting the replacement of each expression,
+                         including all expressions nested within it, until no rule changes it.
+                         The rules must then be guaranteed to stop rewriting at some point.
+        """
+        self._rules = tuple(rules)
+        self._rule_functions = tuple(rule.function for rule in self._rules)
+        self._fixed_point = fixed_point
+
+        rule_types = tuple((rule.expression_types, rule.block_types) for rule in self._rules)
+        self._dispatch_table = _DISPATCH_TABLES.setdefault(rule_types, dict())
+
+    @property
+    def rules(self):
+        """Return the tuple of ExpressionRewriteRule objects the rewriter applies, in order."""
+        return self._rules
+
+    def _get_rule_indices(self, expression_rule_indices, block_type, expression_type):
+        """Return the indices of the rules applying to the expression type within the block type."""
+        rule_indices = tuple(
+            rule_index
+            for rule_index, rule in enumerate(self._rules)
+            if issubclass(expression_type, rule.expression_types) and (
+                rule.block_types is None or issubclass(block_type, rule.block_types))
+        )
+        expression_rule_indices[expression_type] = rule_indices
+        return rule_indices
+
+    def _apply_rules(self, expression, rule_indices, expression_rule_indices, block_type):
+        """Apply the rules to the expression, starting with the given rule indices."""
+        next_rule_index = 0
+        rule_applied = True
+        while rule_applied:
+            rule_applied = False
+            for rule_index in rule_indices:
+                if rule_index < next_rule_index:
+                    continue
+
+                next_rule_index = rule_index + 1
+                new_expression = self._rule_functions[rule_index](expression)
+                if new_expression is not expression:
+                    # The rules to apply next depend on the type of the new expression.
+                    expression = new_expression
+                    rule_applied = True
+                    rule_indices = expression_rule_indices.get(type(expression), None)
+                    if rule_indices is None:
+                        rule_indices = self._get_rule_indices(
+                            expression_rule_indices, block_type, type(expression))
+                    break
+
+        return expression
+
+    def _make_visitor_fn(self, block_type):
+        """Return a visitor function applying the rules to expressions within the block type."""
+        expression_rule_indices = self._dispatch_table.get(block_type, None)
+        if expression_rule_indices is None:
+            expression_rule_indices = self._dispatch_table.setdefault(block_type, dict())
+
+        def visitor_fn(expression):
+            """Apply each applicable rule to the expression, in order."""
+            rule_indices = expression_rule_indices.get(type(expression), None)
+            if rule_indices is None:
+                rule_indices = self._get_rule_indices(
+                    expression_rule_indices, block_type, type(expression))
+            if not rule_indices:
+                return expression
+
+            new_expression = self._apply_rules(
+                expression, rule_indices, expression_rule_indices, block_type)
+            if self._fixed_point and new_expression is not expression:
+                # Rewrite the replacement from the bottom up, starting again from the first rule.
+                return new_expression.visit_and_update(visitor_fn)
+            return new_expression
+
+        return visitor_fn
+
+    def rewrite_block(self, block):
+        """Return the block with its expressions rewritten, or the same block if none changed."""
+        return block.visit_and_update_expressions(self._make_visitor_fn(type(block)))
+
+    def rewrite_blocks(self, ir_blocks):
+        """Return a new list of IR blocks, with the expressions within each block rewritten."""
+        visitor_fns = dict()  # BasicBlock class -> visitor function for blocks of that class
+        new_ir_blocks = []
+        for block in ir_blocks:
+            block_type = type(block)
+            visitor_fn = visitor_fns.get(block_type, None)
+            if visitor_fn is None:
+                visitor_fn = self._make_visitor_fn(block_type)
+                visitor_fns[block_type] = visitor_fn
+            new_ir_blocks.append(block.visit_and_update_expressions(visitor_fn))
+        return new_ir_blocks
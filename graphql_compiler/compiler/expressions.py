@@ -97,7 +97,7 @@ class Literal(Expression):
     def _to_output_code(self):
         """Return a unicode object with the Gremlin/MATCH representation of this Literal."""
         # All supported Literal objects serialize to identical strings both in Gremlin and MATCH.
-        self.validate()
+        self.revalidate()
         if self.value is None:
             return u'null'
         elif self.value is True:
@@ -184,7 +184,7 @@ class Variable(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this Variable."""
-        self.validate()
+        self.revalidate()
 
         # We don't want the dollar sign as part of the variable name.
         variable_with_no_dollar_sign = self.variable_name[1:]
@@ -215,18 +215,6 @@ class Variable(Expression):
         else:
             return six.text_type(self.variable_name)
 
-    def __eq__(self, other):
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (type(self) == type(other) and
-                self.variable_name == other.variable_name and
-                self.inferred_type.is_same_type(other.inferred_type))
-
-    def __ne__(self, other):
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class LocalField(Expression):
     """A field at the current position in the query."""
@@ -249,12 +237,12 @@ class LocalField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this LocalField."""
-        self.validate()
+        self.revalidate()
         return six.text_type(self.field_name)
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         local_object_name = self.get_local_object_gremlin_name()
 
@@ -301,7 +289,7 @@ class GlobalContextField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this GlobalContextField."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
         validate_safe_string(mark_name)
@@ -349,7 +337,7 @@ class ContextField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this ContextField."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
         validate_safe_string(mark_name)
@@ -362,7 +350,7 @@ class ContextField(Expression):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
 
@@ -428,7 +416,7 @@ class OutputContextField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
         validate_safe_string(mark_name)
@@ -444,7 +432,7 @@ class OutputContextField(Expression):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
         validate_safe_string(mark_name)
@@ -467,18 +455,6 @@ class OutputContextField(Expression):
         return template.format(mark_name=mark_name, field_name=field_name,
                                format=format_value)
 
-    def __eq__(self, other):
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (type(self) == type(other) and
-                self.location == other.location and
-                self.field_type.is_same_type(other.field_type))
-
-    def __ne__(self, other):
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class FoldedContextField(Expression):
     """An expression used to output data captured in a @fold scope."""
@@ -531,7 +507,7 @@ class FoldedContextField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.fold_scope_location.get_location_name()
         validate_safe_string(mark_name)
@@ -562,18 +538,6 @@ class FoldedContextField(Expression):
         """Must never be called."""
         raise NotImplementedError()
 
-    def __eq__(self, other):
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (type(self) == type(other) and
-                self.fold_scope_location == other.fold_scope_location and
-                self.field_type.is_same_type(other.field_type))
-
-    def __ne__(self, other):
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class FoldCountContextField(Expression):
     """An expression used to output the number of elements captured in a @fold scope."""
@@ -606,7 +570,7 @@ class FoldCountContextField(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, _ = self.fold_scope_location.get_location_name()
         validate_safe_string(mark_name)
@@ -684,6 +648,7 @@ class UnaryTransformation(Expression):
         super(UnaryTransformation, self).__init__(operator, inner_expression)
         self.operator = operator
         self.inner_expression = inner_expression
+        self.validate()
 
     def validate(self):
         """Validate that the UnaryTransformation is correctly representable."""
@@ -704,7 +669,7 @@ class UnaryTransformation(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this UnaryTransformation."""
-        self.validate()
+        self.revalidate()
 
         translation_table = {
             u'size': u'size()',
@@ -790,7 +755,7 @@ class BinaryComposition(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this BinaryComposition."""
-        self.validate()
+        self.revalidate()
 
         # The MATCH versions of some operators require an inverted order of arguments.
         # pylint: disable=unused-variable
@@ -837,7 +802,7 @@ class BinaryComposition(Expression):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         immediate_operator_format = u'({left} {operator} {right})'
         dotted_operator_format = u'{left}.{operator}({right})'
@@ -917,7 +882,7 @@ class TernaryConditional(Expression):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this TernaryConditional."""
-        self.validate()
+        self.revalidate()
 
         # For MATCH, an additional validation step is needed -- we currently do not support
         # emitting MATCH code for TernaryConditional that contains another TernaryConditional
@@ -946,7 +911,7 @@ class TernaryConditional(Expression):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
         return u'({predicate} ? {if_true} : {if_false})'.format(
             predicate=self.predicate.to_gremlin(),
             if_true=self.if_true.to_gremlin(),
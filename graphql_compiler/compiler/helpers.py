@@ -260,7 +260,23 @@ def get_directive_argument_name(argument):
 @total_ordering
 @six.add_metaclass(ABCMeta)
 class BaseLocation(object):
-    """An abstract location object, describing a location in the GraphQL query."""
+    """An abstract location object, describing a location in the GraphQL query.
+
+    Locations are the keys of most of the dicts used during compilation, so they are immutable,
+    have no per-instance __dict__, and compute their hash only once.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        """Disallow modifying locations, since they are used as dict keys."""
+        raise AttributeError(u'{} objects are immutable, cannot set attribute {}: '
+                             u'{}'.format(type(self).__name__, name, self))
+
+    def __delattr__(self, name):
+        """Disallow modifying locations, since they are used as dict keys."""
+        raise AttributeError(u'{} objects are immutable, cannot delete attribute {}: '
+                             u'{}'.format(type(self).__name__, name, self))
 
     @abstractmethod
     def navigate_to_field(self, field):
@@ -307,6 +323,8 @@ class BaseLocation(object):
 
 @six.python_2_unicode_compatible
 class Location(BaseLocation):
+    __slots__ = ('query_path', 'field', 'visit_counter', '_hash')
+
     def __init__(self, query_path, field=None, visit_counter=1):
         """Create a new Location object.
 
@@ -343,13 +361,15 @@ class Location(BaseLocation):
             raise TypeError(u'Expected field to be None or string, was: '
                             u'{} {}'.format(type(field).__name__, field))
 
-        self.query_path = query_path
-        self.field = field
+        object.__setattr__(self, 'query_path', query_path)
+        object.__setattr__(self, 'field', field)
 
         # A single visit counter is enough, rather than a visit counter per path level,
         # because field names are unique -- one can't be at path 'X' and
         # visit 'Y' in two different ways to generate colliding 'X__Y___1' identifiers.
-        self.visit_counter = visit_counter
+        object.__setattr__(self, 'visit_counter', visit_counter)
+
+        object.__setattr__(self, '_hash', hash((query_path, field, visit_counter)))
 
     def navigate_to_field(self, field):
         """Return a new Location object at the specified field of the current Location's vertex."""
@@ -413,7 +433,10 @@ class Location(BaseLocation):
 
     def __eq__(self, other):
         """Return True if the Locations are equal, and False otherwise."""
+        if self is other:
+            return True
         return (type(self) == type(other) and
+                self._hash == other._hash and
                 self.query_path == other.query_path and
                 self.field == other.field and
                 self.visit_counter == other.visit_counter)
@@ -447,11 +470,17 @@ class Location(BaseLocation):
 
     def __hash__(self):
         """Return the object's hash value."""
-        return hash(self.query_path) ^ hash(self.field) ^ hash(self.visit_counter)
+        return self._hash
+
+    def __reduce__(self):
+        """Return the arguments with which to recreate the Location, e.g. when pickling it."""
+        return (Location, (self.query_path, self.field, self.visit_counter))
 
 
 @six.python_2_unicode_compatible
 class FoldScopeLocation(BaseLocation):
+    __slots__ = ('base_location', 'fold_path', 'field', '_hash')
+
     def __init__(self, base_location, fold_path, field=None):
         """Create a new FoldScopeLocation object. Used to represent the locations of @fold scopes.
 
@@ -483,9 +512,11 @@ class FoldScopeLocation(BaseLocation):
         if not fold_path_is_valid:
             raise ValueError(u'Encountered an invalid fold_path: {}'.format(fold_path))
 
-        self.base_location = base_location
-        self.fold_path = fold_path
-        self.field = field
+        object.__setattr__(self, 'base_location', base_location)
+        object.__setattr__(self, 'fold_path', fold_path)
+        object.__setattr__(self, 'field', field)
+
+        object.__setattr__(self, '_hash', hash((base_location, fold_path, field)))
 
     def get_location_name(self):
         """Return a tuple of a unique name of the location, and the current field name (or None)."""
@@ -548,7 +579,10 @@ class FoldScopeLocation(BaseLocation):
 
     def __eq__(self, other):
         """Return True if the FoldScopeLocations are equal, and False otherwise."""
+        if self is other:
+            return True
         return (type(self) == type(other) and
+                self._hash == other._hash and
                 self.base_location == other.base_location and
                 self.fold_path == other.fold_path and
                 self.field == other.field)
@@ -559,7 +593,11 @@ class FoldScopeLocation(BaseLocation):
 
     def __hash__(self):
         """Return the object's hash value."""
-        return hash(self.base_location) ^ hash(self.fold_path) ^ hash(self.field)
+        return self._hash
+
+    def __reduce__(self):
+        """Return the arguments with which to recreate the FoldScopeLocation, e.g. when pickling."""
+        return (FoldScopeLocation, (self.base_location, self.fold_path, self.field))
 
     def _check_if_object_of_same_type_is_smaller(self, other):
         """Return True if the other object is smaller than self in the total ordering."""
@@ -0,0 +1,106 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Hooks for measuring the time and work spent in each phase of query compilation."""
+from collections import OrderedDict, namedtuple
+from timeit import default_timer
+
+
+# Names of the compilation phases whose wall time is reported to CompilationInstrumentation objects.
+# The sanity checks phase is part of the lowering phase, and is also reported separately.
+PARSE_PHASE = 'parse'
+VALIDATION_PHASE = 'validate'
+IR_GENERATION_PHASE = 'ir_generation'
+SANITY_CHECKS_PHASE = 'sanity_checks'
+LOWERING_PHASE = 'lowering'
+EMIT_PHASE = 'emit'
+
+# Names of the counters reported to CompilationInstrumentation objects:
+# - the number of IR blocks produced by the compiler frontend;
+# - the number of IR blocks remaining after lowering;
+# - the number of MatchQuery subqueries produced when lowering to MATCH.
+IR_BLOCK_COUNT = 'ir_blocks'
+LOWERED_IR_BLOCK_COUNT = 'lowered_ir_blocks'
+MATCH_QUERY_COUNT = 'match_queries'
+
+
+# The LoweringPassMeasurement will have the following types for its members:
+# - name: string, the name of the lowering pass
+# - elapsed_seconds: float, the wall time spent in the pass
+# - ir_size: int, the number of IR blocks in the IR produced by the pass
+# - ir_snapshot: string, the pretty-printed IR produced by the pass, or None if not requested
+LoweringPassMeasurement = namedtuple(
+    'LoweringPassMeasurement', ('name', 'elapsed_seconds', 'ir_size', 'ir_snapshot'))
+
+
+def get_current_time():
+    """Return the current time in seconds, from the most precise wall-clock timer available."""
+    return default_timer()
+
+
+class CompilationInstrumentation(object):
+    """Receives measurements of each phase of the compilation of a query.
+
+    Passing an instrumentation object to any of the compile_graphql_to_* functions causes
+    the compiler to report the wall time spent in each phase of compilation, as well as counters
+    describing the size of the intermediate representation (IR) of the query. Subclasses may
+    override the methods below to forward these measurements to a metrics pipeline.
+
+    Backends whose lowering is organized as a pipeline of named passes (currently MATCH) also
+    report each pass separately. If snapshot_lowering_passes is True, the pretty-printed IR
+    after each pass is reported as well, at a significant cost to compilation time.
+
+    This class ignores all measurements. When no instrumentation object is provided,
+    no measurements are taken at all.
+    """
+
+    snapshot_lowering_passes = False
+
+    def record_phase_time(self, phase_name, elapsed_seconds):
+        """Record the wall time spent in the given compilation phase, in seconds."""
+
+    def record_count(self, counter_name, value):
+        """Record the value of the given counter, measured during compilation."""
+
+    def record_lowering_pass(self, pass_name, elapsed_seconds, ir_size, ir_snapshot):
+        """Record the wall time spent in a lowering pass, and the IR it produced.
+
+        Args:
+            pass_name: string, the name of the lowering pass
+            elapsed_seconds: float, the wall time spent in the pass
+            ir_size: int, the number of IR blocks in the IR produced by the pass
+            ir_snapshot: string, the pretty-printed IR produced by the pass,
+                         or None if snapshot_lowering_passes is False
+        """
+
+
+class CompilationProfile(CompilationInstrumentation):
+    """Instrumentation that keeps all measurements, e.g. for inspecting a slow query by hand.
+
+    Phase times are summed and counter values are overwritten if reported more than once,
+    so a CompilationProfile may be reused across multiple compilations to total their times.
+    """
+
+    def __init__(self, snapshot_lowering_passes=False):
+        """Create a new CompilationProfile with no measurements.
+
+        Args:
+            snapshot_lowering_passes: bool, whether to keep a pretty-printed snapshot of the IR
+                                      produced by each lowering pass, for offline analysis
+        """
+        self.snapshot_lowering_passes = snapshot_lowering_passes
+        self.phase_times = OrderedDict()  # phase name -> total elapsed seconds
+        self.counts = OrderedDict()  # counter name -> most recently reported value
+        self.lowering_passes = []  # LoweringPassMeasurement objects, in the order passes ran
+
+    def record_phase_time(self, phase_name, elapsed_seconds):
+        """Add the wall time spent in the given compilation phase to its total."""
+        self.phase_times[phase_name] = self.phase_times.get(phase_name, 0.0) + elapsed_seconds
+
+    def record_count(self, counter_name, value):
+        """Store the value of the given counter."""
+        self.counts[counter_name] = value
+
+    def record_lowering_pass(self, pass_name, elapsed_seconds, ir_size, ir_snapshot):
+        """Append the measurement of the lowering pass to the list of lowering passes."""
+        self.lowering_passes.append(LoweringPassMeasurement(
+            name=pass_name, elapsed_seconds=elapsed_seconds, ir_size=ir_size,
+            ir_snapshot=ir_snapshot))
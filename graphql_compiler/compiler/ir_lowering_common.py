@@ -5,6 +5,7 @@ import six
 from .blocks import (
     ConstructResult, EndOptional, Filter, Fold, MarkLocation, Recurse, Traverse, Unfold
 )
+from .expression_rewriting import ExpressionRewriter, ExpressionRewriteRule
 from .expressions import (
     BinaryComposition, ContextField, ContextFieldExistence, FalseLiteral, NullLiteral, TrueLiteral
 )
@@ -41,7 +42,7 @@ class OutputContextVertex(ContextField):
 
     def to_match(self):
         """Return a unicode object with the MATCH representation of this expression."""
-        self.validate()
+        self.revalidate()
 
         mark_name, field_name = self.location.get_location_name()
         validate_safe_string(mark_name)
@@ -53,13 +54,10 @@ class OutputContextVertex(ContextField):
         return mark_name
 
 
-def lower_context_field_existence(ir_blocks, query_metadata_table):
-    """Lower ContextFieldExistence expressions into lower-level expressions."""
-    def regular_visitor_fn(expression):
-        """Expression visitor function that rewrites ContextFieldExistence expressions."""
-        if not isinstance(expression, ContextFieldExistence):
-            return expression
-
+def get_context_field_existence_lowering_rules(query_metadata_table):
+    """Return the tuple of ExpressionRewriteRules that lower ContextFieldExistence expressions."""
+    def lower_in_regular_block(expression):
+        """Rewrite a ContextFieldExistence expression, outside of ConstructResult blocks."""
         location_type = query_metadata_table.get_location_info(expression.location).type
 
         # Since this function is only used in blocks that aren't ConstructResult,
@@ -69,11 +67,8 @@ def lower_context_field_existence(ir_blocks, query_metadata_table):
             ContextField(expression.location, location_type),
             NullLiteral)
 
-    def construct_result_visitor_fn(expression):
-        """Expression visitor function that rewrites ContextFieldExistence expressions."""
-        if not isinstance(expression, ContextFieldExistence):
-            return expression
-
+    def lower_in_construct_result(expression):
+        """Rewrite a ContextFieldExistence expression, inside a ConstructResult block."""
         location_type = query_metadata_table.get_location_info(expression.location).type
 
         # Since this function is only used in ConstructResult blocks,
@@ -83,16 +78,75 @@ def lower_context_field_existence(ir_blocks, query_metadata_table):
             OutputContextVertex(expression.location, location_type),
             NullLiteral)
 
-    new_ir_blocks = []
-    for block in ir_blocks:
-        new_block = None
-        if isinstance(block, ConstructResult):
-            new_block = block.visit_and_update_expressions(construct_result_visitor_fn)
-        else:
-            new_block = block.visit_and_update_expressions(regular_visitor_fn)
-        new_ir_blocks.append(new_block)
+    # Filter and ConstructResult are the only blocks that contain expressions.
+    return (
+        ExpressionRewriteRule(u'lower_context_field_existence', (ContextFieldExistence,),
+                              lower_in_regular_block, (Filter,)),
+        ExpressionRewriteRule(u'lower_context_field_existence', (ContextFieldExistence,),
+                              lower_in_construct_result, (ConstructResult,)),
+    )
 
-    return new_ir_blocks
+
+def lower_context_field_existence(ir_blocks, query_metadata_table):
+    """Lower ContextFieldExistence expressions into lower-level expressions."""
+    rewriter = ExpressionRewriter(get_context_field_existence_lowering_rules(query_metadata_table))
+    return rewriter.rewrite_blocks(ir_blocks)
+
+
+def _optimize_boolean_expression_comparison(expression):
+    """Rewrite a BinaryComposition comparing a boolean BinaryComposition to a boolean literal."""
+    operator_inverses = {
+        u'=': u'!=',
+        u'!=': u'=',
+    }
+
+    left_is_binary_composition = isinstance(expression.left, BinaryComposition)
+    right_is_binary_composition = isinstance(expression.right, BinaryComposition)
+
+    if not left_is_binary_composition and not right_is_binary_composition:
+        # Nothing to rewrite, return the expression as-is.
+        return expression
+
+    identity_literal = None  # The boolean literal for which we just use the inner expression.
+    inverse_literal = None  # The boolean literal for which we negate the inner expression.
+    if expression.operator == u'=':
+        identity_literal = TrueLiteral
+        inverse_literal = FalseLiteral
+    elif expression.operator == u'!=':
+        identity_literal = FalseLiteral
+        inverse_literal = TrueLiteral
+    else:
+        return expression
+
+    expression_to_rewrite = None
+    if expression.left == identity_literal and right_is_binary_composition:
+        return expression.right
+    elif expression.right == identity_literal and left_is_binary_composition:
+        return expression.left
+    elif expression.left == inverse_literal and right_is_binary_composition:
+        expression_to_rewrite = expression.right
+    elif expression.right == inverse_literal and left_is_binary_composition:
+        expression_to_rewrite = expression.left
+
+    if expression_to_rewrite is None:
+        # We couldn't find anything to rewrite, return the expression as-is.
+        return expression
+    elif expression_to_rewrite.operator not in operator_inverses:
+        # We can't rewrite the inner expression since we don't know its inverse operator.
+        return expression
+    else:
+        return BinaryComposition(
+            operator_inverses[expression_to_rewrite.operator],
+            expression_to_rewrite.left,
+            expression_to_rewrite.right)
+
+
+BOOLEAN_EXPRESSION_COMPARISON_RULE = ExpressionRewriteRule(
+    u'optimize_boolean_expression_comparisons', (BinaryComposition,),
+    _optimize_boolean_expression_comparison, None)
+
+_BOOLEAN_EXPRESSION_COMPARISON_REWRITER = ExpressionRewriter(
+    (BOOLEAN_EXPRESSION_COMPARISON_RULE,))
 
 
 def optimize_boolean_expression_comparisons(ir_blocks):
@@ -113,62 +167,7 @@ def optimize_boolean_expression_comparisons(ir_blocks):
     Returns:
         a new list of basic block objects, with the optimization applied
     """
-    operator_inverses = {
-        u'=': u'!=',
-        u'!=': u'=',
-    }
-
-    def visitor_fn(expression):
-        """Expression visitor function that performs the above rewriting."""
-        if not isinstance(expression, BinaryComposition):
-            return expression
-
-        left_is_binary_composition = isinstance(expression.left, BinaryComposition)
-        right_is_binary_composition = isinstance(expression.right, BinaryComposition)
-
-        if not left_is_binary_composition and not right_is_binary_composition:
-            # Nothing to rewrite, return the expression as-is.
-            return expression
-
-        identity_literal = None  # The boolean literal for which we just use the inner expression.
-        inverse_literal = None  # The boolean literal for which we negate the inner expression.
-        if expression.operator == u'=':
-            identity_literal = TrueLiteral
-            inverse_literal = FalseLiteral
-        elif expression.operator == u'!=':
-            identity_literal = FalseLiteral
-            inverse_literal = TrueLiteral
-        else:
-            return expression
-
-        expression_to_rewrite = None
-        if expression.left == identity_literal and right_is_binary_composition:
-            return expression.right
-        elif expression.right == identity_literal and left_is_binary_composition:
-            return expression.left
-        elif expression.left == inverse_literal and right_is_binary_composition:
-            expression_to_rewrite = expression.right
-        elif expression.right == inverse_literal and left_is_binary_composition:
-            expression_to_rewrite = expression.left
-
-        if expression_to_rewrite is None:
-            # We couldn't find anything to rewrite, return the expression as-is.
-            return expression
-        elif expression_to_rewrite.operator not in operator_inverses:
-            # We can't rewrite the inner expression since we don't know its inverse operator.
-            return expression
-        else:
-            return BinaryComposition(
-                operator_inverses[expression_to_rewrite.operator],
-                expression_to_rewrite.left,
-                expression_to_rewrite.right)
-
-    new_ir_blocks = []
-    for block in ir_blocks:
-        new_block = block.visit_and_update_expressions(visitor_fn)
-        new_ir_blocks.append(new_block)
-
-    return new_ir_blocks
+    return _BOOLEAN_EXPRESSION_COMPARISON_REWRITER.rewrite_blocks(ir_blocks)
 
 
 def extract_folds_from_ir_blocks(ir_blocks):
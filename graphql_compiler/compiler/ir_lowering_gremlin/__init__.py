@@ -1,16 +1,24 @@
 # Copyright 2018-present Kensho Technologies, LLC.
 from .ir_lowering import (lower_coerce_type_block_type_data, lower_coerce_type_blocks,
                           lower_folded_outputs, rewrite_filters_in_optional_blocks)
+from ..expression_rewriting import ExpressionRewriter
+from ..instrumentation import LOWERED_IR_BLOCK_COUNT, SANITY_CHECKS_PHASE, get_current_time
+from ..ir_lowering_common import (  # noqa
+    BOOLEAN_EXPRESSION_COMPARISON_RULE,
+    get_context_field_existence_lowering_rules,
+    lower_context_field_existence, merge_consecutive_filter_clauses,
+    optimize_boolean_expression_comparisons)
 from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
-from ..ir_lowering_common import (lower_context_field_existence, merge_consecutive_filter_clauses,
-                                  optimize_boolean_expression_comparisons)
+from ..lowering_pipeline import (FOLD_FEATURE, OPTIONAL_FEATURE, TYPE_COERCION_FEATURE,
+                                 LoweringPass, get_ir_features, run_lowering_passes)
+from ..trusted_mode import is_trusted_mode_enabled
 
 
 ##############
 # Public API #
 ##############
 
-def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
+def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None, instrumentation=None):
     """Lower the IR into an IR form that can be represented in Gremlin queries.
 
     Args:
@@ -33,21 +41,53 @@ def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        instrumentation: optional CompilationInstrumentation object, to which the time spent
+                         in sanity checks and in each lowering pass, as well as the size of
+                         the IR after each pass, are reported
 
     Returns:
         list of IR blocks suitable for outputting as Gremlin
     """
-    sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table)
+    # In trusted mode, the IR produced by the frontend is assumed to satisfy all its invariants.
+    if not is_trusted_mode_enabled():
+        if instrumentation is not None:
+            sanity_checks_start_time = get_current_time()
 
-    ir_blocks = lower_context_field_existence(ir_blocks, query_metadata_table)
-    ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
+        sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table)
 
-    if type_equivalence_hints:
-        ir_blocks = lower_coerce_type_block_type_data(ir_blocks, type_equivalence_hints)
+        if instrumentation is not None:
+            instrumentation.record_phase_time(
+                SANITY_CHECKS_PHASE, get_current_time() - sanity_checks_start_time)
 
-    ir_blocks = lower_coerce_type_blocks(ir_blocks)
-    ir_blocks = rewrite_filters_in_optional_blocks(ir_blocks)
-    ir_blocks = merge_consecutive_filter_clauses(ir_blocks)
-    ir_blocks = lower_folded_outputs(ir_blocks)
+    ir_features = get_ir_features(query_metadata_table)
+
+    # Before lowering, boolean literals and ContextFieldExistence expressions are only found
+    # within the filters and outputs of data in @optional scopes.
+    expression_rewriter = ExpressionRewriter(
+        get_context_field_existence_lowering_rules(query_metadata_table) + (
+            BOOLEAN_EXPRESSION_COMPARISON_RULE,
+        ))
+
+    lowering_passes = (
+        LoweringPass('rewrite_expressions', expression_rewriter.rewrite_blocks,
+                     {OPTIONAL_FEATURE}),
+        # Not skipped without type coercions, since it also validates the type equivalence hints.
+        LoweringPass('lower_coerce_type_block_type_data', lambda ir_blocks: (
+            lower_coerce_type_block_type_data(ir_blocks, type_equivalence_hints)
+            if type_equivalence_hints else ir_blocks)),
+        LoweringPass('lower_coerce_type_blocks', lower_coerce_type_blocks,
+                     {TYPE_COERCION_FEATURE}),
+        LoweringPass('rewrite_filters_in_optional_blocks', rewrite_filters_in_optional_blocks,
+                     {OPTIONAL_FEATURE}),
+        LoweringPass('merge_consecutive_filter_clauses', merge_consecutive_filter_clauses),
+        LoweringPass('lower_folded_outputs', lower_folded_outputs, {FOLD_FEATURE}),
+    )
+
+    ir_blocks = run_lowering_passes(
+        ir_blocks, lowering_passes, len, instrumentation=instrumentation,
+        ir_features=ir_features)
+
+    if instrumentation is not None:
+        instrumentation.record_count(LOWERED_IR_BLOCK_COUNT, len(ir_blocks))
 
     return ir_blocks
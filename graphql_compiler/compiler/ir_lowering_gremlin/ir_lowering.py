@@ -164,7 +164,7 @@ class GremlinFoldedContextField(Expression):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this expression."""
-        self.validate()
+        self.revalidate()
         edge_direction, edge_name = self.fold_scope_location.get_first_folded_edge()
         validate_safe_string(edge_name)
 
@@ -247,7 +247,7 @@ class GremlinFoldedFilter(Filter):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         return u'findAll{{entry -> {}}}'.format(self.predicate.to_gremlin())
 
 
@@ -265,7 +265,7 @@ class GremlinFoldedTraverse(Traverse):
 
     def to_gremlin(self):
         """Return a unicode object with the Gremlin representation of this block."""
-        self.validate()
+        self.revalidate()
         template_data = {
             'direction': self.direction,
             'edge_name': self.edge_name,
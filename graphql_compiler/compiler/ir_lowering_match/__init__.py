@@ -2,33 +2,81 @@
 import six
 
 from ..blocks import Filter, GlobalOperationsStart
-from ..ir_lowering_common import (extract_optional_location_root_info,
-                                  extract_simple_optional_location_info,
-                                  lower_context_field_existence, merge_consecutive_filter_clauses,
-                                  optimize_boolean_expression_comparisons, remove_end_optionals)
-from .ir_lowering import (lower_backtrack_blocks,
-                          lower_folded_coerce_types_into_filter_blocks,
-                          lower_has_substring_binary_compositions,
-                          remove_backtrack_blocks_from_fold,
-                          rewrite_binary_composition_inside_ternary_conditional,
-                          truncate_repeated_single_step_traversals,
-                          truncate_repeated_single_step_traversals_in_sub_queries)
+from ..expression_rewriting import ExpressionRewriter
+from ..instrumentation import (LOWERED_IR_BLOCK_COUNT, MATCH_QUERY_COUNT, SANITY_CHECKS_PHASE,
+                               get_current_time)
+from ..ir_lowering_common import (  # noqa
+    BOOLEAN_EXPRESSION_COMPARISON_RULE,
+    extract_optional_location_root_info,
+    extract_simple_optional_location_info,
+    get_context_field_existence_lowering_rules,
+    lower_context_field_existence, merge_consecutive_filter_clauses,
+    optimize_boolean_expression_comparisons, remove_end_optionals)
+from .ir_lowering import (  # noqa
+    HAS_SUBSTRING_LOWERING_RULE, TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE,
+    lower_backtrack_blocks,
+    lower_folded_coerce_types_into_filter_blocks,
+    lower_has_substring_binary_compositions,
+    remove_backtrack_blocks_from_fold,
+    rewrite_binary_composition_inside_ternary_conditional,
+    truncate_repeated_single_step_traversals,
+    truncate_repeated_single_step_traversals_in_sub_queries)
 from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
+from ..lowering_pipeline import (FOLD_FEATURE, OPTIONAL_FEATURE, RECURSE_FEATURE, LoweringPass,
+                                 get_ir_features, run_lowering_passes)
 from .between_lowering import lower_comparisons_to_between
 from .optional_traversal import (collect_filters_to_first_location_occurrence,
                                  convert_optional_traversals_to_compound_match_query,
                                  lower_context_field_expressions, prune_non_existent_outputs)
-from ..match_query import convert_to_match_query
+from ..match_query import MatchQuery, convert_to_match_query, count_blocks_in_match_query
+from ..trusted_mode import is_trusted_mode_enabled
 from ..workarounds import (orientdb_class_with_while, orientdb_eval_scheduling,
                            orientdb_query_execution)
-from .utils import construct_where_filter_predicate
+from .utils import CompoundMatchQuery, construct_where_filter_predicate
+
+
+def _add_simple_optional_where_filter(ir_blocks, query_metadata_table, simple_optional_root_info):
+    """Return a copy of the IR blocks, with a WHERE filter for simple @optional traversals."""
+    if len(simple_optional_root_info) == 0:
+        return ir_blocks
+
+    where_filter_predicate = construct_where_filter_predicate(
+        query_metadata_table, simple_optional_root_info)
+    return ir_blocks[:-1] + [GlobalOperationsStart(), Filter(where_filter_predicate)] + [
+        ir_blocks[-1]]
+
+
+def _lower_folds(match_query):
+    """Optimize and lower the IR blocks inside the @fold scopes of the MatchQuery."""
+    new_folds = {
+        key: merge_consecutive_filter_clauses(
+            remove_backtrack_blocks_from_fold(
+                lower_folded_coerce_types_into_filter_blocks(folded_ir_blocks)
+            )
+        )
+        for key, folded_ir_blocks in six.iteritems(match_query.folds)
+    }
+    return match_query._replace(folds=new_folds)
+
+
+def _get_ir_size(ir):
+    """Return the number of IR blocks in the IR, in any of the forms it takes during lowering."""
+    if isinstance(ir, list):
+        return len(ir)
+    elif isinstance(ir, MatchQuery):
+        return count_blocks_in_match_query(ir)
+    elif isinstance(ir, CompoundMatchQuery):
+        return sum(count_blocks_in_match_query(match_query) for match_query in ir.match_queries)
+    else:
+        raise AssertionError(u'Unexpected IR form during MATCH lowering: {}'.format(ir))
+
 
 ##############
 # Public API #
 ##############
 
 
-def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
+def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None, instrumentation=None):
     """Lower the IR into an IR form that can be represented in MATCH queries.
 
     Args:
@@ -51,78 +99,108 @@ def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        instrumentation: optional CompilationInstrumentation object, to which the time spent
+                         in sanity checks and in each lowering pass, as well as the size of
+                         the IR after each pass, are reported
 
     Returns:
         MatchQuery object containing the IR blocks organized in a MATCH-like structure
     """
-    sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table)
+    # In trusted mode, the IR produced by the frontend is assumed to satisfy all its invariants.
+    if not is_trusted_mode_enabled():
+        if instrumentation is not None:
+            sanity_checks_start_time = get_current_time()
 
-    # Construct the mapping of each location to its corresponding GraphQL type.
-    location_types = {
-        location: location_info.type
-        for location, location_info in query_metadata_table.registered_locations
-    }
+        sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table)
 
-    # Compute the set of all locations that have associated type coercions.
-    coerced_locations = {
-        location
-        for location, location_info in query_metadata_table.registered_locations
-        if location_info.coerced_from_type is not None
-    }
+        if instrumentation is not None:
+            instrumentation.record_phase_time(
+                SANITY_CHECKS_PHASE, get_current_time() - sanity_checks_start_time)
+
+    # The mapping of each location to its corresponding GraphQL type,
+    # and the set of all locations that have associated type coercions.
+    location_types = query_metadata_table.location_types
+    coerced_locations = query_metadata_table.coerced_locations
+
+    ir_features = get_ir_features(query_metadata_table)
 
     # Extract information for both simple and complex @optional traverses
-    location_to_optional_results = extract_optional_location_root_info(ir_blocks)
-    complex_optional_roots, location_to_optional_roots = location_to_optional_results
-    simple_optional_root_info = extract_simple_optional_location_info(
-        ir_blocks, complex_optional_roots, location_to_optional_roots)
-    ir_blocks = remove_end_optionals(ir_blocks)
-
-    # Append global operation block(s) to filter out incorrect results
-    # from simple optional match traverses (using a WHERE statement)
-    if len(simple_optional_root_info) > 0:
-        where_filter_predicate = construct_where_filter_predicate(
-            query_metadata_table, simple_optional_root_info)
-        ir_blocks.insert(-1, GlobalOperationsStart())
-        ir_blocks.insert(-1, Filter(where_filter_predicate))
-
-    # These lowering / optimization passes work on IR blocks.
-    ir_blocks = lower_context_field_existence(ir_blocks, query_metadata_table)
-    ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
-    ir_blocks = rewrite_binary_composition_inside_ternary_conditional(ir_blocks)
-    ir_blocks = merge_consecutive_filter_clauses(ir_blocks)
-    ir_blocks = lower_has_substring_binary_compositions(ir_blocks)
-    ir_blocks = orientdb_eval_scheduling.workaround_lowering_pass(ir_blocks, query_metadata_table)
-
-    # Here, we lower from raw IR blocks into a MatchQuery object.
-    # From this point on, the lowering / optimization passes work on the MatchQuery representation.
-    match_query = convert_to_match_query(ir_blocks)
-
-    match_query = lower_comparisons_to_between(match_query)
-
-    match_query = lower_backtrack_blocks(match_query, location_types)
-    match_query = truncate_repeated_single_step_traversals(match_query)
-    match_query = orientdb_class_with_while.workaround_type_coercions_in_recursions(match_query)
-
-    # Optimize and lower the IR blocks inside @fold scopes.
-    new_folds = {
-        key: merge_consecutive_filter_clauses(
-            remove_backtrack_blocks_from_fold(
-                lower_folded_coerce_types_into_filter_blocks(folded_ir_blocks)
-            )
-        )
-        for key, folded_ir_blocks in six.iteritems(match_query.folds)
-    }
-    match_query = match_query._replace(folds=new_folds)
-
-    compound_match_query = convert_optional_traversals_to_compound_match_query(
-        match_query, complex_optional_roots, location_to_optional_roots)
-    compound_match_query = prune_non_existent_outputs(compound_match_query)
-    compound_match_query = collect_filters_to_first_location_occurrence(compound_match_query)
-    compound_match_query = lower_context_field_expressions(compound_match_query)
-
-    compound_match_query = truncate_repeated_single_step_traversals_in_sub_queries(
-        compound_match_query)
-    compound_match_query = orientdb_query_execution.expose_ideal_query_execution_start_points(
-        compound_match_query, location_types, coerced_locations)
+    if OPTIONAL_FEATURE in ir_features:
+        location_to_optional_results = extract_optional_location_root_info(ir_blocks)
+        complex_optional_roots, location_to_optional_roots = location_to_optional_results
+        simple_optional_root_info = extract_simple_optional_location_info(
+            ir_blocks, complex_optional_roots, location_to_optional_roots)
+    else:
+        complex_optional_roots, location_to_optional_roots = [], {}
+        simple_optional_root_info = {}
+
+    expression_rewriter = ExpressionRewriter(
+        get_context_field_existence_lowering_rules(query_metadata_table) + (
+            BOOLEAN_EXPRESSION_COMPARISON_RULE,
+            TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE,
+            HAS_SUBSTRING_LOWERING_RULE,
+        ))
+
+    lowering_passes = (
+        LoweringPass('remove_end_optionals', remove_end_optionals, {OPTIONAL_FEATURE}),
+
+        # Append global operation block(s) to filter out incorrect results
+        # from simple optional match traverses (using a WHERE statement)
+        LoweringPass('add_simple_optional_where_filter', lambda ir_blocks: (
+            _add_simple_optional_where_filter(
+                ir_blocks, query_metadata_table, simple_optional_root_info)),
+            {OPTIONAL_FEATURE}),
+
+        # These lowering / optimization passes work on IR blocks.
+        # All expression-level rewriting is done in a single traversal of each expression.
+        LoweringPass('rewrite_expressions', expression_rewriter.rewrite_blocks),
+        LoweringPass('merge_consecutive_filter_clauses', merge_consecutive_filter_clauses),
+        # TernaryConditional expressions are only created for data within @optional scopes.
+        LoweringPass('orientdb_eval_scheduling', lambda ir_blocks: (
+            orientdb_eval_scheduling.workaround_lowering_pass(ir_blocks, query_metadata_table)),
+            {OPTIONAL_FEATURE}),
+
+        # Here, we lower from raw IR blocks into a MatchQuery object.
+        # From this point on, the lowering / optimization passes work on the MatchQuery
+        # representation.
+        LoweringPass('convert_to_match_query', convert_to_match_query),
+        LoweringPass('lower_comparisons_to_between', lower_comparisons_to_between),
+        LoweringPass('lower_backtrack_blocks', lambda match_query: (
+            lower_backtrack_blocks(match_query, location_types))),
+        LoweringPass('truncate_repeated_single_step_traversals',
+                     truncate_repeated_single_step_traversals),
+        LoweringPass('orientdb_class_with_while',
+                     orientdb_class_with_while.workaround_type_coercions_in_recursions,
+                     {RECURSE_FEATURE}),
+
+        # Optimize and lower the IR blocks inside @fold scopes.
+        LoweringPass('lower_folds', _lower_folds, {FOLD_FEATURE}),
+
+        # Here, we split the MatchQuery into a CompoundMatchQuery, with one MatchQuery
+        # per combination of complex @optional traversals that may or may not exist.
+        LoweringPass('convert_optional_traversals_to_compound_match_query', lambda match_query: (
+            convert_optional_traversals_to_compound_match_query(
+                match_query, complex_optional_roots, location_to_optional_roots))),
+        LoweringPass('prune_non_existent_outputs', prune_non_existent_outputs,
+                     {OPTIONAL_FEATURE}),
+        LoweringPass('collect_filters_to_first_location_occurrence',
+                     collect_filters_to_first_location_occurrence),
+        LoweringPass('lower_context_field_expressions', lower_context_field_expressions,
+                     {OPTIONAL_FEATURE}),
+        LoweringPass('truncate_repeated_single_step_traversals_in_sub_queries',
+                     truncate_repeated_single_step_traversals_in_sub_queries),
+        LoweringPass('orientdb_query_execution', lambda compound_match_query: (
+            orientdb_query_execution.expose_ideal_query_execution_start_points(
+                compound_match_query, location_types, coerced_locations))),
+    )
+
+    compound_match_query = run_lowering_passes(
+        ir_blocks, lowering_passes, _get_ir_size, instrumentation=instrumentation,
+        ir_features=ir_features)
+
+    if instrumentation is not None:
+        match_queries = compound_match_query.match_queries
+        instrumentation.record_count(MATCH_QUERY_COUNT, len(match_queries))
+        instrumentation.record_count(LOWERED_IR_BLOCK_COUNT, _get_ir_size(compound_match_query))
 
     return compound_match_query
@@ -11,6 +11,7 @@ to simplify the final code generation step.
 import six
 
 from ..blocks import Backtrack, CoerceType, MarkLocation, QueryRoot
+from ..expression_rewriting import ExpressionRewriter, ExpressionRewriteRule
 from ..expressions import (
     BinaryComposition, ContextField, ContextFieldExistence, FalseLiteral, FoldedContextField,
     GlobalContextField, Literal, TernaryConditional, TrueLiteral
@@ -24,120 +25,124 @@ from .utils import convert_coerce_type_to_instanceof_filter
 ##################################
 
 
-def rewrite_binary_composition_inside_ternary_conditional(ir_blocks):
-    """Rewrite BinaryConditional expressions in the true/false values of TernaryConditionals."""
-    def visitor_fn(expression):
-        """Expression visitor function."""
-        # MATCH queries do not allow BinaryComposition inside a TernaryConditional's true/false
-        # value blocks, since OrientDB cannot produce boolean values for comparisons inside them.
-        # We transform any structures that resemble the following:
-        #    TernaryConditional(predicate, X, Y), with X or Y of type BinaryComposition
-        # into the following:
-        # - if X is of type BinaryComposition, and Y is not,
-        #    BinaryComposition(
-        #        u'=',
-        #        TernaryConditional(
-        #            predicate,
-        #            TernaryConditional(X, true, false),
-        #            Y
-        #        ),
-        #        true
-        #    )
-        # - if Y is of type BinaryComposition, and X is not,
-        #    BinaryComposition(
-        #        u'=',
-        #        TernaryConditional(
-        #            predicate,
-        #            X,
-        #            TernaryConditional(Y, true, false),
-        #        ),
-        #        true
-        #    )
-        # - if both X and Y are of type BinaryComposition,
-        #    BinaryComposition(
-        #        u'=',
-        #        TernaryConditional(
-        #            predicate,
-        #            TernaryConditional(X, true, false),
-        #            TernaryConditional(Y, true, false)
-        #        ),
-        #        true
-        #    )
-        if not isinstance(expression, TernaryConditional):
-            return expression
-
-        if_true = expression.if_true
-        if_false = expression.if_false
-
-        true_branch_rewriting_necessary = isinstance(if_true, BinaryComposition)
-        false_branch_rewriting_necessary = isinstance(if_false, BinaryComposition)
+def _rewrite_binary_composition_inside_ternary_conditional(expression):
+    """Rewrite a TernaryConditional with BinaryComposition true/false values."""
+    # MATCH queries do not allow BinaryComposition inside a TernaryConditional's true/false
+    # value blocks, since OrientDB cannot produce boolean values for comparisons inside them.
+    # We transform any structures that resemble the following:
+    #    TernaryConditional(predicate, X, Y), with X or Y of type BinaryComposition
+    # into the following:
+    # - if X is of type BinaryComposition, and Y is not,
+    #    BinaryComposition(
+    #        u'=',
+    #        TernaryConditional(
+    #            predicate,
+    #            TernaryConditional(X, true, false),
+    #            Y
+    #        ),
+    #        true
+    #    )
+    # - if Y is of type BinaryComposition, and X is not,
+    #    BinaryComposition(
+    #        u'=',
+    #        TernaryConditional(
+    #            predicate,
+    #            X,
+    #            TernaryConditional(Y, true, false),
+    #        ),
+    #        true
+    #    )
+    # - if both X and Y are of type BinaryComposition,
+    #    BinaryComposition(
+    #        u'=',
+    #        TernaryConditional(
+    #            predicate,
+    #            TernaryConditional(X, true, false),
+    #            TernaryConditional(Y, true, false)
+    #        ),
+    #        true
+    #    )
+    if_true = expression.if_true
+    if_false = expression.if_false
+
+    true_branch_rewriting_necessary = isinstance(if_true, BinaryComposition)
+    false_branch_rewriting_necessary = isinstance(if_false, BinaryComposition)
+
+    if not (true_branch_rewriting_necessary or false_branch_rewriting_necessary):
+        # No rewriting is necessary.
+        return expression
+
+    if true_branch_rewriting_necessary:
+        if_true = TernaryConditional(if_true, TrueLiteral, FalseLiteral)
+
+    if false_branch_rewriting_necessary:
+        if_false = TernaryConditional(if_false, TrueLiteral, FalseLiteral)
+
+    ternary = TernaryConditional(expression.predicate, if_true, if_false)
+    return BinaryComposition(u'=', ternary, TrueLiteral)
+
+
+TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE = ExpressionRewriteRule(
+    u'rewrite_binary_composition_inside_ternary_conditional', (TernaryConditional,),
+    _rewrite_binary_composition_inside_ternary_conditional, None)
+
+_TERNARY_CONDITIONAL_BINARY_COMPOSITION_REWRITER = ExpressionRewriter(
+    (TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE,))
 
-        if not (true_branch_rewriting_necessary or false_branch_rewriting_necessary):
-            # No rewriting is necessary.
-            return expression
-
-        if true_branch_rewriting_necessary:
-            if_true = TernaryConditional(if_true, TrueLiteral, FalseLiteral)
 
-        if false_branch_rewriting_necessary:
-            if_false = TernaryConditional(if_false, TrueLiteral, FalseLiteral)
+def rewrite_binary_composition_inside_ternary_conditional(ir_blocks):
+    """Rewrite BinaryConditional expressions in the true/false values of TernaryConditionals."""
+    return _TERNARY_CONDITIONAL_BINARY_COMPOSITION_REWRITER.rewrite_blocks(ir_blocks)
+
+
+def _lower_has_substring_binary_composition(expression):
+    """Rewrite a BinaryComposition with "has_substring" into MATCH-representable form."""
+    # The implementation of "has_substring" must use the LIKE operator in MATCH, and must
+    # prepend and append "%" symbols to the substring being matched.
+    # We transform any structures that resemble the following:
+    #    BinaryComposition(u'has_substring', X, Y)
+    # into the following:
+    #    BinaryComposition(
+    #        u'LIKE',
+    #        X,
+    #        BinaryComposition(
+    #            u'+',
+    #            Literal("%"),
+    #            BinaryComposition(
+    #                 u'+',
+    #                 Y,
+    #                 Literal("%")
+    #            )
+    #        )
+    #    )
+    if expression.operator != u'has_substring':
+        return expression
+
+    return BinaryComposition(
+        u'LIKE',
+        expression.left,
+        BinaryComposition(
+            u'+',
+            Literal('%'),
+            BinaryComposition(
+                u'+',
+                expression.right,
+                Literal('%')
+            )
+        )
+    )
 
-        ternary = TernaryConditional(expression.predicate, if_true, if_false)
-        return BinaryComposition(u'=', ternary, TrueLiteral)
 
-    new_ir_blocks = [
-        block.visit_and_update_expressions(visitor_fn)
-        for block in ir_blocks
-    ]
+HAS_SUBSTRING_LOWERING_RULE = ExpressionRewriteRule(
+    u'lower_has_substring_binary_compositions', (BinaryComposition,),
+    _lower_has_substring_binary_composition, None)
 
-    return new_ir_blocks
+_HAS_SUBSTRING_LOWERING_REWRITER = ExpressionRewriter((HAS_SUBSTRING_LOWERING_RULE,))
 
 
 def lower_has_substring_binary_compositions(ir_blocks):
     """Lower Filter blocks that use the "has_substring" operation into MATCH-representable form."""
-    def visitor_fn(expression):
-        """Rewrite BinaryComposition expressions with "has_substring" into representable form."""
-        # The implementation of "has_substring" must use the LIKE operator in MATCH, and must
-        # prepend and append "%" symbols to the substring being matched.
-        # We transform any structures that resemble the following:
-        #    BinaryComposition(u'has_substring', X, Y)
-        # into the following:
-        #    BinaryComposition(
-        #        u'LIKE',
-        #        X,
-        #        BinaryComposition(
-        #            u'+',
-        #            Literal("%"),
-        #            BinaryComposition(
-        #                 u'+',
-        #                 Y,
-        #                 Literal("%")
-        #            )
-        #        )
-        #    )
-        if not isinstance(expression, BinaryComposition) or expression.operator != u'has_substring':
-            return expression
-
-        return BinaryComposition(
-            u'LIKE',
-            expression.left,
-            BinaryComposition(
-                u'+',
-                Literal('%'),
-                BinaryComposition(
-                    u'+',
-                    expression.right,
-                    Literal('%')
-                )
-            )
-        )
-
-    new_ir_blocks = [
-        block.visit_and_update_expressions(visitor_fn)
-        for block in ir_blocks
-    ]
-
-    return new_ir_blocks
+    return _HAS_SUBSTRING_LOWERING_REWRITER.rewrite_blocks(ir_blocks)
 
 
 def truncate_repeated_single_step_traversals(match_query):
@@ -105,6 +105,10 @@ def convert_optional_traversals_to_compound_match_query(
         CompoundMatchQuery object containing 2^n MatchQuery objects,
         one for each possible subset of the n optional edges being followed
     """
+    if not complex_optional_roots:
+        # There is only one subset of zero optional edges, in which no traversals are pruned.
+        return CompoundMatchQuery(match_queries=[match_query])
+
     tree = construct_optional_traversal_tree(
         complex_optional_roots, location_to_optional_roots)
     rooted_optional_root_location_subsets = tree.get_all_rooted_subtrees_as_lists()
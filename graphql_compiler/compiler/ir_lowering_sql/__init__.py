@@ -1,12 +1,14 @@
 # Copyright 2018-present Kensho Technologies, LLC.
 
+from funcy.py2 import pairwise
 import six
 
 from .sql_tree import SqlNode, SqlQueryTree
 from .. import blocks
 from ...compiler import expressions
-from ...compiler.helpers import Location
+from ..instrumentation import LOWERED_IR_BLOCK_COUNT, SANITY_CHECKS_PHASE, get_current_time
 from ..ir_lowering_sql import constants
+from ..lowering_pipeline import LoweringPass, run_lowering_passes
 from ..metadata import LocationInfo
 
 ##############
@@ -14,7 +16,7 @@ from ..metadata import LocationInfo
 ##############
 
 
-def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
+def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None, instrumentation=None):
     """Lower the IR blocks into a form that can be represented by a SQL query.
 
     Args:
@@ -37,11 +39,22 @@ def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
                                 Be very careful with this option, as bad input here will
                                 lead to incorrect output queries being generated.
                                 *****
+        instrumentation: optional CompilationInstrumentation object, to which the time spent
+                         validating that all blocks are supported in SQL and in each lowering
+                         pass, and the number of lowered IR blocks, are reported
 
     Returns:
         tree representation of IR blocks for recursive traversal by SQL backend.
     """
+    if instrumentation is not None:
+        sanity_checks_start_time = get_current_time()
+
     _validate_all_blocks_supported(ir_blocks, query_metadata_table)
+
+    if instrumentation is not None:
+        instrumentation.record_phase_time(
+            SANITY_CHECKS_PHASE, get_current_time() - sanity_checks_start_time)
+
     construct_result = _get_construct_result(ir_blocks)
     query_path_to_location_info = _map_query_path_to_location_info(query_metadata_table)
     query_path_to_output_fields = _map_query_path_to_outputs(
@@ -49,8 +62,17 @@ def lower_ir(ir_blocks, query_metadata_table, type_equivalence_hints=None):
     block_index_to_location = _map_block_index_to_location(ir_blocks)
 
     # perform lowering steps
-    ir_blocks = lower_unary_transformations(ir_blocks)
-    ir_blocks = lower_unsupported_metafield_expressions(ir_blocks)
+    # Both passes reject expressions unsupported in SQL, so neither of them is ever skipped.
+    lowering_passes = (
+        LoweringPass('lower_unary_transformations', lower_unary_transformations),
+        LoweringPass('lower_unsupported_metafield_expressions',
+                     lower_unsupported_metafield_expressions),
+    )
+    ir_blocks = run_lowering_passes(
+        ir_blocks, lowering_passes, len, instrumentation=instrumentation)
+
+    if instrumentation is not None:
+        instrumentation.record_count(LOWERED_IR_BLOCK_COUNT, len(ir_blocks))
 
     # iteratively construct SqlTree
     query_path_to_node = {}
@@ -143,21 +165,22 @@ def _map_query_path_to_location_info(query_metadata_table):
         Dict[Tuple[str], LocationInfo], dictionary mapping query path to LocationInfo at that path.
     """
     query_path_to_location_info = {}
-    for location, location_info in query_metadata_table.registered_locations:
-        if not isinstance(location, Location):
-            continue
-        if location.query_path in query_path_to_location_info:
-            # make sure the stored location information equals the new location information
-            # for the fields the SQL backend requires.
-            equivalent_location_info = query_path_to_location_info[location.query_path]
+    for query_path, locations in six.iteritems(query_metadata_table.locations_by_query_path):
+        location_infos = [
+            query_metadata_table.get_location_info(location)
+            for location in locations
+        ]
+        # make sure the location information of all revisits of a query path is equal,
+        # for the fields the SQL backend requires.
+        for location_info, equivalent_location_info in pairwise(location_infos):
             if not _location_infos_equal(location_info, equivalent_location_info):
                 raise AssertionError(
                     u'Differing LocationInfos at query_path {} between {} and {}. Expected '
                     u'parent_location.query_path, optional_scopes_depth, recursive_scopes_depth '
                     u'and types to be equal for LocationInfos sharing the same query path.'.format(
-                        location.query_path, location_info, equivalent_location_info))
+                        query_path, location_info, equivalent_location_info))
 
-        query_path_to_location_info[location.query_path] = location_info
+        query_path_to_location_info[query_path] = location_infos[-1]
     return query_path_to_location_info
 
 
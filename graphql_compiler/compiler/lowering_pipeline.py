@@ -0,0 +1,103 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Run sequences of named lowering passes, skipping those irrelevant to the query being lowered."""
+from collections import namedtuple
+from pprint import pformat
+
+from .instrumentation import get_current_time
+
+
+# Features of a query that only some of the lowering passes need to handle.
+OPTIONAL_FEATURE = 'optional'              # the query contains an @optional scope
+FOLD_FEATURE = 'fold'                      # the query contains a @fold scope
+RECURSE_FEATURE = 'recurse'                # the query contains a @recurse scope
+TYPE_COERCION_FEATURE = 'type_coercion'    # the query coerces a location to a subtype
+
+ALL_IR_FEATURES = frozenset({
+    OPTIONAL_FEATURE,
+    FOLD_FEATURE,
+    RECURSE_FEATURE,
+    TYPE_COERCION_FEATURE,
+})
+
+
+# A LoweringPass is a single named step of lowering IR into a form suitable for a backend:
+# - name: string, uniquely identifying the pass within its pipeline
+# - function: function taking the IR produced by the previous pass, and returning the lowered IR.
+#             The IR may change form between passes, e.g. from a list of IR blocks to a MatchQuery.
+# - relevant_features: set of IR features, such that the pass returns its input IR unchanged
+#                      for any query without at least one of them, or None if the pass is
+#                      relevant to all queries. Defaults to None.
+LoweringPass = namedtuple('LoweringPass', ('name', 'function', 'relevant_features'))
+LoweringPass.__new__.__defaults__ = (None,)
+
+
+def get_ir_features(query_metadata_table):
+    """Return the frozenset of IR features used by the query with the given metadata.
+
+    Args:
+        query_metadata_table: QueryMetadataTable object containing all metadata collected during
+                              query processing, including location metadata (e.g. which locations
+                              are folded or optional).
+
+    Returns:
+        frozenset of the IR features, e.g. OPTIONAL_FEATURE, present in the query
+    """
+    feature_locations = (
+        (OPTIONAL_FEATURE, query_metadata_table.optional_locations),
+        (FOLD_FEATURE, query_metadata_table.folded_locations),
+        (RECURSE_FEATURE, query_metadata_table.recursive_locations),
+        (TYPE_COERCION_FEATURE, query_metadata_table.coerced_locations),
+    )
+    return frozenset(
+        feature
+        for feature, locations in feature_locations
+        if locations
+    )
+
+
+def run_lowering_passes(ir, lowering_passes, get_ir_size, instrumentation=None,
+                        ir_features=None):
+    """Apply the lowering passes to the IR in order, and return the resulting IR.
+
+    Args:
+        ir: the IR to lower, in the form expected by the first lowering pass
+        lowering_passes: iterable of LoweringPass objects, to be applied in order
+        get_ir_size: function taking IR in any of the forms produced by the lowering passes,
+                     and returning the number of IR blocks it contains
+        instrumentation: optional CompilationInstrumentation object. If provided, the time spent
+                         in each pass and the size of the IR after it are reported to it,
+                         together with a snapshot of the IR if the instrumentation requests it.
+                         Skipped passes are not reported.
+        ir_features: optional frozenset of the IR features of the query, as returned by
+                     get_ir_features(). If provided, passes none of whose relevant features are
+                     present in the query are skipped. If None, all passes are applied.
+
+    Returns:
+        the IR produced by the last lowering pass
+    """
+    if ir_features is not None:
+        lowering_passes = [
+            lowering_pass
+            for lowering_pass in lowering_passes
+            if lowering_pass.relevant_features is None or
+            not lowering_pass.relevant_features.isdisjoint(ir_features)
+        ]
+
+    if instrumentation is None:
+        for lowering_pass in lowering_passes:
+            ir = lowering_pass.function(ir)
+        return ir
+
+    take_snapshots = instrumentation.snapshot_lowering_passes
+    for lowering_pass in lowering_passes:
+        pass_start_time = get_current_time()
+        ir = lowering_pass.function(ir)
+        elapsed_seconds = get_current_time() - pass_start_time
+
+        # The snapshot is a string rather than the IR itself, since later passes may reuse
+        # and modify the objects that make up the IR. Strings can also be saved for later analysis.
+        ir_snapshot = pformat(ir) if take_snapshots else None
+        instrumentation.record_lowering_pass(
+            lowering_pass.name, elapsed_seconds, get_ir_size(ir), ir_snapshot)
+
+    return ir
@@ -0,0 +1,80 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Thread-safe, size-bounded least-recently-used caches, shared by the compiler's caches."""
+from collections import OrderedDict, namedtuple
+import threading
+
+import six
+
+
+# The CompilationCacheStats will have the following types for its members:
+# - hits: int, the number of lookups that were satisfied from the cache
+# - misses: int, the number of lookups that required a fresh compilation
+# - evictions: int, the number of entries evicted to keep the cache within its size bound
+# - size: int, the number of entries currently in the cache
+# - max_size: int, the maximum number of entries the cache may hold
+CompilationCacheStats = namedtuple(
+    'CompilationCacheStats', ('hits', 'misses', 'evictions', 'size', 'max_size'))
+
+
+class LruCache(object):
+    """A thread-safe, size-bounded cache that evicts its least recently used entries first.
+
+    None is never a valid value, since get() returns None for keys that are not in the cache.
+    """
+
+    def __init__(self, max_size=1000):
+        """Create a new empty cache holding at most max_size entries."""
+        if not isinstance(max_size, six.integer_types) or max_size < 1:
+            raise ValueError(u'Expected max_size to be a positive integer, got: '
+                             u'{}'.format(max_size))
+
+        self._max_size = max_size
+        self._entries = OrderedDict()  # cache key -> value, least recent first
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, cache_key):
+        """Return the value for the given key, or None if it is not in the cache."""
+        with self._lock:
+            value = self._entries.pop(cache_key, None)
+            if value is None:
+                self._misses += 1
+                return None
+
+            # Re-insert the entry to mark it as the most recently used one.
+            self._entries[cache_key] = value
+            self._hits += 1
+            return value
+
+    def put(self, cache_key, value):
+        """Store the value under the given key, evicting the oldest entry if needed."""
+        with self._lock:
+            self._entries.pop(cache_key, None)
+            self._entries[cache_key] = value
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Remove all entries from the cache. The hit, miss and eviction counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self):
+        """Return a CompilationCacheStats namedtuple describing the cache's usage so far."""
+        with self._lock:
+            return CompilationCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_size=self._max_size)
+
+    def __len__(self):
+        """Return the number of entries currently in the cache."""
+        return len(self._entries)
@@ -209,3 +209,16 @@ def convert_to_match_query(ir_blocks):
         output_block=output_block,
         where_block=where_block,
     )
+
+
+def count_blocks_in_match_query(match_query):
+    """Return the total number of IR blocks contained in the given MatchQuery object."""
+    block_count = sum(
+        sum(1 for block in match_step if block is not None)
+        for match_traversal in match_query.match_traversals
+        for match_step in match_traversal
+    )
+    block_count += sum(len(folded_ir_blocks) for folded_ir_blocks in match_query.folds.values())
+    block_count += sum(
+        1 for block in (match_query.output_block, match_query.where_block) if block is not None)
+    return block_count
@@ -50,6 +50,125 @@ RecurseInfo = namedtuple(
 )
 
 
+def _make_location_types(locations):
+    """Return a dict of location -> GraphQL type, for the given dict of location -> LocationInfo."""
+    return {
+        location: location_info.type
+        for location, location_info in six.iteritems(locations)
+    }
+
+
+def _make_locations_by_query_path(locations):
+    """Return a dict of query path -> tuple of the Location objects with that query path.
+
+    Args:
+        locations: dict of Location/FoldScopeLocation -> LocationInfo
+
+    Returns:
+        dict of query path tuple -> tuple of Location objects with that query path, in the
+        iteration order of the given dict. FoldScopeLocation objects do not have a query path
+        of their own, and are not included.
+    """
+    locations_by_query_path = dict()
+    for location in locations:
+        if isinstance(location, Location):
+            locations_by_query_path.setdefault(location.query_path, []).append(location)
+
+    return {
+        query_path: tuple(query_path_locations)
+        for query_path, query_path_locations in six.iteritems(locations_by_query_path)
+    }
+
+
+def _make_location_grouping(get_key):
+    """Return a function grouping a dict of location -> LocationInfo by a key of the LocationInfo.
+
+    Args:
+        get_key: function taking a LocationInfo, and returning the hashable key of its group
+
+    Returns:
+        function taking a dict of Location/FoldScopeLocation -> LocationInfo, and returning
+        a dict of key -> frozenset of the locations whose LocationInfo has that key
+    """
+    def make_index(locations):
+        """Return a dict of key -> frozenset of the locations whose LocationInfo has that key."""
+        location_groups = dict()
+        for location, location_info in six.iteritems(locations):
+            location_groups.setdefault(get_key(location_info), set()).add(location)
+
+        return {
+            key: frozenset(group_locations)
+            for key, group_locations in six.iteritems(location_groups)
+        }
+
+    return make_index
+
+
+def _make_scope_location_sets(locations):
+    """Return a dict of index name -> frozenset of locations, for the locations in special scopes.
+
+    All of these indexes are built in a single pass, since they are usually all used together.
+
+    Args:
+        locations: dict of Location/FoldScopeLocation -> LocationInfo
+
+    Returns:
+        dict with the following keys, and frozensets of locations as values:
+        - coerced_locations: the locations at which a type coercion was recorded
+        - optional_locations: the locations within at least one optional scope
+        - recursive_locations: the locations within at least one recursion scope
+        - folded_locations: the locations within a fold scope
+    """
+    coerced_locations = []
+    optional_locations = []
+    recursive_locations = []
+    folded_locations = []
+    for location, location_info in six.iteritems(locations):
+        if location_info.coerced_from_type is not None:
+            coerced_locations.append(location)
+        if location_info.optional_scopes_depth > 0:
+            optional_locations.append(location)
+        if location_info.recursive_scopes_depth > 0:
+            recursive_locations.append(location)
+        if location_info.is_within_fold:
+            folded_locations.append(location)
+
+    return {
+        'coerced_locations': frozenset(coerced_locations),
+        'optional_locations': frozenset(optional_locations),
+        'recursive_locations': frozenset(recursive_locations),
+        'folded_locations': frozenset(folded_locations),
+    }
+
+
+def _make_single_index(index_name, make_index):
+    """Return a function building a dict containing only the named index, using make_index."""
+    return lambda locations: {index_name: make_index(locations)}
+
+
+# Index name -> function taking the dict of location -> LocationInfo of a QueryMetadataTable,
+# and returning a dict of index name -> index over those locations, including the named index.
+# Indexes are only built when first used.
+_LOCATION_INDEX_FACTORIES = {
+    'location_types': _make_single_index('location_types', _make_location_types),
+    'locations_by_query_path': _make_single_index(
+        'locations_by_query_path', _make_locations_by_query_path),
+    'locations_by_type_name': _make_single_index(
+        'locations_by_type_name', _make_location_grouping(
+            lambda location_info: location_info.type.name)),
+    'locations_by_optional_scopes_depth': _make_single_index(
+        'locations_by_optional_scopes_depth', _make_location_grouping(
+            lambda location_info: location_info.optional_scopes_depth)),
+    'locations_by_recursive_scopes_depth': _make_single_index(
+        'locations_by_recursive_scopes_depth', _make_location_grouping(
+            lambda location_info: location_info.recursive_scopes_depth)),
+    'coerced_locations': _make_scope_location_sets,
+    'optional_locations': _make_scope_location_sets,
+    'recursive_locations': _make_scope_location_sets,
+    'folded_locations': _make_scope_location_sets,
+}
+
+
 @six.python_2_unicode_compatible
 class QueryMetadataTable(object):
     """Query metadata container with info on locations, inputs, outputs, and tags in the query."""
@@ -85,6 +204,11 @@ class QueryMetadataTable(object):
         #       that are directly descended from it
         self._child_locations = dict()
 
+        # dict, index name -> index over the registered locations, for the indexes built since
+        #       the registered locations last changed. Indexes are only built on first use, since
+        #       lowering passes look up locations by their metadata, but the frontend does not.
+        self._location_indexes = dict()
+
         self.register_location(root_location, root_location_info)
 
     @property
@@ -117,6 +241,7 @@ class QueryMetadataTable(object):
             self._child_locations.setdefault(location_info.parent_location, set()).add(location)
 
         self._locations[location] = location_info
+        self._location_indexes.clear()
 
     def revisit_location(self, location):
         """Revisit a location, returning the revisited location after setting its metadata."""
@@ -152,6 +277,7 @@ class QueryMetadataTable(object):
             type=coerced_to_type,
             coerced_from_type=current_info.type)
         self._locations[location] = new_info
+        self._location_indexes.clear()
 
     def get_location_info(self, location):
         """Return the LocationInfo object for a given location."""
@@ -232,6 +358,67 @@ class QueryMetadataTable(object):
         for location, location_info in six.iteritems(self._locations):
             yield location, location_info
 
+    def _get_location_index(self, index_name):
+        """Return the named index over the registered locations, building it if needed."""
+        location_index = self._location_indexes.get(index_name, None)
+        if location_index is None:
+            new_location_indexes = _LOCATION_INDEX_FACTORIES[index_name](self._locations)
+            self._location_indexes.update(new_location_indexes)
+            location_index = new_location_indexes[index_name]
+        return location_index
+
+    @property
+    def location_types(self):
+        """Return a dict of location -> GraphQL type at that location, for all locations.
+
+        The returned dict is shared by all callers, and must not be modified.
+        """
+        return self._get_location_index('location_types')
+
+    @property
+    def coerced_locations(self):
+        """Return a frozenset of all locations at which a type coercion was recorded."""
+        return self._get_location_index('coerced_locations')
+
+    @property
+    def optional_locations(self):
+        """Return a frozenset of all locations within at least one optional scope."""
+        return self._get_location_index('optional_locations')
+
+    @property
+    def recursive_locations(self):
+        """Return a frozenset of all locations within at least one recursion scope."""
+        return self._get_location_index('recursive_locations')
+
+    @property
+    def folded_locations(self):
+        """Return a frozenset of all locations within a fold scope."""
+        return self._get_location_index('folded_locations')
+
+    @property
+    def locations_by_query_path(self):
+        """Return a dict of query path -> tuple of the Location objects with that query path.
+
+        The Location objects of each query path are the first location with that query path and
+        all its revisits, in the same order as in registered_locations. FoldScopeLocation objects
+        are not included. The returned dict is shared by all callers, and must not be modified.
+        """
+        return self._get_location_index('locations_by_query_path')
+
+    def get_locations_of_type(self, type_name):
+        """Return a frozenset of the locations whose type has the given name, after coercion."""
+        return self._get_location_index('locations_by_type_name').get(type_name, frozenset())
+
+    def get_locations_at_optional_scopes_depth(self, depth):
+        """Return a frozenset of the locations within exactly the given number of optionals."""
+        return self._get_location_index('locations_by_optional_scopes_depth').get(
+            depth, frozenset())
+
+    def get_locations_at_recursive_scopes_depth(self, depth):
+        """Return a frozenset of the locations within exactly the given number of recursions."""
+        return self._get_location_index('locations_by_recursive_scopes_depth').get(
+            depth, frozenset())
+
     def __str__(self):
         """Return a human-readable str representation of the QueryMetadataTable object."""
         return (
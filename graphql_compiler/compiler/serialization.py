@@ -0,0 +1,92 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Convert CompilationResult objects to and from plain, picklable and JSON-compatible data.
+
+The GraphQL type objects referenced by the metadata of a CompilationResult belong to a particular
+schema object, and cannot be transferred between processes. Instead, they are represented by their
+names in GraphQL type syntax (e.g. "[String!]"), and resolved against a schema when the
+CompilationResult is reconstructed.
+"""
+from graphql import GraphQLList, GraphQLNonNull
+import six
+
+from .common import GREMLIN_LANGUAGE, MATCH_LANGUAGE, CompilationResult
+from .compiler_frontend import OutputMetadata
+
+
+# Only queries in these languages are plain strings that can be serialized.
+SERIALIZABLE_LANGUAGES = frozenset({MATCH_LANGUAGE, GREMLIN_LANGUAGE})
+
+
+def _get_graphql_type_by_name(schema, type_name):
+    """Return the GraphQL type described by the given name in GraphQL type syntax."""
+    if type_name.endswith(u'!'):
+        return GraphQLNonNull(_get_graphql_type_by_name(schema, type_name[:-1]))
+    elif type_name.startswith(u'[') and type_name.endswith(u']'):
+        return GraphQLList(_get_graphql_type_by_name(schema, type_name[1:-1]))
+
+    graphql_type = schema.get_type(type_name)
+    if graphql_type is None:
+        raise AssertionError(u'Type {} was not found in the schema, which is not the schema '
+                             u'the query was compiled against.'.format(type_name))
+    return graphql_type
+
+
+def serialize_compilation_result(compilation_result):
+    """Return a dict of plain data that fully describes the given CompilationResult.
+
+    Args:
+        compilation_result: CompilationResult object of a MATCH or Gremlin query
+
+    Returns:
+        dict containing only strings, booleans, and dicts thereof, from which the CompilationResult
+        can be reconstructed using deserialize_compilation_result()
+    """
+    if compilation_result.language not in SERIALIZABLE_LANGUAGES:
+        raise AssertionError(u'Cannot serialize compilation results of language {}: '
+                             u'{}'.format(compilation_result.language, compilation_result))
+
+    return {
+        'query': compilation_result.query,
+        'language': compilation_result.language,
+        'output_metadata': {
+            output_name: {
+                'type': six.text_type(output_metadata.type),
+                'optional': output_metadata.optional,
+            }
+            for output_name, output_metadata in six.iteritems(compilation_result.output_metadata)
+        },
+        'input_metadata': {
+            input_name: six.text_type(input_type)
+            for input_name, input_type in six.iteritems(compilation_result.input_metadata)
+        },
+    }
+
+
+def deserialize_compilation_result(schema, serialized_compilation_result):
+    """Reconstruct a CompilationResult, resolving its types against the given schema.
+
+    Args:
+        schema: GraphQL schema object, the schema the query was compiled against
+        serialized_compilation_result: dict, as returned by serialize_compilation_result()
+
+    Returns:
+        a CompilationResult object
+    """
+    output_metadata = {
+        output_name: OutputMetadata(
+            type=_get_graphql_type_by_name(schema, output_metadata['type']),
+            optional=output_metadata['optional'])
+        for output_name, output_metadata in six.iteritems(
+            serialized_compilation_result['output_metadata'])
+    }
+    input_metadata = {
+        input_name: _get_graphql_type_by_name(schema, input_type_name)
+        for input_name, input_type_name in six.iteritems(
+            serialized_compilation_result['input_metadata'])
+    }
+
+    return CompilationResult(
+        query=serialized_compilation_result['query'],
+        language=serialized_compilation_result['language'],
+        output_metadata=output_metadata,
+        input_metadata=input_metadata)
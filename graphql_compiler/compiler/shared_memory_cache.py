@@ -0,0 +1,429 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Cache of compiled queries shared by all processes on a host, through a memory-mapped file."""
+from collections import OrderedDict
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+from .common import CompilationCache, CompilationCacheStats
+from .disk_cache import get_compiler_version, get_persistent_cache_entry_key
+from .serialization import deserialize_compilation_result, serialize_compilation_result
+
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl module, and no flock() to coordinate writers with.
+    fcntl = None
+
+
+# Version of the format of cache entries. Must be incremented whenever the format changes,
+# so that entries written in an older format are treated as stale rather than misread.
+_CACHE_ENTRY_FORMAT_VERSION = 1
+
+# The log file starts with a header consisting of a magic string identifying the file format,
+# followed by the offset at which the last completely written record ends. Readers never look
+# past that offset, so records that are still being appended are invisible to them.
+_LOG_HEADER = struct.Struct('<8sQ')
+_LOG_MAGIC = b'GQLCLOG1'
+_COMMITTED_END_OFFSET = 8
+
+# Each record in the log consists of a header with the length of the payload, its CRC32 checksum
+# and the SHA-256 digest of the entry key, followed by the payload. The payload is the JSON
+# encoding of the entry key and the serialized CompilationResult.
+_RECORD_HEADER = struct.Struct('<II32s')
+
+_LOCK_FILE_SUFFIX = '.lock'
+
+DEFAULT_MAX_FILE_SIZE = 64 * 1024 * 1024
+
+# os.rename() does not overwrite existing files on Windows, but os.replace() does not exist in py2.
+_replace_file = getattr(os, 'replace', os.rename)
+
+
+def _get_entry_key_digest(entry_key):
+    """Return the SHA-256 digest of the entry key, as raw bytes."""
+    return hashlib.sha256(json.dumps(entry_key, sort_keys=True).encode('utf-8')).digest()
+
+
+def _get_crc32(payload):
+    """Return the CRC32 checksum of the payload, as an unsigned int on both py2 and py3."""
+    return zlib.crc32(payload) & 0xffffffff
+
+
+def _encode_record(entry_key, payload):
+    """Return the bytes of a log record storing the payload under the given entry key."""
+    return _RECORD_HEADER.pack(
+        len(payload), _get_crc32(payload), _get_entry_key_digest(entry_key)) + payload
+
+
+def _iterate_records(buffer, start, end):
+    """Yield (key digest, payload offset, payload length, record end) for records in the buffer.
+
+    Args:
+        buffer: bytes-like object containing the log, e.g. an mmap of the log file
+        start: int, the offset of the first record to read
+        end: int, the committed end of the log. Records extending past it are not read.
+    """
+    offset = start
+    while offset + _RECORD_HEADER.size <= end:
+        payload_length, _, key_digest = _RECORD_HEADER.unpack_from(buffer, offset)
+        payload_offset = offset + _RECORD_HEADER.size
+        record_end = payload_offset + payload_length
+        if record_end > end:
+            break
+
+        yield key_digest, payload_offset, payload_length, record_end
+        offset = record_end
+
+
+def _decode_payload(buffer, payload_offset, payload_length):
+    """Return the (entry key, serialized result) stored in the payload, or None if it is corrupt."""
+    record_offset = payload_offset - _RECORD_HEADER.size
+    _, expected_crc32, _ = _RECORD_HEADER.unpack_from(buffer, record_offset)
+    payload = bytes(buffer[payload_offset:payload_offset + payload_length])
+    if _get_crc32(payload) != expected_crc32:
+        return None
+
+    try:
+        entry = json.loads(payload.decode('utf-8'))
+        return entry['key'], entry['compilation_result']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class _WriterLock(object):
+    """Context manager holding the exclusive, host-wide lock on writing to the log."""
+
+    def __init__(self, lock_path):
+        """Create a new lock on the given lock file, which is created if it does not exist."""
+        self._lock_path = lock_path
+        self._lock_file = None
+
+    def __enter__(self):
+        """Acquire the lock, blocking until no other process or thread holds it."""
+        # The lock file is opened anew every time, since flock() locks are shared by all
+        # processes that inherited the same open file, e.g. from a parent process before forking.
+        self._lock_file = open(self._lock_path, 'a')
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release the lock."""
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        self._lock_file.close()
+        self._lock_file = None
+
+
+class SharedMemoryCompilationCache(object):
+    """A cache of CompilationResult objects shared by all processes on a host.
+
+    Compiled MATCH and Gremlin queries are serialized into an append-only log file, which every
+    process using the cache maps into memory. Processes therefore share a single copy of each
+    compiled query through the operating system's page cache, and each query is only compiled
+    by the first process that needs it. This suits servers with many pre-forked worker processes.
+    SQL queries are SQLAlchemy objects that cannot be serialized, and are never cached.
+
+    Reads do not take any locks: the log header stores the end of the last completely written
+    record, and readers never look past it. Appending to the log requires an exclusive flock()
+    on a lock file next to it, so there is only a single writer at any time. When appending
+    a record would grow the log past max_file_size, the writer compacts the log: it drops
+    superseded, corrupt and stale entries, and if necessary the oldest entries, then atomically
+    replaces the log file. Readers notice that the log file was replaced, and map the new one.
+
+    Like DiskCompilationCache, the cache is bound to the schema given to it, which is used to
+    resolve the types in the metadata of the stored queries. Recently used entries are also kept
+    deserialized in memory, in a small per-process cache.
+
+    Requires a POSIX system, since flock() is used to coordinate writers.
+    """
+
+    def __init__(self, path, schema, max_file_size=DEFAULT_MAX_FILE_SIZE, max_memory_size=100):
+        """Create a new SharedMemoryCompilationCache, creating the log file if it does not exist.
+
+        Args:
+            path: string, path to the log file. All processes sharing the cache must use the
+                  same path, and the lock file is created at the same path with a ".lock" suffix.
+            schema: GraphQL schema object, the schema against which all cached queries are compiled
+            max_file_size: positive int, the size in bytes past which the log file is compacted
+            max_memory_size: positive int, the number of recently used entries kept deserialized
+                             in the memory of each process
+        """
+        if fcntl is None:
+            raise AssertionError(u'SharedMemoryCompilationCache requires the fcntl module, '
+                                 u'which is not available on this platform.')
+        if max_file_size <= _LOG_HEADER.size:
+            raise ValueError(u'The maximum file size must be larger than {} bytes, but was '
+                             u'{}.'.format(_LOG_HEADER.size, max_file_size))
+
+        self._path = path
+        self._schema = schema
+        self._max_file_size = max_file_size
+        self._writer_lock = _WriterLock(path + _LOCK_FILE_SUFFIX)
+        self._memory_cache = CompilationCache(max_size=max_memory_size)
+
+        # Guards the state of this object against concurrent use by threads of the same process.
+        # The state of the mapped log is only ever read, so the lock is not shared across processes.
+        self._lock = threading.RLock()
+        self._mapped_file = None
+        self._mapped_file_id = None
+        self._mapped_log = None
+        self._indexed_end = _LOG_HEADER.size
+        self._index = {}  # key digest -> (payload offset, payload length) of its latest record
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if not os.path.exists(path):
+            with self._writer_lock:
+                if not os.path.exists(path):
+                    self._write_log_file([])
+
+    def _write_log_file(self, records):
+        """Atomically replace the log file with one containing the given encoded records."""
+        log_directory = os.path.dirname(os.path.abspath(self._path))
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=log_directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as log_file:
+                records_size = sum(len(record) for record in records)
+                log_file.write(_LOG_HEADER.pack(_LOG_MAGIC, _LOG_HEADER.size + records_size))
+                for record in records:
+                    log_file.write(record)
+            _replace_file(temporary_path, self._path)
+        except Exception:
+            os.remove(temporary_path)
+            raise
+
+    def _unmap_log(self):
+        """Close the current mapping of the log file, if any, and forget its index."""
+        if self._mapped_log is not None:
+            self._mapped_log.close()
+            self._mapped_file.close()
+        self._mapped_file = None
+        self._mapped_file_id = None
+        self._mapped_log = None
+        self._indexed_end = _LOG_HEADER.size
+        self._index = {}
+
+    def _map_log(self):
+        """Map the current log file into memory, checking that it is a valid log."""
+        mapped_file = open(self._path, 'rb')
+        try:
+            file_stat = os.fstat(mapped_file.fileno())
+            mapped_log = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            mapped_file.close()
+            raise
+
+        magic, _ = _LOG_HEADER.unpack_from(mapped_log, 0)
+        if magic != _LOG_MAGIC:
+            mapped_log.close()
+            mapped_file.close()
+            raise AssertionError(u'The file at {} is not a compilation cache log.'
+                                 .format(self._path))
+
+        self._mapped_file = mapped_file
+        self._mapped_file_id = (file_stat.st_dev, file_stat.st_ino)
+        self._mapped_log = mapped_log
+
+    def _refresh(self):
+        """Map the log again if it was replaced or grew, then index the records added since."""
+        file_stat = os.stat(self._path)
+        if self._mapped_file_id != (file_stat.st_dev, file_stat.st_ino):
+            self._unmap_log()
+            self._map_log()
+
+        _, committed_end = _LOG_HEADER.unpack_from(self._mapped_log, 0)
+        if committed_end > len(self._mapped_log):
+            # The log file grew since it was mapped, so the same file is mapped again. The index
+            # remains valid, since records are never modified after being appended.
+            self._mapped_log.close()
+            self._mapped_log = mmap.mmap(
+                self._mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        records = _iterate_records(self._mapped_log, self._indexed_end, committed_end)
+        for key_digest, payload_offset, payload_length, record_end in records:
+            self._index[key_digest] = (payload_offset, payload_length)
+            self._indexed_end = record_end
+
+    def _load_entry(self, entry_key):
+        """Return the CompilationResult stored under the key, or None if there is no valid entry."""
+        key_digest = _get_entry_key_digest(entry_key)
+        with self._lock:
+            if key_digest not in self._index:
+                self._refresh()
+            location = self._index.get(key_digest, None)
+            if location is None:
+                return None
+            decoded_payload = _decode_payload(self._mapped_log, *location)
+
+        if decoded_payload is None:
+            return None
+
+        # The stored key guards against hash collisions.
+        stored_entry_key, serialized_result = decoded_payload
+        if stored_entry_key != entry_key:
+            return None
+
+        try:
+            return deserialize_compilation_result(self._schema, serialized_result)
+        except (ValueError, KeyError, TypeError, AssertionError):
+            return None
+
+    def _get_entry_key(self, cache_key):
+        """Return the JSON-compatible key identifying the entry, or None if it cannot be stored."""
+        persistent_cache_entry_key = get_persistent_cache_entry_key(cache_key)
+        if persistent_cache_entry_key is None:
+            return None
+
+        return [_CACHE_ENTRY_FORMAT_VERSION] + persistent_cache_entry_key
+
+    def _get_live_records(self, log_file_contents):
+        """Return an OrderedDict of key digest -> encoded record, for the valid, current records.
+
+        Records are ordered from the least to the most recently appended, and only the latest
+        record for each key is kept.
+        """
+        magic, committed_end = _LOG_HEADER.unpack_from(log_file_contents, 0)
+        if magic != _LOG_MAGIC:
+            raise AssertionError(u'The file at {} is not a compilation cache log.'
+                                 .format(self._path))
+
+        current_entry_key_prefix = [_CACHE_ENTRY_FORMAT_VERSION, get_compiler_version()]
+        live_records = OrderedDict()
+        records = _iterate_records(log_file_contents, _LOG_HEADER.size, committed_end)
+        for key_digest, payload_offset, payload_length, record_end in records:
+            decoded_payload = _decode_payload(log_file_contents, payload_offset, payload_length)
+            live_records.pop(key_digest, None)
+            if decoded_payload is None:
+                continue
+
+            # Entries written in another format or by another version of the compiler are stale.
+            stored_entry_key, _ = decoded_payload
+            if stored_entry_key[:2] == current_entry_key_prefix:
+                live_records[key_digest] = log_file_contents[
+                    payload_offset - _RECORD_HEADER.size:record_end]
+
+        return live_records
+
+    def _compact(self, log_file_contents, reserved_size):
+        """Replace the log with one holding only its live records, leaving space for more records.
+
+        Must be called while holding the writer lock.
+
+        Args:
+            log_file_contents: bytes, the contents of the current log file
+            reserved_size: int, the number of bytes that should remain free for new records,
+                           below half of the maximum file size. The oldest records are dropped
+                           until that much space is available.
+        """
+        live_records = self._get_live_records(log_file_contents)
+
+        size_budget = self._max_file_size // 2 - _LOG_HEADER.size - reserved_size
+        live_records_size = sum(len(record) for record in live_records.values())
+        while live_records and live_records_size > size_budget:
+            _, dropped_record = live_records.popitem(last=False)
+            live_records_size -= len(dropped_record)
+            self._evictions += 1
+
+        self._write_log_file(list(live_records.values()))
+
+    def _append_record(self, record):
+        """Append the encoded record to the log, compacting the log first if it is too large."""
+        if _LOG_HEADER.size + len(record) > self._max_file_size:
+            # The record could never fit in the log.
+            return
+
+        with self._writer_lock:
+            with open(self._path, 'rb') as log_file:
+                _, committed_end = _LOG_HEADER.unpack(log_file.read(_LOG_HEADER.size))
+                if committed_end + len(record) > self._max_file_size:
+                    log_file.seek(0)
+                    self._compact(log_file.read(), len(record))
+
+            # The log file may have been replaced by the compaction, so it is opened again.
+            with open(self._path, 'r+b') as log_file:
+                _, committed_end = _LOG_HEADER.unpack(log_file.read(_LOG_HEADER.size))
+
+                # Anything past the committed end is left over from an interrupted write, and is
+                # overwritten. The record only becomes visible to readers once the header is
+                # updated, so readers never see a partially written record.
+                log_file.seek(committed_end)
+                log_file.write(record)
+                log_file.flush()
+                log_file.seek(_COMMITTED_END_OFFSET)
+                log_file.write(struct.pack('<Q', committed_end + len(record)))
+                log_file.flush()
+
+    def get(self, cache_key):
+        """Return the CompilationResult for the given key, or None if it is not in the cache."""
+        compilation_result = self._memory_cache.get(cache_key)
+        if compilation_result is None:
+            entry_key = self._get_entry_key(cache_key)
+            if entry_key is not None:
+                compilation_result = self._load_entry(entry_key)
+                if compilation_result is not None:
+                    self._memory_cache.put(cache_key, compilation_result)
+
+        with self._lock:
+            if compilation_result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        return compilation_result
+
+    def put(self, cache_key, compilation_result):
+        """Store the CompilationResult under the given key, in memory and in the shared log."""
+        entry_key = self._get_entry_key(cache_key)
+        if entry_key is None:
+            return
+
+        self._memory_cache.put(cache_key, compilation_result)
+        payload = json.dumps({
+            'key': entry_key,
+            'compilation_result': serialize_compilation_result(compilation_result),
+        }, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            self._append_record(_encode_record(entry_key, payload))
+
+    def compact(self):
+        """Compact the shared log, dropping superseded, corrupt and stale entries."""
+        with self._lock:
+            with self._writer_lock:
+                with open(self._path, 'rb') as log_file:
+                    self._compact(log_file.read(), 0)
+
+    def clear(self):
+        """Remove all entries from the cache, both in memory and in the shared log."""
+        self._memory_cache.clear()
+        with self._lock:
+            with self._writer_lock:
+                self._write_log_file([])
+
+    def close(self):
+        """Unmap the shared log. The cache must not be used afterward."""
+        with self._lock:
+            self._unmap_log()
+
+    @property
+    def stats(self):
+        """Return a CompilationCacheStats namedtuple describing the cache's usage so far."""
+        with self._lock:
+            return CompilationCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self),
+                max_size=None)
+
+    def __len__(self):
+        """Return the number of distinct entries currently stored in the shared log."""
+        with self._lock:
+            self._refresh()
+            return len(self._index)
@@ -0,0 +1,68 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Compiler-wide switch for skipping redundant checks on IR produced by the compiler frontend.
+
+Every block and expression validates its arguments when it is constructed, and the frontend
+output is additionally checked by a sanity-check sweep before it is lowered. Lowering passes
+and emitters then validate each block and expression once more, right before turning it into
+query code. For IR produced by the compiler frontend from valid user input, all of these checks
+past construction time are guaranteed to pass, unless the compiler itself has a bug.
+
+In trusted mode, the re-validation during emission and the IR sanity-check sweep are skipped.
+Validation of user-supplied input, such as the GraphQL query, its directives and the names
+used within it, is not affected and always happens at construction time.
+
+Trusted mode is a per-thread setting, and is off by default in every thread, so turning it on
+in one thread does not affect the compilations running in any other thread. It is meant for
+deployments that compile many queries with a compiler version that has been well-tested
+against them.
+"""
+from contextlib import contextmanager
+import threading
+
+
+class _TrustedModeState(threading.local):
+    """The trusted mode setting of each thread."""
+
+    enabled = False
+
+
+_trusted_mode_state = _TrustedModeState()
+
+
+def is_trusted_mode_enabled():
+    """Return True if the current thread's compilations are in trusted mode, and False otherwise."""
+    return _trusted_mode_state.enabled
+
+
+def set_trusted_mode(enabled):
+    """Turn trusted mode on or off in the current thread, returning whether it was previously on.
+
+    Args:
+        enabled: bool, whether the compiler should skip re-validating the IR it produces
+
+    Returns:
+        bool, whether trusted mode was enabled in the current thread before this call
+    """
+    if not isinstance(enabled, bool):
+        raise TypeError(u'Expected bool enabled, got: {} {}'.format(
+            type(enabled).__name__, enabled))
+
+    previously_enabled = _trusted_mode_state.enabled
+    _trusted_mode_state.enabled = enabled
+    return previously_enabled
+
+
+@contextmanager
+def trusted_mode(enabled=True):
+    """Return a context manager within which trusted mode is turned on or off in the current thread.
+
+    The previous setting is restored on exit, even if an exception is raised.
+
+    Args:
+        enabled: bool, whether the compiler should be in trusted mode within the context
+    """
+    previously_enabled = set_trusted_mode(enabled)
+    try:
+        yield
+    finally:
+        set_trusted_mode(previously_enabled)
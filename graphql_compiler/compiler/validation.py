@@ -0,0 +1,78 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""GraphQL validation rules tailored to the subset of GraphQL supported by the compiler."""
+from graphql.error import GraphQLError
+from graphql.validation.rules import (
+    ArgumentsOfCorrectType, FieldsOnCorrectType, FragmentsOnCompositeTypes, KnownArgumentNames,
+    KnownDirectives, KnownTypeNames, OverlappingFieldsCanBeMerged, PossibleFragmentSpreads,
+    ProvidedNonNullArguments, ScalarLeafs, UniqueArgumentNames
+)
+from graphql.validation.rules.base import ValidationRule
+
+
+class SupportedDefinitionsRule(ValidationRule):
+    """Validation rule rejecting the definitions that the compiler does not support.
+
+    The compiler only supports documents consisting of a single query, which may not declare
+    GraphQL variables nor use named fragments: query parameters are instead declared by strings
+    such as "$name" in @filter directives, and type coercions use inline fragments.
+    This single rule therefore stands in for all of graphql-core's rules about operations,
+    fragment definitions and variables.
+    """
+
+    __slots__ = ()
+
+    def enter_Document(self, node, key, parent, path, ancestors):
+        """Report an error if the document does not consist of exactly one definition."""
+        if len(node.definitions) != 1:
+            self.context.report_error(GraphQLError(
+                u'Expected exactly one definition in the document, found '
+                u'{}.'.format(len(node.definitions)), [node]))
+
+    def enter_FragmentDefinition(self, node, key, parent, path, ancestors):
+        """Report an error for the named fragment, which is not supported by the compiler."""
+        self.context.report_error(GraphQLError(
+            u'Named fragments are not supported, found fragment '
+            u'"{}".'.format(node.name.value), [node]))
+        # The fragment's selections are not validated further.
+        return False
+
+    def enter_FragmentSpread(self, node, key, parent, path, ancestors):
+        """Report an error for the fragment spread, which is not supported by the compiler."""
+        self.context.report_error(GraphQLError(
+            u'Fragment spreads are not supported, found spread of fragment '
+            u'"{}".'.format(node.name.value), [node]))
+
+    def enter_VariableDefinition(self, node, key, parent, path, ancestors):
+        """Report an error for the variable, since GraphQL variables are not supported."""
+        self.context.report_error(GraphQLError(
+            u'GraphQL variables are not supported, found variable "${}". Query parameters '
+            u'are declared with strings such as "$name" in @filter directives '
+            u'instead.'.format(node.variable.name.value), [node]))
+
+
+##############
+# Public API #
+##############
+
+# The graphql-core validation rules needed to validate queries in the subset of GraphQL supported
+# by the compiler, in the same order as in graphql-core's full list of rules. Rules about
+# operations, named fragments and variables are replaced by SupportedDefinitionsRule, since the
+# compiler does not support any of those. Rules about input objects and default values are
+# omitted, since those can only appear in GraphQL variable definitions and in input object
+# arguments, neither of which are used by the compiler's directives.
+# PossibleFragmentSpreads and OverlappingFieldsCanBeMerged are kept: the compiler does not check
+# whether a type coercion can ever succeed, nor whether aliased fields conflict with each other.
+COMPILER_VALIDATION_RULES = (
+    SupportedDefinitionsRule,
+    KnownTypeNames,
+    FragmentsOnCompositeTypes,
+    ScalarLeafs,
+    FieldsOnCorrectType,
+    PossibleFragmentSpreads,
+    KnownDirectives,
+    KnownArgumentNames,
+    UniqueArgumentNames,
+    ArgumentsOfCorrectType,
+    ProvidedNonNullArguments,
+    OverlappingFieldsCanBeMerged,
+)
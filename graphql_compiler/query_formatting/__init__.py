@@ -1,3 +1,5 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Safely insert runtime arguments into compiled GraphQL queries."""
 from .common import insert_arguments_into_query  # noqa
+from .persisted_queries import PersistedQueryRegistry  # noqa
+from .prepared_query import PreparedQuery  # noqa
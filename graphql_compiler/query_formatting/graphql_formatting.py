@@ -1,10 +1,16 @@
 # Copyright 2017-present Kensho Technologies, LLC.
+import hashlib
+
 from graphql import parse
+from graphql.error import GraphQLSyntaxError
+from graphql.language.ast import Field
 from graphql.language.printer import PrintingVisitor, join, wrap
 from graphql.language.visitor import visit
 import six
 
-from ..schema import DIRECTIVES
+from ..compiler.helpers import is_vertex_field_name
+from ..exceptions import GraphQLParsingError
+from ..schema import DIRECTIVES, TagDirective
 
 
 def pretty_print_graphql(query, use_four_spaces=True):
@@ -84,3 +90,96 @@ def fix_indentation_depth(query):
         final_lines.append(('  ' * consecutive_spaces) + line[consecutive_spaces:])
 
     return '\n'.join(final_lines)
+
+
+def _is_property_field(selection):
+    """Return True if the selection is a property field, i.e. a field without a selection set."""
+    return (
+        isinstance(selection, Field) and
+        selection.selection_set is None and
+        not is_vertex_field_name(selection.name.value)
+    )
+
+
+def _has_tag_directive(field_ast):
+    """Return True if the field is marked with a @tag directive."""
+    return any(
+        directive.name.value == TagDirective.name
+        for directive in field_ast.directives or ()
+    )
+
+
+def _sort_property_fields(selection_set):
+    """Sort the property fields of the selection set and all nested selection sets, in-place."""
+    # The AST is walked iteratively, since deeply nested queries may exceed the recursion limit.
+    selection_sets_to_visit = [selection_set]
+    while selection_sets_to_visit:
+        current_selection_set = selection_sets_to_visit.pop()
+        selections = current_selection_set.selections
+
+        # Only the property fields before the first vertex field or inline fragment are reordered,
+        # so that queries that list property fields after vertex fields are still rejected.
+        num_leading_property_fields = 0
+        for selection in selections:
+            if not _is_property_field(selection):
+                break
+            num_leading_property_fields += 1
+
+        leading_property_fields = selections[:num_leading_property_fields]
+
+        # Filters may use tags declared on other property fields at the same vertex, but only
+        # after the tag has been declared. Scopes with tags therefore keep their field order.
+        if not any(_has_tag_directive(field_ast) for field_ast in leading_property_fields):
+            selections[:num_leading_property_fields] = sorted(
+                leading_property_fields, key=lambda field_ast: field_ast.name.value)
+
+        for selection in selections:
+            # Fragment spreads have no selection set of their own.
+            nested_selection_set = getattr(selection, 'selection_set', None)
+            if nested_selection_set is not None:
+                selection_sets_to_visit.append(nested_selection_set)
+
+
+def canonicalize_graphql(query):
+    """Return the canonical form of the GraphQL query, for use in compilation cache keys.
+
+    Queries that differ only in whitespace, comments, the order of the arguments of directives,
+    or the order of the property fields at each vertex have the same canonical form. Compiling the
+    canonical form produces a query equivalent to compiling the original query. Property fields
+    at a vertex with a @tag directive on any of its property fields are not reordered, since
+    the filters at that vertex may only use tags declared before them.
+
+    Args:
+        query: string, the GraphQL query to canonicalize
+
+    Returns:
+        string, the canonical form of the query
+
+    Raises:
+        GraphQLParsingError if the query is invalid GraphQL
+    """
+    # Same workaround for graphql-core issue 98 as in the compiler frontend.
+    try:
+        ast = parse(query + '\n', no_location=True)
+    except GraphQLSyntaxError as e:
+        raise GraphQLParsingError(e)
+
+    for definition in ast.definitions:
+        selection_set = getattr(definition, 'selection_set', None)
+        if selection_set is not None:
+            _sort_property_fields(selection_set)
+
+    return visit(ast, CustomPrintingVisitor())
+
+
+def compute_query_fingerprint(query):
+    """Return a deterministic fingerprint of the canonical form of the GraphQL query.
+
+    Args:
+        query: string, the GraphQL query to fingerprint
+
+    Returns:
+        string, the hex digest fingerprint of the query, equal for all queries that have
+        the same canonical form as returned by canonicalize_graphql()
+    """
+    return hashlib.sha256(canonicalize_graphql(query).encode('utf-8')).hexdigest()
@@ -1,6 +1,7 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Safely represent arguments for Gremlin-language GraphQL queries."""
 import datetime
+from functools import partial
 import json
 from string import Template
 
@@ -12,7 +13,10 @@ from ..compiler import GREMLIN_LANGUAGE
 from ..compiler.helpers import strip_non_null_from_type
 from ..exceptions import GraphQLInvalidArgumentError
 from ..schema import GraphQLDate, GraphQLDateTime, GraphQLDecimal
-from .representations import coerce_to_decimal, represent_float_as_str, type_check_and_str
+from .representations import (
+    EXACT_INT_TYPES, coerce_to_decimal, coerce_to_list, has_only_exact_types,
+    represent_float_as_str, type_check_and_str
+)
 
 
 def _safe_gremlin_string(value):
@@ -78,62 +82,113 @@ def _safe_gremlin_date_and_datetime(graphql_type, expected_python_types, value):
     return _safe_gremlin_string(serialized_value)
 
 
-def _safe_gremlin_list(inner_type, argument_value):
-    """Represent the list of "inner_type" objects in Gremlin form."""
-    if not isinstance(argument_value, list):
-        raise GraphQLInvalidArgumentError(u'Attempting to represent a non-list as a list: '
+def _safe_gremlin_id(argument_value):
+    """Represent an ID argument in Gremlin."""
+    # IDs can be strings or numbers, but the GraphQL library coerces them to strings.
+    # We will follow suit and treat them as strings.
+    if not isinstance(argument_value, six.string_types):
+        if isinstance(argument_value, bytes):  # should only happen in py3
+            argument_value = argument_value.decode('utf-8')
+        else:
+            argument_value = six.text_type(argument_value)
+    return _safe_gremlin_string(argument_value)
+
+
+def _safe_gremlin_int(argument_value):
+    """Represent an int argument in Gremlin."""
+    # Special case: in Python, isinstance(True, int) returns True.
+    # Safeguard against this with an explicit check against bool type.
+    if isinstance(argument_value, bool):
+        raise GraphQLInvalidArgumentError(u'Attempting to represent a non-int as an int: '
                                           u'{}'.format(argument_value))
 
-    stripped_type = strip_non_null_from_type(inner_type)
-    components = (
-        _safe_gremlin_argument(stripped_type, x)
-        for x in argument_value
-    )
-    return u'[' + u','.join(components) + u']'
+    return type_check_and_str(int, argument_value)
+
+
+def _safe_gremlin_boolean(argument_value):
+    """Represent a boolean argument in Gremlin."""
+    return type_check_and_str(bool, argument_value)
+
+
+def _bulk_represent_gremlin_ints(values):
+    """Represent a list of ints in Gremlin form, or return None if it contains other values."""
+    if not has_only_exact_types(values, EXACT_INT_TYPES):
+        return None
+
+    return u'[' + u','.join(map(str, values)) + u']'
+
+
+def _get_gremlin_list_serializer(inner_type):
+    """Return a function that represents lists of "inner_type" objects in Gremlin form."""
+    # The element type is resolved once, rather than once per element of every list.
+    element_serializer = get_gremlin_argument_serializer(strip_non_null_from_type(inner_type))
+    bulk_serializer = None
+    if element_serializer is _safe_gremlin_int:
+        bulk_serializer = _bulk_represent_gremlin_ints
+
+    def _safe_gremlin_list(argument_value):
+        """Represent the list of "inner_type" objects in Gremlin form."""
+        values = coerce_to_list(argument_value)
+
+        if bulk_serializer is not None:
+            represented_list = bulk_serializer(values)
+            if represented_list is not None:
+                return represented_list
+
+        return u'[' + u','.join(map(element_serializer, values)) + u']'
+
+    return _safe_gremlin_list
 
 
 def _safe_gremlin_argument(expected_type, argument_value):
     """Return a Gremlin string representing the given argument value."""
+    return get_gremlin_argument_serializer(expected_type)(argument_value)
+
+
+######
+# Public API
+######
+
+def get_gremlin_argument_serializer(expected_type):
+    """Return a function that represents argument values of the given type as Gremlin strings.
+
+    The GraphQL type is inspected only once, when the function is created. The returned function
+    only needs to check the type of each argument value and represent it, which makes it suitable
+    for representing many argument values of the same type.
+
+    Args:
+        expected_type: GraphQL type object, the type of the argument values to be represented
+
+    Returns:
+        function that takes an argument value and returns a Gremlin string representing it,
+        raising GraphQLInvalidArgumentError if the value is not valid for the expected type
+    """
     if GraphQLString.is_same_type(expected_type):
-        return _safe_gremlin_string(argument_value)
+        return _safe_gremlin_string
     elif GraphQLID.is_same_type(expected_type):
-        # IDs can be strings or numbers, but the GraphQL library coerces them to strings.
-        # We will follow suit and treat them as strings.
-        if not isinstance(argument_value, six.string_types):
-            if isinstance(argument_value, bytes):  # should only happen in py3
-                argument_value = argument_value.decode('utf-8')
-            else:
-                argument_value = six.text_type(argument_value)
-        return _safe_gremlin_string(argument_value)
+        return _safe_gremlin_id
     elif GraphQLFloat.is_same_type(expected_type):
-        return represent_float_as_str(argument_value)
+        return represent_float_as_str
     elif GraphQLInt.is_same_type(expected_type):
-        # Special case: in Python, isinstance(True, int) returns True.
-        # Safeguard against this with an explicit check against bool type.
-        if isinstance(argument_value, bool):
-            raise GraphQLInvalidArgumentError(u'Attempting to represent a non-int as an int: '
-                                              u'{}'.format(argument_value))
-
-        return type_check_and_str(int, argument_value)
+        return _safe_gremlin_int
     elif GraphQLBoolean.is_same_type(expected_type):
-        return type_check_and_str(bool, argument_value)
+        return _safe_gremlin_boolean
     elif GraphQLDecimal.is_same_type(expected_type):
-        return _safe_gremlin_decimal(argument_value)
+        return _safe_gremlin_decimal
     elif GraphQLDate.is_same_type(expected_type):
-        return _safe_gremlin_date_and_datetime(expected_type, (datetime.date,), argument_value)
+        return partial(_safe_gremlin_date_and_datetime, expected_type, (datetime.date,))
     elif GraphQLDateTime.is_same_type(expected_type):
-        return _safe_gremlin_date_and_datetime(expected_type,
-                                               (datetime.datetime, arrow.Arrow), argument_value)
+        return partial(_safe_gremlin_date_and_datetime,
+                       expected_type, (datetime.datetime, arrow.Arrow))
     elif isinstance(expected_type, GraphQLList):
-        return _safe_gremlin_list(expected_type.of_type, argument_value)
+        return _get_gremlin_list_serializer(expected_type.of_type)
     else:
-        raise AssertionError(u'Could not safely represent the requested GraphQL type: '
-                             u'{} {}'.format(expected_type, argument_value))
-
+        def _unrepresentable_argument(argument_value):
+            """Raise an error, since the expected type is not supported."""
+            raise AssertionError(u'Could not safely represent the requested GraphQL type: '
+                                 u'{} {}'.format(expected_type, argument_value))
+        return _unrepresentable_argument
 
-######
-# Public API
-######
 
 def insert_arguments_into_gremlin_query(compilation_result, arguments):
     """Insert the arguments into the compiled Gremlin query to form a complete query.
@@ -160,7 +215,7 @@ def insert_arguments_into_gremlin_query(compilation_result, arguments):
 
     # The arguments are assumed to have already been validated against the query.
     sanitized_arguments = {
-        key: _safe_gremlin_argument(argument_types[key], value)
+        key: get_gremlin_argument_serializer(argument_types[key])(value)
         for key, value in six.iteritems(arguments)
     }
 
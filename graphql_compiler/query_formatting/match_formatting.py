@@ -1,6 +1,7 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Safely represent arguments for MATCH-language GraphQL queries."""
 import datetime
+from functools import partial
 import json
 
 import arrow
@@ -11,7 +12,10 @@ from ..compiler import MATCH_LANGUAGE
 from ..compiler.helpers import strip_non_null_from_type
 from ..exceptions import GraphQLInvalidArgumentError
 from ..schema import GraphQLDate, GraphQLDateTime, GraphQLDecimal
-from .representations import coerce_to_decimal, represent_float_as_str, type_check_and_str
+from .representations import (
+    EXACT_INT_TYPES, EXACT_STRING_TYPES, coerce_to_decimal, coerce_to_list, has_only_exact_types,
+    represent_float_as_str, type_check_and_str
+)
 
 
 def _safe_match_string(value):
@@ -56,67 +60,139 @@ def _safe_match_decimal(value):
     return 'decimal(' + _safe_match_string(str(decimal_value)) + ')'
 
 
-def _safe_match_list(inner_type, argument_value):
-    """Represent the list of "inner_type" objects in MATCH form."""
+def _safe_match_id(argument_value):
+    """Represent an ID argument in MATCH."""
+    # IDs can be strings or numbers, but the GraphQL library coerces them to strings.
+    # We will follow suit and treat them as strings.
+    if not isinstance(argument_value, six.string_types):
+        if isinstance(argument_value, bytes):  # should only happen in py3
+            argument_value = argument_value.decode('utf-8')
+        else:
+            argument_value = six.text_type(argument_value)
+    return _safe_match_string(argument_value)
+
+
+def _safe_match_int(argument_value):
+    """Represent an int argument in MATCH."""
+    # Special case: in Python, isinstance(True, int) returns True.
+    # Safeguard against this with an explicit check against bool type.
+    if isinstance(argument_value, bool):
+        raise GraphQLInvalidArgumentError(u'Attempting to represent a non-int as an int: '
+                                          u'{}'.format(argument_value))
+    return type_check_and_str(int, argument_value)
+
+
+def _safe_match_boolean(argument_value):
+    """Represent a boolean argument in MATCH."""
+    return type_check_and_str(bool, argument_value)
+
+
+def _bulk_represent_match_strings(values):
+    """Represent a list of strings in MATCH form, or return None if it contains other values."""
+    if not has_only_exact_types(values, EXACT_STRING_TYPES):
+        return None
+
+    # JSON-encoding the entire list escapes each element exactly as _safe_match_string() does,
+    # and separates the elements with commas.
+    return json.dumps(values, separators=(',', ':'))
+
+
+def _bulk_represent_match_ints(values):
+    """Represent a list of ints in MATCH form, or return None if it contains other values."""
+    if not has_only_exact_types(values, EXACT_INT_TYPES):
+        return None
+
+    return u'[' + u','.join(map(str, values)) + u']'
+
+
+def _get_match_list_serializer(inner_type):
+    """Return a function that represents lists of "inner_type" objects in MATCH form."""
     stripped_type = strip_non_null_from_type(inner_type)
     if isinstance(stripped_type, GraphQLList):
-        raise GraphQLInvalidArgumentError(u'MATCH does not currently support nested lists, '
-                                          u'but inner type was {}: '
-                                          u'{}'.format(inner_type, argument_value))
+        def _reject_nested_list(argument_value):
+            """Raise an error, since nested lists are not supported."""
+            raise GraphQLInvalidArgumentError(u'MATCH does not currently support nested lists, '
+                                              u'but inner type was {}: '
+                                              u'{}'.format(inner_type, argument_value))
+        return _reject_nested_list
 
-    if not isinstance(argument_value, list):
-        raise GraphQLInvalidArgumentError(u'Attempting to represent a non-list as a list: '
-                                          u'{}'.format(argument_value))
+    # The element type is resolved once, rather than once per element of every list.
+    element_serializer = get_match_argument_serializer(stripped_type)
+    bulk_serializer = _BULK_MATCH_LIST_SERIALIZERS.get(element_serializer, None)
+
+    def _safe_match_list(argument_value):
+        """Represent the list of "inner_type" objects in MATCH form."""
+        values = coerce_to_list(argument_value)
+
+        if bulk_serializer is not None:
+            represented_list = bulk_serializer(values)
+            if represented_list is not None:
+                return represented_list
+
+        return u'[' + u','.join(map(element_serializer, values)) + u']'
 
-    components = (
-        _safe_match_argument(stripped_type, x)
-        for x in argument_value
-    )
-    return u'[' + u','.join(components) + u']'
+    return _safe_match_list
+
+
+# Element serializer -> function that represents an entire list of such elements at once,
+# returning None if the list contains values that require the element serializer's conversions.
+_BULK_MATCH_LIST_SERIALIZERS = {
+    _safe_match_string: _bulk_represent_match_strings,
+    _safe_match_id: _bulk_represent_match_strings,
+    _safe_match_int: _bulk_represent_match_ints,
+}
 
 
 def _safe_match_argument(expected_type, argument_value):
     """Return a MATCH (SQL) string representing the given argument value."""
+    return get_match_argument_serializer(expected_type)(argument_value)
+
+
+######
+# Public API
+######
+
+def get_match_argument_serializer(expected_type):
+    """Return a function that represents argument values of the given type as MATCH strings.
+
+    The GraphQL type is inspected only once, when the function is created. The returned function
+    only needs to check the type of each argument value and represent it, which makes it suitable
+    for representing many argument values of the same type.
+
+    Args:
+        expected_type: GraphQL type object, the type of the argument values to be represented
+
+    Returns:
+        function that takes an argument value and returns a MATCH (SQL) string representing it,
+        raising GraphQLInvalidArgumentError if the value is not valid for the expected type
+    """
     if GraphQLString.is_same_type(expected_type):
-        return _safe_match_string(argument_value)
+        return _safe_match_string
     elif GraphQLID.is_same_type(expected_type):
-        # IDs can be strings or numbers, but the GraphQL library coerces them to strings.
-        # We will follow suit and treat them as strings.
-        if not isinstance(argument_value, six.string_types):
-            if isinstance(argument_value, bytes):  # should only happen in py3
-                argument_value = argument_value.decode('utf-8')
-            else:
-                argument_value = six.text_type(argument_value)
-        return _safe_match_string(argument_value)
+        return _safe_match_id
     elif GraphQLFloat.is_same_type(expected_type):
-        return represent_float_as_str(argument_value)
+        return represent_float_as_str
     elif GraphQLInt.is_same_type(expected_type):
-        # Special case: in Python, isinstance(True, int) returns True.
-        # Safeguard against this with an explicit check against bool type.
-        if isinstance(argument_value, bool):
-            raise GraphQLInvalidArgumentError(u'Attempting to represent a non-int as an int: '
-                                              u'{}'.format(argument_value))
-        return type_check_and_str(int, argument_value)
+        return _safe_match_int
     elif GraphQLBoolean.is_same_type(expected_type):
-        return type_check_and_str(bool, argument_value)
+        return _safe_match_boolean
     elif GraphQLDecimal.is_same_type(expected_type):
-        return _safe_match_decimal(argument_value)
+        return _safe_match_decimal
     elif GraphQLDate.is_same_type(expected_type):
-        return _safe_match_date_and_datetime(expected_type, (datetime.date,), argument_value)
+        return partial(_safe_match_date_and_datetime, expected_type, (datetime.date,))
     elif GraphQLDateTime.is_same_type(expected_type):
-        return _safe_match_date_and_datetime(expected_type,
-                                             (datetime.datetime, arrow.Arrow), argument_value)
+        return partial(_safe_match_date_and_datetime,
+                       expected_type, (datetime.datetime, arrow.Arrow))
     elif isinstance(expected_type, GraphQLList):
-        return _safe_match_list(expected_type.of_type, argument_value)
+        return _get_match_list_serializer(expected_type.of_type)
     else:
-        raise AssertionError(u'Could not safely represent the requested GraphQL type: '
-                             u'{} {}'.format(expected_type, argument_value))
+        def _unrepresentable_argument(argument_value):
+            """Raise an error, since the expected type is not supported."""
+            raise AssertionError(u'Could not safely represent the requested GraphQL type: '
+                                 u'{} {}'.format(expected_type, argument_value))
+        return _unrepresentable_argument
 
 
-######
-# Public API
-######
-
 def insert_arguments_into_match_query(compilation_result, arguments):
     """Insert the arguments into the compiled MATCH query to form a complete query.
 
@@ -135,7 +211,7 @@ def insert_arguments_into_match_query(compilation_result, arguments):
 
     # The arguments are assumed to have already been validated against the query.
     sanitized_arguments = {
-        key: _safe_match_argument(argument_types[key], value)
+        key: get_match_argument_serializer(argument_types[key])(value)
         for key, value in six.iteritems(arguments)
     }
 
@@ -0,0 +1,207 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Registry of named GraphQL queries, compiled and prepared once when the registry is created."""
+import io
+import json
+import os
+
+import six
+
+from ..compiler import (
+    GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE, DocumentCache, compile_graphql_to_gremlin,
+    compile_graphql_to_match, compile_graphql_to_sql
+)
+from ..exceptions import GraphQLCompilationError, GraphQLInvalidArgumentError
+from .prepared_query import PreparedQuery
+
+
+PERSISTED_QUERY_FILE_SUFFIX = '.graphql'
+
+_SUPPORTED_LANGUAGES = frozenset({MATCH_LANGUAGE, GREMLIN_LANGUAGE, SQL_LANGUAGE})
+
+
+def _compile_query(schema, graphql_string, language, type_equivalence_hints, compiler_metadata,
+                   document_cache):
+    """Compile the query to the given language, returning its CompilationResult."""
+    if language == MATCH_LANGUAGE:
+        return compile_graphql_to_match(
+            schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+            document_cache=document_cache)
+    elif language == GREMLIN_LANGUAGE:
+        return compile_graphql_to_gremlin(
+            schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+            document_cache=document_cache)
+    elif language == SQL_LANGUAGE:
+        return compile_graphql_to_sql(
+            schema, graphql_string, compiler_metadata,
+            type_equivalence_hints=type_equivalence_hints, document_cache=document_cache)
+    else:
+        raise AssertionError(u'Unrecognized language: {}'.format(language))
+
+
+def _read_text_file(file_path):
+    """Return the contents of the UTF-8 encoded text file at the given path."""
+    with io.open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+######
+# Public API
+######
+
+class PersistedQueryRegistry(object):
+    """A set of named GraphQL queries, compiled ahead of time to each of the given languages.
+
+    Clients of a service using the registry only send the ID of a persisted query and its
+    arguments. All queries are parsed, validated and compiled when the registry is created,
+    so that invalid queries are reported at startup, and each compiled query is prepared for
+    fast insertion of arguments. Serving a request therefore never parses or compiles GraphQL.
+    """
+
+    def __init__(self, schema, queries, languages=(MATCH_LANGUAGE,), type_equivalence_hints=None,
+                 compiler_metadata=None):
+        """Compile and prepare each of the given queries for each of the given languages.
+
+        Args:
+            schema: GraphQL schema object describing the schema of the graph to be queried
+            queries: dict, query ID string -> GraphQL query string
+            languages: iterable of languages to compile each query to, any of MATCH_LANGUAGE,
+                       GREMLIN_LANGUAGE and SQL_LANGUAGE
+            type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+                                    See compile_graphql_to_match() for details.
+            compiler_metadata: SQLAlchemy metadata containing tables for use during compilation.
+                               Required for, and only used by, SQL compilation.
+
+        Raises:
+            GraphQLCompilationError if any of the queries fails to parse, validate or compile,
+            listing every query that failed and the reason it failed
+        """
+        languages = tuple(languages)
+        unsupported_languages = set(languages) - _SUPPORTED_LANGUAGES
+        if unsupported_languages:
+            raise AssertionError(u'Unrecognized languages: {}'.format(unsupported_languages))
+        if SQL_LANGUAGE in languages and compiler_metadata is None:
+            raise AssertionError(u'Compiling persisted queries to SQL requires compiler metadata.')
+
+        # Each query is compiled to all languages before moving on to the next query, so a single
+        # cache entry suffices to only parse and validate each query once.
+        document_cache = DocumentCache(max_size=1)
+
+        self._languages = languages
+        self._prepared_queries = {}  # (query ID, language) -> PreparedQuery
+        errors = {}  # query ID -> string describing why the query failed to compile
+        for query_id, graphql_string in six.iteritems(queries):
+            for language in languages:
+                try:
+                    compilation_result = _compile_query(
+                        schema, graphql_string, language, type_equivalence_hints,
+                        compiler_metadata, document_cache)
+                except Exception as e:  # pylint: disable=broad-except
+                    errors[query_id] = u'{}: {}'.format(type(e).__name__, e)
+                    break
+
+                self._prepared_queries[(query_id, language)] = PreparedQuery(compilation_result)
+
+        if errors:
+            raise GraphQLCompilationError(u'Failed to compile persisted queries: '
+                                          u'{}'.format(errors))
+
+        self._query_ids = frozenset(six.iterkeys(queries))
+
+    @classmethod
+    def from_directory(cls, schema, directory_path, **kwargs):
+        """Create a registry from the GraphQL files in the given directory.
+
+        Each file whose name ends in PERSISTED_QUERY_FILE_SUFFIX holds one query, whose ID is
+        the file name without the suffix. Other files and subdirectories are ignored.
+
+        Args:
+            schema: GraphQL schema object describing the schema of the graph to be queried
+            directory_path: string, path to the directory containing the query files
+            **kwargs: other arguments to pass to the PersistedQueryRegistry constructor
+
+        Returns:
+            a PersistedQueryRegistry object
+        """
+        queries = {}
+        for file_name in sorted(os.listdir(directory_path)):
+            file_path = os.path.join(directory_path, file_name)
+            if file_name.endswith(PERSISTED_QUERY_FILE_SUFFIX) and os.path.isfile(file_path):
+                query_id = file_name[:-len(PERSISTED_QUERY_FILE_SUFFIX)]
+                queries[query_id] = _read_text_file(file_path)
+
+        return cls(schema, queries, **kwargs)
+
+    @classmethod
+    def from_manifest(cls, schema, manifest_path, **kwargs):
+        """Create a registry from a manifest file, containing a JSON object of ID -> query string.
+
+        Args:
+            schema: GraphQL schema object describing the schema of the graph to be queried
+            manifest_path: string, path to the JSON manifest file
+            **kwargs: other arguments to pass to the PersistedQueryRegistry constructor
+
+        Returns:
+            a PersistedQueryRegistry object
+        """
+        queries = json.loads(_read_text_file(manifest_path))
+        if not isinstance(queries, dict):
+            raise ValueError(u'Expected the manifest to contain a JSON object of query ID -> '
+                             u'query string, got: {}'.format(type(queries).__name__))
+
+        return cls(schema, queries, **kwargs)
+
+    @property
+    def query_ids(self):
+        """Return the frozenset of IDs of all queries in the registry."""
+        return self._query_ids
+
+    @property
+    def languages(self):
+        """Return the tuple of languages to which every query in the registry was compiled."""
+        return self._languages
+
+    def get_prepared_query(self, query_id, language):
+        """Return the PreparedQuery of the query with the given ID, compiled to the given language.
+
+        Args:
+            query_id: string, the ID of a query in the registry
+            language: string, one of the languages the registry was created with
+
+        Returns:
+            a PreparedQuery object
+
+        Raises:
+            GraphQLInvalidArgumentError if the registry has no query with the given ID
+        """
+        prepared_query = self._prepared_queries.get((query_id, language), None)
+        if prepared_query is None:
+            if query_id not in self._query_ids:
+                raise GraphQLInvalidArgumentError(u'Unknown persisted query ID: '
+                                                  u'{}'.format(query_id))
+            raise AssertionError(u'The persisted queries were not compiled to {}, only to: '
+                                 u'{}'.format(language, self._languages))
+
+        return prepared_query
+
+    def get_compilation_result(self, query_id, language):
+        """Return the CompilationResult of the query with the given ID and language."""
+        return self.get_prepared_query(query_id, language).compilation_result
+
+    def insert_arguments(self, query_id, language, arguments):
+        """Return the query with the given ID in the given language, with the arguments inserted.
+
+        Args:
+            query_id: string, the ID of a query in the registry
+            language: string, one of the languages the registry was created with
+            arguments: dict, mapping argument name to its value, for every parameter
+                       the query expects.
+
+        Returns:
+            a query in the given language with inserted argument data, as returned by
+            PreparedQuery.insert_arguments()
+
+        Raises:
+            GraphQLInvalidArgumentError if the registry has no query with the given ID,
+            or if the arguments are invalid for the query
+        """
+        return self.get_prepared_query(query_id, language).insert_arguments(arguments)
@@ -0,0 +1,181 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Compiled queries preprocessed for fast, repeated insertion of runtime arguments."""
+import string
+
+import six
+
+from ..compiler import GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE
+from .common import _ensure_arguments_are_provided
+from .gremlin_formatting import get_gremlin_argument_serializer
+from .match_formatting import get_match_argument_serializer
+from .sql_formatting import insert_arguments_into_sql_query
+
+
+def _split_match_query(query):
+    """Split a MATCH query into a list of literal segments and a list of parameter names.
+
+    MATCH queries use str.format() syntax for their parameters: a parameter named "foo" is
+    represented as "{foo}", and literal braces are doubled.
+
+    Args:
+        query: string, a compiled MATCH query with placeholders for its parameters
+
+    Returns:
+        tuple (literal segments, parameter names), where the literal segments list is one element
+        longer than the parameter names list. The query with inserted arguments is obtained by
+        interleaving the literal segments with the represented argument values.
+    """
+    literal_segments = []
+    parameter_names = []
+    current_literal = []
+    for literal_text, field_name, format_spec, conversion in string.Formatter().parse(query):
+        current_literal.append(literal_text)
+        if field_name is None:
+            continue
+
+        if format_spec or conversion:
+            raise AssertionError(u'Unexpected format specification for parameter {} found in '
+                                 u'MATCH query: {}'.format(field_name, query))
+
+        literal_segments.append(u''.join(current_literal))
+        parameter_names.append(field_name)
+        current_literal = []
+
+    literal_segments.append(u''.join(current_literal))
+    return literal_segments, parameter_names
+
+
+def _split_gremlin_query(query):
+    """Split a Gremlin query into a list of literal segments and a list of parameter names.
+
+    Gremlin queries use string.Template syntax for their parameters: a parameter named "foo" is
+    represented as "$foo" or "${foo}", and literal dollar signs are doubled.
+
+    Args:
+        query: string, a compiled Gremlin query with placeholders for its parameters
+
+    Returns:
+        tuple (literal segments, parameter names), see _split_match_query() for details
+    """
+    literal_segments = []
+    parameter_names = []
+    current_literal = []
+    last_match_end = 0
+    for match in string.Template.pattern.finditer(query):
+        current_literal.append(query[last_match_end:match.start()])
+        last_match_end = match.end()
+
+        if match.group('escaped') is not None:
+            current_literal.append(string.Template.delimiter)
+            continue
+
+        parameter_name = match.group('named') or match.group('braced')
+        if parameter_name is None:
+            raise AssertionError(u'Invalid placeholder found in Gremlin query at index {}: '
+                                 u'{}'.format(match.start(), query))
+
+        literal_segments.append(u''.join(current_literal))
+        parameter_names.append(parameter_name)
+        current_literal = []
+
+    current_literal.append(query[last_match_end:])
+    literal_segments.append(u''.join(current_literal))
+    return literal_segments, parameter_names
+
+
+######
+# Public API
+######
+
+class PreparedQuery(object):
+    """A compiled query, preprocessed once so that arguments can be inserted into it many times.
+
+    Inserting arguments into a CompilationResult with insert_arguments_into_query() requires
+    re-parsing the query's parameter placeholders and re-dispatching on each argument's type
+    every time. A PreparedQuery splits the query into literal segments and parameter slots,
+    and selects the serializer for each input parameter upfront, so inserting arguments only
+    requires representing each argument value and joining the resulting strings.
+    """
+
+    def __init__(self, compilation_result):
+        """Prepare the given CompilationResult for repeated insertion of arguments.
+
+        Args:
+            compilation_result: a CompilationResult object derived from the GraphQL compiler
+        """
+        self._compilation_result = compilation_result
+        language = compilation_result.language
+        input_metadata = compilation_result.input_metadata
+
+        if language == MATCH_LANGUAGE:
+            literal_segments, parameter_names = _split_match_query(compilation_result.query)
+            argument_serializer_factory = get_match_argument_serializer
+        elif language == GREMLIN_LANGUAGE:
+            literal_segments, parameter_names = _split_gremlin_query(compilation_result.query)
+            argument_serializer_factory = get_gremlin_argument_serializer
+        elif language == SQL_LANGUAGE:
+            # SQL queries are SQLAlchemy objects, whose parameters are bound by SQLAlchemy itself.
+            literal_segments, parameter_names = None, None
+            argument_serializer_factory = None
+        else:
+            raise AssertionError(u'Unrecognized language in compilation result: '
+                                 u'{}'.format(compilation_result))
+
+        if parameter_names is not None:
+            unknown_parameter_names = set(parameter_names) - set(six.iterkeys(input_metadata))
+            if unknown_parameter_names:
+                raise AssertionError(u'The compiled query uses parameters {} that are not present '
+                                     u'in its input metadata: '
+                                     u'{}'.format(unknown_parameter_names, compilation_result))
+
+        # The list of query parts has the literal segments at even indices, and placeholders
+        # for the represented argument values at odd indices.
+        self._query_parts = None
+        self._parameter_slots = None
+        if literal_segments is not None:
+            self._query_parts = [None] * (len(literal_segments) + len(parameter_names))
+            self._query_parts[::2] = literal_segments
+            self._parameter_slots = tuple(
+                (2 * parameter_index + 1, parameter_name)
+                for parameter_index, parameter_name in enumerate(parameter_names)
+            )
+
+        self._argument_serializers = None
+        if argument_serializer_factory is not None:
+            self._argument_serializers = {
+                argument_name: argument_serializer_factory(argument_type)
+                for argument_name, argument_type in six.iteritems(input_metadata)
+            }
+
+    @property
+    def compilation_result(self):
+        """Return the CompilationResult object this PreparedQuery was created from."""
+        return self._compilation_result
+
+    def insert_arguments(self, arguments):
+        """Insert the arguments into the prepared query to form a complete query.
+
+        Args:
+            arguments: dict, mapping argument name to its value, for every parameter
+                       the query expects.
+
+        Returns:
+            a query in the appropriate output language, with inserted argument data: a string
+            for MATCH and Gremlin queries, and a SQLAlchemy Selectable for SQL queries.
+        """
+        _ensure_arguments_are_provided(self._compilation_result.input_metadata, arguments)
+
+        if self._query_parts is None:
+            return insert_arguments_into_sql_query(self._compilation_result, arguments)
+
+        argument_serializers = self._argument_serializers
+        represented_arguments = {
+            argument_name: argument_serializers[argument_name](argument_value)
+            for argument_name, argument_value in six.iteritems(arguments)
+        }
+
+        query_parts = list(self._query_parts)
+        for slot_index, parameter_name in self._parameter_slots:
+            query_parts[slot_index] = represented_arguments[parameter_name]
+
+        return u''.join(query_parts)
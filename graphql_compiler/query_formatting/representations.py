@@ -1,10 +1,21 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Common representations of various types in Gremlin and MATCH (SQL)."""
+import array
 import decimal
 
+import six
+
 from ..exceptions import GraphQLInvalidArgumentError
 
 
+# Python types whose values are represented as strings and ints, respectively, without any
+# conversion. Elements of list arguments are checked against these using exact type equality,
+# which rules out bool values in int lists. Lists containing any other types (such as subclasses,
+# or bytes in Python 3) are represented element by element, applying the usual conversions.
+EXACT_STRING_TYPES = frozenset({six.text_type, str})
+EXACT_INT_TYPES = frozenset({int})
+
+
 def represent_float_as_str(value):
     """Represent a float as a string without losing precision."""
     # In Python 2, calling str() on a float object loses precision:
@@ -47,3 +58,28 @@ def coerce_to_decimal(value):
             return decimal.Decimal(value)
         except decimal.InvalidOperation as e:
             raise GraphQLInvalidArgumentError(e)
+
+
+def coerce_to_list(value):
+    """Return the list argument as a Python list, or raise an error if it is not a list.
+
+    In addition to Python lists, one-dimensional array.array, memoryview and NumPy-style array
+    objects are accepted, and are converted to lists of the equivalent Python values.
+    """
+    if isinstance(value, list):
+        return value
+    elif isinstance(value, (array.array, memoryview)):
+        return value.tolist()
+    elif getattr(value, 'ndim', None) == 1 and callable(getattr(value, 'tolist', None)):
+        # NumPy arrays, and other array types that follow the same conventions.
+        return value.tolist()
+    else:
+        raise GraphQLInvalidArgumentError(u'Attempting to represent a non-list as a list: '
+                                          u'{}'.format(value))
+
+
+def has_only_exact_types(values, allowed_types):
+    """Return True if the type of each of the values is exactly one of the allowed types."""
+    # Computing the set of types in the list is done in a single pass implemented in C,
+    # which is much faster than checking each element individually for very large lists.
+    return set(map(type, values)).issubset(allowed_types)
@@ -2,6 +2,8 @@
 from collections import OrderedDict
 from datetime import date, datetime
 from decimal import Decimal
+import hashlib
+import threading
 
 import arrow
 from graphql import (
@@ -9,6 +11,7 @@ from graphql import (
     GraphQLInterfaceType, GraphQLList, GraphQLNonNull, GraphQLObjectType, GraphQLScalarType,
     GraphQLString
 )
+from graphql.utils.schema_printer import print_schema
 import six
 
 
@@ -294,6 +297,81 @@ EXTENDED_META_FIELD_DEFINITIONS = OrderedDict((
 ))
 
 
+# Maximum number of schema objects whose fingerprints are memoized at any one time.
+# GraphQLSchema objects cannot be weakly referenced, so the memo holds strong references to them;
+# bounding its size ensures that schemas replaced by reloading are eventually released.
+_MAX_MEMOIZED_SCHEMA_FINGERPRINTS = 32
+
+# OrderedDict, id(schema) -> (schema, fingerprint string), least recently used first
+_schema_fingerprint_memo = OrderedDict()
+_schema_fingerprint_memo_lock = threading.Lock()
+
+
+def _compute_schema_definition_digest(schema):
+    """Return a hex digest of the types, fields and directives defined in the schema."""
+    # The printed schema lists types in sorted order, together with all their fields,
+    # field types and implemented interfaces, as well as all non-builtin directives.
+    schema_text = print_schema(schema)
+    if isinstance(schema_text, six.text_type):
+        schema_text = schema_text.encode('utf-8')
+    return hashlib.sha256(schema_text).hexdigest()
+
+
+def _get_schema_definition_digest(schema):
+    """Return the memoized schema definition digest, computing it if necessary."""
+    schema_id = id(schema)
+    with _schema_fingerprint_memo_lock:
+        memo_entry = _schema_fingerprint_memo.pop(schema_id, None)
+        if memo_entry is not None and memo_entry[0] is schema:
+            _schema_fingerprint_memo[schema_id] = memo_entry
+            return memo_entry[1]
+
+    digest = _compute_schema_definition_digest(schema)
+
+    with _schema_fingerprint_memo_lock:
+        _schema_fingerprint_memo[schema_id] = (schema, digest)
+        while len(_schema_fingerprint_memo) > _MAX_MEMOIZED_SCHEMA_FINGERPRINTS:
+            _schema_fingerprint_memo.popitem(last=False)
+
+    return digest
+
+
+def invalidate_schema_fingerprint(schema):
+    """Forget the memoized fingerprint of the schema. Must be called if the schema is mutated."""
+    with _schema_fingerprint_memo_lock:
+        _schema_fingerprint_memo.pop(id(schema), None)
+
+
+def compute_schema_fingerprint(schema, type_equivalence_hints=None):
+    """Return a deterministic fingerprint of the schema and type equivalence hints.
+
+    Two schemas with the same types, fields and directives have the same fingerprint, even if they
+    are distinct objects or were constructed in different processes. The fingerprint is therefore
+    suitable as part of the key of caches that store compilation results.
+
+    The fingerprint of the schema definition is memoized per schema object. Schema objects are
+    assumed to not be mutated after their fingerprint is first computed; if a schema is mutated,
+    invalidate_schema_fingerprint() must be called on it.
+
+    Args:
+        schema: GraphQL schema object, created using the GraphQL library
+        type_equivalence_hints: optional dict of GraphQL interface or type -> GraphQL union.
+
+    Returns:
+        string, the hex digest fingerprint of the schema and type equivalence hints
+    """
+    schema_digest = _get_schema_definition_digest(schema)
+    if not type_equivalence_hints:
+        return schema_digest
+
+    hint_lines = sorted(
+        u'{}={}'.format(key.name, value.name)
+        for key, value in six.iteritems(type_equivalence_hints)
+    )
+    fingerprint_input = u'\n'.join([schema_digest] + hint_lines)
+    return hashlib.sha256(fingerprint_input.encode('utf-8')).hexdigest()
+
+
 def is_meta_field(field_name):
     """Return True if the field is considered a meta field in the schema, and False otherwise."""
     return field_name in ALL_SUPPORTED_META_FIELDS
@@ -336,3 +414,5 @@ def insert_meta_fields_into_existing_schema(graphql_schema):
                                      .format(meta_field_name))
 
             type_obj.fields[meta_field_name] = meta_field
+
+    invalidate_schema_fingerprint(graphql_schema)
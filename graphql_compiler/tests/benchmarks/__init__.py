@@ -0,0 +1 @@
+# Copyright 2019-present Kensho Technologies, LLC.
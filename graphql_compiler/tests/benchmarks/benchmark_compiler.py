@@ -0,0 +1,222 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Benchmark the compilation of every test input query, against every backend.
+
+Run with:
+    python -m graphql_compiler.tests.benchmarks.benchmark_compiler [options]
+
+Reports the latency percentiles of compiling each query, as well as aggregate percentiles over
+all queries of each backend. On Python 3, the peak and retained memory allocated by each
+compilation are also measured using tracemalloc.
+
+The results may be saved to a JSON file with --save-baseline, and compared against a saved
+baseline with --compare-baseline. In comparison mode, the exit status is nonzero if the median
+latency of any query, or the aggregate median latency of any backend, regressed by more than
+the --threshold fraction.
+"""
+import argparse
+from collections import OrderedDict
+import json
+import sys
+
+import six
+from sqlalchemy.dialects import sqlite
+
+from ...compiler import compile_graphql_to_gremlin, compile_graphql_to_match, compile_graphql_to_sql
+from ...compiler.common import GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE
+from ...compiler.instrumentation import get_current_time
+from ...compiler.ir_lowering_sql.metadata import SqlMetadata
+from ..test_data_tools.data_tool import get_animal_schema_sql_metadata
+from ..test_helpers import get_schema, get_test_input_queries
+
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2 has no tracemalloc, so memory is not measured there.
+    tracemalloc = None
+
+
+PERCENTILES = (50, 90, 99)
+DEFAULT_REPETITIONS = 20
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+# Name of the pseudo-query under which the aggregate statistics of each backend are stored.
+AGGREGATE_NAME = '(all queries)'
+
+
+def _compute_percentile(sorted_values, percentile):
+    """Return the given percentile of the sorted values, using the nearest-rank method."""
+    rank = int(round(percentile / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def _summarize_latencies(latencies):
+    """Return an OrderedDict of percentile name -> latency in milliseconds, for the latencies."""
+    sorted_latencies = sorted(latencies)
+    return OrderedDict(
+        ('p{}_ms'.format(percentile), _compute_percentile(sorted_latencies, percentile) * 1000)
+        for percentile in PERCENTILES
+    )
+
+
+def _get_compilation_functions():
+    """Return an OrderedDict of language -> function(schema, query, type equivalence hints)."""
+    _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+    sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+
+    def compile_to_sql(schema, graphql_string, type_equivalence_hints=None):
+        """Compile the query to SQL, using the SQL metadata of the test schema."""
+        return compile_graphql_to_sql(schema, graphql_string, sql_metadata,
+                                      type_equivalence_hints=type_equivalence_hints)
+
+    return OrderedDict((
+        (MATCH_LANGUAGE, compile_graphql_to_match),
+        (GREMLIN_LANGUAGE, compile_graphql_to_gremlin),
+        (SQL_LANGUAGE, compile_to_sql),
+    ))
+
+
+def _measure_memory(compile_query):
+    """Return the (peak, retained) memory in KiB allocated while calling compile_query()."""
+    tracemalloc.start()
+    try:
+        start_memory, _ = tracemalloc.get_traced_memory()
+        result = compile_query()
+        end_memory, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # The result is kept alive until the end, so that the memory it uses counts as retained.
+    del result
+    return (peak_memory - start_memory) / 1024.0, (end_memory - start_memory) / 1024.0
+
+
+def run_benchmarks(repetitions):
+    """Run the benchmarks, returning a dict of language -> query name -> dict of statistics."""
+    schema = get_schema()
+    benchmark_queries = get_test_input_queries(schema)
+
+    results = OrderedDict()
+    for language, compilation_function in six.iteritems(_get_compilation_functions()):
+        language_results = OrderedDict()
+        all_latencies = []
+        skipped_query_names = []
+        for query_name, graphql_string, type_equivalence_hints in benchmark_queries:
+            def compile_query():
+                """Compile the current query to the current language."""
+                return compilation_function(
+                    schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+
+            # The first compilation doubles as a warm-up, and determines if the backend
+            # supports the query at all. Not all test queries are supported by every backend,
+            # nor by the SQL metadata of the test schema, which lacks some of its fields.
+            try:
+                compile_query()
+            except Exception:  # pylint: disable=broad-except
+                skipped_query_names.append(query_name)
+                continue
+
+            latencies = []
+            for _ in six.moves.range(repetitions):
+                start_time = get_current_time()
+                compile_query()
+                latencies.append(get_current_time() - start_time)
+            all_latencies.extend(latencies)
+
+            query_results = _summarize_latencies(latencies)
+            if tracemalloc is not None:
+                peak_memory, retained_memory = _measure_memory(compile_query)
+                query_results['peak_memory_kib'] = peak_memory
+                query_results['retained_memory_kib'] = retained_memory
+            language_results[query_name] = query_results
+
+        if all_latencies:
+            language_results[AGGREGATE_NAME] = _summarize_latencies(all_latencies)
+        results[language] = language_results
+
+        if skipped_query_names:
+            sys.stderr.write(u'{}: skipped {} queries that failed to compile\n'.format(
+                language, len(skipped_query_names)))
+
+    return results
+
+
+def find_regressions(baseline_results, results, threshold):
+    """Return a list of (language, query name, baseline ms, current ms) for regressed queries.
+
+    Args:
+        baseline_results: dict of language -> query name -> dict of statistics, as previously
+                          returned by run_benchmarks()
+        results: dict of language -> query name -> dict of statistics, as returned by
+                 run_benchmarks()
+        threshold: float, the fraction by which the median latency of a query may increase
+                   before it is considered a regression
+
+    Returns:
+        list of (language, query name, baseline median ms, current median ms) tuples,
+        for each query that is present in both results and regressed by more than the threshold
+    """
+    regressions = []
+    for language, language_results in six.iteritems(results):
+        baseline_language_results = baseline_results.get(language, {})
+        for query_name, query_results in six.iteritems(language_results):
+            baseline_query_results = baseline_language_results.get(query_name, None)
+            if baseline_query_results is None:
+                continue
+
+            baseline_median = baseline_query_results['p50_ms']
+            current_median = query_results['p50_ms']
+            if current_median > baseline_median * (1 + threshold):
+                regressions.append((language, query_name, baseline_median, current_median))
+
+    return regressions
+
+
+def _write_results(results):
+    """Write a table of the benchmark results to stdout."""
+    for language, language_results in six.iteritems(results):
+        sys.stdout.write(u'\n{}\n'.format(language))
+        for query_name, query_results in six.iteritems(language_results):
+            statistics = u'  '.join(
+                u'{}={:.3f}'.format(statistic_name, value)
+                for statistic_name, value in six.iteritems(query_results)
+            )
+            sys.stdout.write(u'  {:<70} {}\n'.format(query_name, statistics))
+
+
+def main(argv=None):
+    """Run the benchmarks with the given command-line arguments, and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repetitions', type=int, default=DEFAULT_REPETITIONS,
+                        help='number of timed compilations of each query')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='save the results as a JSON baseline at the given path')
+    parser.add_argument('--compare-baseline', metavar='PATH',
+                        help='compare the results against the JSON baseline at the given path')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='fraction by which a median latency may increase before it is '
+                             'considered a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repetitions)
+    _write_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+
+    if args.compare_baseline:
+        with open(args.compare_baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)
+
+        regressions = find_regressions(baseline_results, results, args.threshold)
+        for language, query_name, baseline_median, current_median in regressions:
+            sys.stdout.write(u'REGRESSION {} {}: median {:.3f} ms -> {:.3f} ms\n'.format(
+                language, query_name, baseline_median, current_median))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Benchmark the insertion of very large list arguments into compiled queries.
+
+Run with:
+    python -m graphql_compiler.tests.benchmarks.benchmark_list_arguments
+"""
+import array
+import sys
+import timeit
+
+from graphql import GraphQLID, GraphQLInt, GraphQLList, GraphQLString
+
+from ...query_formatting.gremlin_formatting import get_gremlin_argument_serializer
+from ...query_formatting.match_formatting import get_match_argument_serializer
+
+
+LIST_SIZES = (1000, 10000, 100000, 1000000)
+REPETITIONS = 3
+
+
+def _make_benchmark_cases(list_size):
+    """Return a list of (case name, serializer, argument value) tuples of the given list size."""
+    int_values = list(range(list_size))
+    string_values = [u'name-{}'.format(i) for i in range(list_size)]
+
+    match_int_serializer = get_match_argument_serializer(GraphQLList(GraphQLInt))
+    match_string_serializer = get_match_argument_serializer(GraphQLList(GraphQLString))
+    match_id_serializer = get_match_argument_serializer(GraphQLList(GraphQLID))
+    gremlin_int_serializer = get_gremlin_argument_serializer(GraphQLList(GraphQLInt))
+    gremlin_string_serializer = get_gremlin_argument_serializer(GraphQLList(GraphQLString))
+
+    return [
+        ('MATCH [Int] list', match_int_serializer, int_values),
+        ('MATCH [Int] array', match_int_serializer, array.array('l', int_values)),
+        ('MATCH [String] list', match_string_serializer, string_values),
+        ('MATCH [ID] list', match_id_serializer, string_values),
+        ('Gremlin [Int] list', gremlin_int_serializer, int_values),
+        ('Gremlin [Int] array', gremlin_int_serializer, array.array('l', int_values)),
+        ('Gremlin [String] list', gremlin_string_serializer, string_values),
+    ]
+
+
+def main():
+    """Time the representation of each list argument, and write the results to stdout."""
+    sys.stdout.write(u'{:<24}{:>12}{:>16}\n'.format(u'case', u'elements', u'best time (ms)'))
+    for list_size in LIST_SIZES:
+        for case_name, serializer, argument_value in _make_benchmark_cases(list_size):
+            timings = timeit.repeat(lambda: serializer(argument_value),
+                                    repeat=REPETITIONS, number=1)
+            sys.stdout.write(u'{:<24}{:>12}{:>16.2f}\n'.format(
+                case_name, list_size, min(timings) * 1000))
+
+
+if __name__ == '__main__':
+    main()
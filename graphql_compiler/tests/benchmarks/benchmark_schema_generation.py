@@ -0,0 +1,84 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Benchmark GraphQL schema generation from synthetic OrientDB schemas of increasing size.
+
+Run with:
+    python -m graphql_compiler.tests.benchmarks.benchmark_schema_generation [class counts...]
+
+For each schema size, reports the time taken by toposort_classes(), SchemaGraph construction and
+get_graphql_schema_from_schema_graph(), both in total and per class. A per-class time that grows
+with the schema size indicates superlinear behavior.
+
+The GraphQL library builds the type map of a schema recursively, to a depth that grows with
+the number of connected types. The benchmark therefore runs in a thread with a large stack and
+a correspondingly raised recursion limit.
+"""
+import argparse
+import sys
+import threading
+
+from ...compiler.instrumentation import get_current_time
+from ...schema_generation.graphql_schema import get_graphql_schema_from_schema_graph
+from ...schema_generation.schema_graph import SchemaGraph
+from ...schema_generation.utils import toposort_classes
+from .synthetic_schema import generate_orientdb_schema_data
+
+
+DEFAULT_CLASS_COUNTS = (100, 1000, 10000, 50000)
+
+BENCHMARK_THREAD_STACK_SIZE = 1024 * 1024 * 1024
+BENCHMARK_RECURSION_LIMIT = 1000000
+
+
+def _time_call(function, *args):
+    """Return (result, elapsed seconds) of calling the function with the given arguments."""
+    start_time = get_current_time()
+    result = function(*args)
+    return result, get_current_time() - start_time
+
+
+def run_benchmarks(class_counts, inheritance_depth, edges_per_class, properties_per_class):
+    """Generate a schema of each of the given sizes, and write the time taken by each step."""
+    sys.stdout.write(u'{:>8}  {:<40}{:>14}{:>18}\n'.format(
+        u'classes', u'step', u'total (s)', u'per class (us)'))
+    for class_count in class_counts:
+        schema_data = generate_orientdb_schema_data(
+            class_count, inheritance_depth=inheritance_depth, edges_per_class=edges_per_class,
+            properties_per_class=properties_per_class)
+
+        _, toposort_time = _time_call(toposort_classes, schema_data)
+        schema_graph, schema_graph_time = _time_call(SchemaGraph, schema_data)
+        _, graphql_schema_time = _time_call(
+            get_graphql_schema_from_schema_graph, schema_graph, {}, set())
+
+        step_times = (
+            (u'toposort_classes', toposort_time),
+            (u'SchemaGraph.__init__', schema_graph_time),
+            (u'get_graphql_schema_from_schema_graph', graphql_schema_time),
+        )
+        for step_name, elapsed_seconds in step_times:
+            sys.stdout.write(u'{:>8}  {:<40}{:>14.3f}{:>18.1f}\n'.format(
+                class_count, step_name, elapsed_seconds, elapsed_seconds / class_count * 1e6))
+
+
+def main(argv=None):
+    """Run the benchmarks with the given command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('class_counts', type=int, nargs='*', default=DEFAULT_CLASS_COUNTS,
+                        help='numbers of vertex and edge classes of the generated schemas')
+    parser.add_argument('--inheritance-depth', type=int, default=3)
+    parser.add_argument('--edges-per-class', type=int, default=2)
+    parser.add_argument('--properties-per-class', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    benchmark_args = (args.class_counts, args.inheritance_depth, args.edges_per_class,
+                      args.properties_per_class)
+
+    sys.setrecursionlimit(BENCHMARK_RECURSION_LIMIT)
+    threading.stack_size(BENCHMARK_THREAD_STACK_SIZE)
+    benchmark_thread = threading.Thread(target=run_benchmarks, args=benchmark_args)
+    benchmark_thread.start()
+    benchmark_thread.join()
+
+
+if __name__ == '__main__':
+    main()
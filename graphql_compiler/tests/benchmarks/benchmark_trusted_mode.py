@@ -0,0 +1,72 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Benchmark the lowering and emission of the test input queries, with and without trusted mode.
+
+Run with:
+    python -m graphql_compiler.tests.benchmarks.benchmark_trusted_mode
+
+For each of the MATCH and Gremlin backends, the IR of all test input queries is produced once,
+and then lowered and emitted over and over, with trusted mode off and on. The SQL backend runs
+neither the IR sanity checks nor the re-validation skipped in trusted mode, so it is not measured.
+"""
+import sys
+import timeit
+
+from ...compiler.common import _BACKEND_FUNCTIONS, GREMLIN_LANGUAGE, MATCH_LANGUAGE, _lower_and_emit
+from ...compiler.compiler_frontend import graphql_to_ir
+from ...compiler.trusted_mode import trusted_mode
+from ..test_helpers import get_schema, get_test_input_queries
+
+
+REPETITIONS = 5
+
+
+def _get_supported_irs(language, schema):
+    """Return a list of (IrAndMetadata, type equivalence hints) of the queries the backend supports.
+
+    Not all test queries are supported by every backend, so the unsupported ones are skipped.
+    """
+    lowering_func, query_emitter_func = _BACKEND_FUNCTIONS[language]
+    supported_irs = []
+    for _, graphql_string, type_equivalence_hints in get_test_input_queries(schema):
+        ir_and_metadata = graphql_to_ir(
+            schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+        try:
+            _lower_and_emit(language, lowering_func, query_emitter_func, ir_and_metadata,
+                            type_equivalence_hints, None)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        supported_irs.append((ir_and_metadata, type_equivalence_hints))
+    return supported_irs
+
+
+def main():
+    """Time the lowering and emission of all test queries in each mode, and write the results."""
+    schema = get_schema()
+
+    sys.stdout.write(u'best of {} runs\n'.format(REPETITIONS))
+    sys.stdout.write(u'{:<10}{:>10}{:>16}{:>16}{:>12}\n'.format(
+        u'language', u'queries', u'default (ms)', u'trusted (ms)', u'saving'))
+    for language in (MATCH_LANGUAGE, GREMLIN_LANGUAGE):
+        lowering_func, query_emitter_func = _BACKEND_FUNCTIONS[language]
+        supported_irs = _get_supported_irs(language, schema)
+
+        def lower_and_emit_all():
+            """Lower and emit all supported test queries to the current language."""
+            for ir_and_metadata, type_equivalence_hints in supported_irs:
+                _lower_and_emit(language, lowering_func, query_emitter_func, ir_and_metadata,
+                                type_equivalence_hints, None)
+
+        with trusted_mode(False):
+            default_time = min(timeit.repeat(
+                lower_and_emit_all, repeat=REPETITIONS, number=1))
+        with trusted_mode(True):
+            trusted_time = min(timeit.repeat(
+                lower_and_emit_all, repeat=REPETITIONS, number=1))
+
+        sys.stdout.write(u'{:<10}{:>10}{:>16.1f}{:>16.1f}{:>11.1f}%\n'.format(
+            language, len(supported_irs), default_time * 1000, trusted_time * 1000,
+            (1 - trusted_time / default_time) * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Benchmark the validation of the test input queries, with each set of validation rules.
+
+Run with:
+    python -m graphql_compiler.tests.benchmarks.benchmark_validation
+
+Compares graphql-core's full list of validation rules against COMPILER_VALIDATION_RULES, both for
+validation alone and for the compiler frontend as a whole, over all test input queries.
+"""
+from collections import OrderedDict
+import sys
+import timeit
+
+from graphql.language.parser import parse
+
+from ...compiler.compiler_frontend import _validate_schema_and_ast, graphql_to_ir
+from ...compiler.validation import COMPILER_VALIDATION_RULES
+from ..test_helpers import get_schema, get_test_input_queries
+
+
+REPETITIONS = 5
+
+# Rule set name -> validation rules to pass to the compiler, where None means all default rules.
+RULE_SETS = OrderedDict((
+    ('all graphql-core rules', None),
+    ('COMPILER_VALIDATION_RULES', COMPILER_VALIDATION_RULES),
+))
+
+
+def main():
+    """Time the validation of all test queries with each rule set, and write the results."""
+    schema = get_schema()
+    benchmark_queries = [
+        (graphql_string, type_equivalence_hints)
+        for _, graphql_string, type_equivalence_hints in get_test_input_queries(schema)
+    ]
+    documents = [parse(graphql_string) for graphql_string, _ in benchmark_queries]
+
+    def validate_all(validation_rules):
+        """Validate all test queries with the given rules."""
+        for document in documents:
+            _validate_schema_and_ast(schema, document, validation_rules=validation_rules)
+
+    def convert_all_to_ir(validation_rules):
+        """Parse, validate and convert all test queries to IR, with the given rules."""
+        for graphql_string, type_equivalence_hints in benchmark_queries:
+            graphql_to_ir(schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+                          validation_rules=validation_rules)
+
+    sys.stdout.write(u'{} test queries, best of {} runs\n'.format(len(documents), REPETITIONS))
+    sys.stdout.write(u'{:<28}{:>18}{:>18}\n'.format(u'rules', u'validation (ms)', u'frontend (ms)'))
+    for rule_set_name, validation_rules in RULE_SETS.items():
+        validation_time = min(timeit.repeat(
+            lambda: validate_all(validation_rules), repeat=REPETITIONS, number=1))
+        frontend_time = min(timeit.repeat(
+            lambda: convert_all_to_ir(validation_rules), repeat=REPETITIONS, number=1))
+        sys.stdout.write(u'{:<28}{:>18.1f}{:>18.1f}\n'.format(
+            rule_set_name, validation_time * 1000, frontend_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
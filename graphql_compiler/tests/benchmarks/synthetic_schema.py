@@ -0,0 +1,104 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+"""Generate synthetic OrientDB schema data of configurable size, for benchmarking."""
+import random
+
+import six
+
+from ...schema_generation.schema_properties import (
+    ORIENTDB_BASE_EDGE_CLASS_NAME, ORIENTDB_BASE_VERTEX_CLASS_NAME, PROPERTY_TYPE_DATE_ID,
+    PROPERTY_TYPE_DATETIME_ID, PROPERTY_TYPE_DOUBLE_ID, PROPERTY_TYPE_EMBEDDED_LIST_ID,
+    PROPERTY_TYPE_EMBEDDED_SET_ID, PROPERTY_TYPE_INTEGER_ID, PROPERTY_TYPE_LINK_ID,
+    PROPERTY_TYPE_STRING_ID
+)
+
+
+# Property definitions without a name, cycled through when generating the properties of a class.
+_PROPERTY_TEMPLATES = (
+    {'type': PROPERTY_TYPE_STRING_ID},
+    {'type': PROPERTY_TYPE_INTEGER_ID},
+    {'type': PROPERTY_TYPE_DOUBLE_ID},
+    {'type': PROPERTY_TYPE_DATE_ID},
+    {'type': PROPERTY_TYPE_DATETIME_ID},
+    {'type': PROPERTY_TYPE_EMBEDDED_SET_ID, 'linkedType': PROPERTY_TYPE_STRING_ID,
+     'defaultValue': '{}'},
+    {'type': PROPERTY_TYPE_EMBEDDED_LIST_ID, 'linkedType': PROPERTY_TYPE_INTEGER_ID,
+     'defaultValue': '[]'},
+)
+
+
+def _make_properties(class_name, properties_per_class):
+    """Return a list of property definitions for the given class, with unique property names."""
+    properties = []
+    for property_index in six.moves.range(properties_per_class):
+        property_definition = dict(_PROPERTY_TEMPLATES[property_index % len(_PROPERTY_TEMPLATES)])
+        property_definition['name'] = u'{}_property_{}'.format(class_name, property_index)
+        properties.append(property_definition)
+    return properties
+
+
+def generate_orientdb_schema_data(class_count, inheritance_depth=3, edges_per_class=2,
+                                  properties_per_class=5, random_seed=0):
+    """Return a list of class definitions in OrientDB schema data format, as used by SchemaGraph.
+
+    The generated classes are vertex and edge classes, in addition to the base V and E classes.
+    For each vertex class, edges_per_class edge classes connect it to randomly chosen vertex
+    classes. Vertex classes form inheritance chains of inheritance_depth classes, where the first
+    class of each chain is abstract and inherits from V. The class definitions are returned in
+    random order, so that sorting them by inheritance requires non-trivial work.
+
+    Args:
+        class_count: int, the number of vertex and edge classes to generate
+        inheritance_depth: int, the number of vertex classes in each inheritance chain
+        edges_per_class: int, the number of edge classes per vertex class
+        properties_per_class: int, the number of properties defined by each vertex class
+        random_seed: int, seed for the choice of edge endpoints and the order of the classes
+
+    Returns:
+        list of dicts, the schema data describing the generated classes
+    """
+    if class_count < 1 or inheritance_depth < 1 or edges_per_class < 0:
+        raise AssertionError(u'Invalid synthetic schema parameters: {} {} {}'.format(
+            class_count, inheritance_depth, edges_per_class))
+
+    random_generator = random.Random(random_seed)
+    vertex_count = max(1, class_count // (1 + edges_per_class))
+    edge_count = class_count - vertex_count
+
+    vertex_class_names = [u'Vertex_{}'.format(index) for index in six.moves.range(vertex_count)]
+    schema_data = [
+        {'name': ORIENTDB_BASE_VERTEX_CLASS_NAME, 'abstract': False, 'properties': []},
+        {'name': ORIENTDB_BASE_EDGE_CLASS_NAME, 'abstract': False, 'properties': []},
+    ]
+
+    for index, class_name in enumerate(vertex_class_names):
+        is_chain_start = index % inheritance_depth == 0
+        schema_data.append({
+            'name': class_name,
+            'abstract': is_chain_start and inheritance_depth > 1,
+            'superClasses': [
+                ORIENTDB_BASE_VERTEX_CLASS_NAME if is_chain_start else vertex_class_names[index - 1]
+            ],
+            'properties': _make_properties(class_name, properties_per_class),
+        })
+
+    for index in six.moves.range(edge_count):
+        schema_data.append({
+            'name': u'Edge_{}'.format(index),
+            'abstract': False,
+            'superClass': ORIENTDB_BASE_EDGE_CLASS_NAME,
+            'properties': [
+                {
+                    'name': 'out',
+                    'type': PROPERTY_TYPE_LINK_ID,
+                    'linkedClass': vertex_class_names[index % vertex_count],
+                },
+                {
+                    'name': 'in',
+                    'type': PROPERTY_TYPE_LINK_ID,
+                    'linkedClass': random_generator.choice(vertex_class_names),
+                },
+            ],
+        })
+
+    random_generator.shuffle(schema_data)
+    return schema_data
@@ -0,0 +1,156 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import threading
+import unittest
+
+import six
+from sqlalchemy.dialects import sqlite
+
+from .. import graphql_to_gremlin, graphql_to_match, graphql_to_sql, trusted_mode
+from ..compiler import CompilationCache, CompilationProfile
+from ..compiler.instrumentation import SANITY_CHECKS_PHASE
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from ..exceptions import GraphQLCompilationError, GraphQLInvalidArgumentError
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import compare_compilation_results, get_schema
+
+
+if six.PY3:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .. import graphql_to_gremlin_async, graphql_to_match_async, graphql_to_sql_async
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        name @output(out_name: "animal_name")
+    }
+}'''
+
+PARAMETERS = {'wanted': 'Felix'}
+
+
+if six.PY3:
+    class _CountingExecutor(ThreadPoolExecutor):
+        """A thread pool executor that counts the tasks submitted to it."""
+
+        def __init__(self, *args, **kwargs):
+            """Create a new _CountingExecutor with no submitted tasks."""
+            super(_CountingExecutor, self).__init__(*args, **kwargs)
+            self.submitted_task_count = 0
+
+        def submit(self, *args, **kwargs):
+            """Count the task, then submit it to the thread pool."""
+            self.submitted_task_count += 1
+            return super(_CountingExecutor, self).submit(*args, **kwargs)
+
+
+@unittest.skipUnless(six.PY3, 'The asyncio API is only available on Python 3.')
+class AsyncApiTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema, and a new event loop and executor for each test."""
+        self.schema = get_schema()
+        self.loop = asyncio.new_event_loop()
+        self.executor = _CountingExecutor(max_workers=2)
+
+    def tearDown(self):
+        """Close the event loop and shut down the executor."""
+        self.loop.close()
+        self.executor.shutdown()
+
+    def test_async_compilation_matches_sync_compilation(self):
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+        sql_query = '''{
+            Animal {
+                name @output(out_name: "animal_name")
+                     @filter(op_name: "=", value: ["$wanted"])
+            }
+        }'''
+
+        match_result = self.loop.run_until_complete(graphql_to_match_async(
+            self.schema, QUERY, PARAMETERS, executor=self.executor, loop=self.loop))
+        gremlin_result = self.loop.run_until_complete(graphql_to_gremlin_async(
+            self.schema, QUERY, PARAMETERS, executor=self.executor, loop=self.loop))
+        sql_result = self.loop.run_until_complete(graphql_to_sql_async(
+            self.schema, sql_query, PARAMETERS, sql_metadata,
+            executor=self.executor, loop=self.loop))
+
+        compare_compilation_results(
+            self, graphql_to_match(self.schema, QUERY, PARAMETERS), match_result)
+        compare_compilation_results(
+            self, graphql_to_gremlin(self.schema, QUERY, PARAMETERS), gremlin_result)
+        self.assertEqual(
+            str(graphql_to_sql(self.schema, sql_query, PARAMETERS, sql_metadata).query),
+            str(sql_result.query))
+        self.assertEqual(3, self.executor.submitted_task_count)
+
+    def test_cached_queries_do_not_leave_the_event_loop(self):
+        cache = CompilationCache()
+
+        first_result = self.loop.run_until_complete(graphql_to_match_async(
+            self.schema, QUERY, PARAMETERS, compilation_cache=cache,
+            executor=self.executor, loop=self.loop))
+        self.assertEqual(1, self.executor.submitted_task_count)
+
+        result_future = graphql_to_match_async(
+            self.schema, QUERY, {'wanted': 'Garfield'}, compilation_cache=cache,
+            executor=self.executor, loop=self.loop)
+
+        # The future is resolved immediately, without running the loop or the executor.
+        self.assertTrue(result_future.done())
+        self.assertEqual(1, self.executor.submitted_task_count)
+        self.assertIn('Felix', first_result.query)
+        self.assertIn('Garfield', result_future.result().query)
+        self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+
+    def test_trusted_mode_applies_in_executor(self):
+        trusted_profile = CompilationProfile()
+        with trusted_mode():
+            result_future = graphql_to_match_async(
+                self.schema, QUERY, PARAMETERS, instrumentation=trusted_profile,
+                executor=self.executor, loop=self.loop)
+        self.loop.run_until_complete(result_future)
+        self.assertNotIn(SANITY_CHECKS_PHASE, trusted_profile.phase_times)
+
+        default_profile = CompilationProfile()
+        self.loop.run_until_complete(graphql_to_match_async(
+            self.schema, QUERY, PARAMETERS, instrumentation=default_profile,
+            executor=self.executor, loop=self.loop))
+        self.assertIn(SANITY_CHECKS_PHASE, default_profile.phase_times)
+
+    def test_errors_are_raised_when_awaited(self):
+        invalid_query = '''{
+            Animal {
+                name
+            }
+        }'''
+        with self.assertRaises(GraphQLCompilationError):
+            self.loop.run_until_complete(graphql_to_match_async(
+                self.schema, invalid_query, {}, executor=self.executor, loop=self.loop))
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            self.loop.run_until_complete(graphql_to_match_async(
+                self.schema, QUERY, {}, executor=self.executor, loop=self.loop))
+
+    def test_cancellation_before_compilation_starts(self):
+        blocking_executor = ThreadPoolExecutor(max_workers=1)
+        released = threading.Event()
+        blocking_executor.submit(released.wait)
+
+        cache = CompilationCache()
+        result_future = graphql_to_match_async(
+            self.schema, QUERY, PARAMETERS, compilation_cache=cache,
+            executor=blocking_executor, loop=self.loop)
+        result_future.cancel()
+
+        # Cancellation propagates to the compilation through callbacks run by the event loop.
+        self.loop.run_until_complete(asyncio.sleep(0.01, loop=self.loop))
+        released.set()
+        blocking_executor.shutdown()
+
+        self.assertTrue(result_future.cancelled())
+
+        # The compilation never ran, so nothing was stored in the cache.
+        self.assertEqual(0, len(cache))
@@ -0,0 +1,114 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+import six
+from sqlalchemy.dialects import sqlite
+
+from . import test_input_data
+from ..compiler import (
+    GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE, compile_graphql_to_gremlin,
+    compile_graphql_to_match, compile_many
+)
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from ..exceptions import GraphQLCompilationError
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import compare_input_metadata, get_schema
+
+
+INVALID_QUERY = '''{
+    Animal {
+        name
+    }
+}'''
+
+
+class BatchCompilationTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def _get_type_equivalence_hints(self):
+        """Return the type equivalence hints used by the test inputs."""
+        return {
+            self.schema.get_type('Event'):
+                self.schema.get_type('Union__BirthEvent__Event__FeedingEvent'),
+        }
+
+    def _get_test_queries(self):
+        """Return a list of valid test queries, using the type equivalence hints where needed."""
+        test_data_functions = (
+            test_input_data.immediate_output,
+            test_input_data.multiple_filters,
+            test_input_data.filter_in_optional_block,
+            test_input_data.in_collection_op_filter_with_variable,
+            test_input_data.fold_on_output_variable,
+            test_input_data.coercion_to_union_base_type_inside_fold,
+        )
+        return [test_data_function().graphql_input for test_data_function in test_data_functions]
+
+    def test_parallel_compilation_matches_serial_compilation(self):
+        type_equivalence_hints = self._get_type_equivalence_hints()
+        queries = self._get_test_queries()
+
+        compilation_functions = {
+            MATCH_LANGUAGE: compile_graphql_to_match,
+            GREMLIN_LANGUAGE: compile_graphql_to_gremlin,
+        }
+        for language, compilation_function in six.iteritems(compilation_functions):
+            batch_results = compile_many(self.schema, queries, language, workers=2,
+                                         type_equivalence_hints=type_equivalence_hints)
+
+            self.assertEqual(len(queries), len(batch_results))
+            for query, batch_result in zip(queries, batch_results):
+                expected_result = compilation_function(
+                    self.schema, query, type_equivalence_hints=type_equivalence_hints)
+                compilation_result = batch_result.compilation_result
+                self.assertIsNone(batch_result.error)
+                self.assertEqual(expected_result.query, compilation_result.query)
+                self.assertEqual(language, compilation_result.language)
+                self.assertEqual(expected_result.output_metadata,
+                                 compilation_result.output_metadata)
+                compare_input_metadata(
+                    self, expected_result.input_metadata, compilation_result.input_metadata)
+
+                # The types of the returned metadata belong to the caller's schema.
+                for input_type in six.itervalues(compilation_result.input_metadata):
+                    named_type = input_type
+                    while hasattr(named_type, 'of_type'):
+                        named_type = named_type.of_type
+                    self.assertIs(self.schema.get_type(named_type.name), named_type)
+
+    def test_errors_are_captured_per_query(self):
+        queries = self._get_test_queries()
+        queries.insert(1, INVALID_QUERY)
+
+        for workers in (1, 2):
+            batch_results = compile_many(self.schema, queries, MATCH_LANGUAGE, workers=workers,
+                                         type_equivalence_hints=self._get_type_equivalence_hints())
+
+            self.assertEqual(len(queries), len(batch_results))
+            self.assertIsNone(batch_results[1].compilation_result)
+            self.assertIsInstance(batch_results[1].error, GraphQLCompilationError)
+            for index, batch_result in enumerate(batch_results):
+                if index != 1:
+                    self.assertIsNone(batch_result.error)
+                    self.assertIsNotNone(batch_result.compilation_result)
+
+    def test_sql_compilation_is_serial(self):
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+        queries = [test_input_data.immediate_output().graphql_input, INVALID_QUERY]
+
+        batch_results = compile_many(self.schema, queries, SQL_LANGUAGE, workers=2,
+                                     compiler_metadata=sql_metadata)
+
+        self.assertIsNone(batch_results[0].error)
+        self.assertEqual(SQL_LANGUAGE, batch_results[0].compilation_result.language)
+        self.assertIsInstance(batch_results[1].error, GraphQLCompilationError)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            compile_many(self.schema, [], MATCH_LANGUAGE, workers=0)
+        with self.assertRaises(AssertionError):
+            compile_many(self.schema, [], 'unknown language')
+        self.assertEqual([], compile_many(self.schema, [], MATCH_LANGUAGE))
@@ -0,0 +1,305 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import threading
+import time
+import unittest
+
+from .. import graphql_to_match
+from ..compiler import (
+    CompilationCache, CompilationCacheStats, CompilationInstrumentation, CompilationProfile,
+    compile_graphql_to_gremlin, compile_graphql_to_match
+)
+from ..compiler.common import _compile_single_flight, _look_up_compilation
+from ..exceptions import GraphQLCompilationError
+from .test_helpers import get_schema
+
+
+FIRST_QUERY = '''{
+    Animal {
+        name @output(out_name: "animal_name")
+    }
+}'''
+
+SECOND_QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        uuid @output(out_name: "animal_uuid")
+    }
+}'''
+
+THIRD_QUERY = '''{
+    Species {
+        name @output(out_name: "species_name")
+    }
+}'''
+
+
+class _CountingCompilationCache(CompilationCache):
+    """A CompilationCache that counts the lookups performed on it."""
+
+    def __init__(self, *args, **kwargs):
+        """Create a new _CountingCompilationCache with no lookups."""
+        super(_CountingCompilationCache, self).__init__(*args, **kwargs)
+        self.lookup_count = 0
+        self._lookup_count_lock = threading.Lock()
+
+    def get(self, cache_key):
+        """Count the lookup, then look up the key in the cache."""
+        with self._lookup_count_lock:
+            self.lookup_count += 1
+        return super(_CountingCompilationCache, self).get(cache_key)
+
+
+class _BlockingInstrumentation(CompilationInstrumentation):
+    """Instrumentation that blocks the compilation at its first phase, until it is released."""
+
+    def __init__(self):
+        """Create a new _BlockingInstrumentation that has not started blocking yet."""
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def record_phase_time(self, phase_name, elapsed_seconds):
+        """Block until the compilation is released."""
+        self.started.set()
+        self.released.wait()
+
+
+class _Interruption(BaseException):
+    """An exception that is not an error, like KeyboardInterrupt or SystemExit."""
+
+
+class CompilationCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def test_repeated_compilation_is_cached(self):
+        cache = CompilationCache(max_size=10)
+
+        first_result = compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+        second_result = compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+
+        self.assertIs(first_result, second_result)
+        self.assertEqual(
+            CompilationCacheStats(hits=1, misses=1, evictions=0, size=1, max_size=10),
+            cache.stats)
+        self.assertEqual(compile_graphql_to_match(self.schema, FIRST_QUERY), first_result)
+
+    def test_cache_key_includes_language(self):
+        cache = CompilationCache()
+
+        match_result = compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+        gremlin_result = compile_graphql_to_gremlin(
+            self.schema, FIRST_QUERY, compilation_cache=cache)
+
+        self.assertNotEqual(match_result.language, gremlin_result.language)
+        self.assertEqual(2, cache.stats.misses)
+        self.assertEqual(0, cache.stats.hits)
+
+    def test_cache_key_is_based_on_schema_contents(self):
+        cache = CompilationCache()
+
+        first_result = compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+
+        # An identical schema object, e.g. one produced by reloading the schema, shares entries.
+        identical_schema_result = compile_graphql_to_match(
+            get_schema(), FIRST_QUERY, compilation_cache=cache)
+        self.assertIs(first_result, identical_schema_result)
+
+        # Type equivalence hints affect compilation, so they are part of the key.
+        type_equivalence_hints = {
+            self.schema.get_type('Event'):
+                self.schema.get_type('Union__BirthEvent__Event__FeedingEvent'),
+        }
+        compile_graphql_to_match(self.schema, FIRST_QUERY,
+                                 type_equivalence_hints=type_equivalence_hints,
+                                 compilation_cache=cache)
+        self.assertEqual(
+            CompilationCacheStats(hits=1, misses=2, evictions=0, size=2, max_size=1000),
+            cache.stats)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = CompilationCache(max_size=2)
+
+        compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+        compile_graphql_to_match(self.schema, SECOND_QUERY, compilation_cache=cache)
+
+        # Use the first query again, making the second query the least recently used one.
+        compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+        compile_graphql_to_match(self.schema, THIRD_QUERY, compilation_cache=cache)
+        self.assertEqual(
+            CompilationCacheStats(hits=1, misses=3, evictions=1, size=2, max_size=2),
+            cache.stats)
+
+        compile_graphql_to_match(self.schema, FIRST_QUERY, compilation_cache=cache)
+        self.assertEqual(2, cache.stats.hits)
+
+        compile_graphql_to_match(self.schema, SECOND_QUERY, compilation_cache=cache)
+        self.assertEqual(4, cache.stats.misses)
+
+    def test_cached_results_are_parameterized_independently(self):
+        cache = CompilationCache()
+
+        first_query = graphql_to_match(
+            self.schema, SECOND_QUERY, {'wanted': 'Felix'}, compilation_cache=cache).query
+        second_query = graphql_to_match(
+            self.schema, SECOND_QUERY, {'wanted': 'Garfield'}, compilation_cache=cache).query
+
+        self.assertIn('Felix', first_query)
+        self.assertIn('Garfield', second_query)
+        self.assertEqual(1, cache.stats.hits)
+
+    def test_compilation_errors_are_not_cached(self):
+        cache = CompilationCache()
+        invalid_query = '''{
+            Animal {
+                name
+            }
+        }'''
+
+        for _ in range(2):
+            with self.assertRaises(GraphQLCompilationError):
+                compile_graphql_to_match(self.schema, invalid_query, compilation_cache=cache)
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(2, cache.stats.misses)
+
+    def test_invalid_max_size(self):
+        for invalid_max_size in (0, -1, 1.5, None):
+            with self.assertRaises(ValueError):
+                CompilationCache(max_size=invalid_max_size)
+
+    def _compile_concurrently(self, query, follower_count):
+        """Compile the query in many threads while a first compilation of it is in flight.
+
+        Returns:
+            tuple (list of results or errors of all threads, list of the followers' profiles)
+        """
+        cache = _CountingCompilationCache()
+        blocking_instrumentation = _BlockingInstrumentation()
+        follower_profiles = [CompilationProfile() for _ in range(follower_count)]
+        outcomes = [None] * (follower_count + 1)
+
+        def compile_query(thread_index, instrumentation):
+            """Compile the query, storing the result or error raised in the outcomes list."""
+            try:
+                outcomes[thread_index] = compile_graphql_to_match(
+                    self.schema, query, compilation_cache=cache, instrumentation=instrumentation)
+            except Exception as e:  # pylint: disable=broad-except
+                outcomes[thread_index] = e
+
+        threads = [threading.Thread(target=compile_query, args=(0, blocking_instrumentation))]
+        threads[0].start()
+        blocking_instrumentation.started.wait()
+
+        threads.extend(
+            threading.Thread(target=compile_query, args=(thread_index + 1, profile))
+            for thread_index, profile in enumerate(follower_profiles)
+        )
+        for thread in threads[1:]:
+            thread.start()
+
+        # Once all threads missed the cache, they can only wait for the in-flight compilation.
+        while cache.lookup_count < follower_count + 1:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        blocking_instrumentation.released.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(follower_count + 1, cache.stats.misses)
+        return outcomes, follower_profiles
+
+    def test_concurrent_compilations_are_deduplicated(self):
+        outcomes, follower_profiles = self._compile_concurrently(FIRST_QUERY, 8)
+
+        for outcome in outcomes:
+            self.assertIs(outcomes[0], outcome)
+        self.assertEqual(compile_graphql_to_match(self.schema, FIRST_QUERY), outcomes[0])
+
+        # Only the first thread compiled the query.
+        for profile in follower_profiles:
+            self.assertEqual({}, profile.phase_times)
+
+    def test_concurrent_compilations_share_errors(self):
+        invalid_query = '''{
+            Animal {
+                name
+            }
+        }'''
+        outcomes, follower_profiles = self._compile_concurrently(invalid_query, 8)
+
+        self.assertIsInstance(outcomes[0], GraphQLCompilationError)
+        for outcome in outcomes:
+            self.assertIs(outcomes[0], outcome)
+        for profile in follower_profiles:
+            self.assertEqual({}, profile.phase_times)
+
+    def test_interrupted_compilation_is_shared(self):
+        cache = _CountingCompilationCache()
+        cache_key = ('interrupted compilation',)
+        compilation_started = threading.Event()
+        compilation_released = threading.Event()
+        outcomes = [None, None]
+
+        def interrupted_compilation():
+            """Block until released, then get interrupted."""
+            compilation_started.set()
+            compilation_released.wait()
+            raise _Interruption()
+
+        def compile_in_thread(thread_index):
+            """Compile, storing the result or exception raised in the outcomes list."""
+            try:
+                outcomes[thread_index] = _compile_single_flight(
+                    cache, cache_key, interrupted_compilation,
+                    _look_up_compilation(cache, cache_key)[1])
+            except BaseException as e:  # pylint: disable=broad-except
+                outcomes[thread_index] = e
+
+        threads = [threading.Thread(target=compile_in_thread, args=(0,))]
+        threads[0].start()
+        compilation_started.wait()
+        threads.append(threading.Thread(target=compile_in_thread, args=(1,)))
+        threads[1].start()
+
+        # Once the second thread missed the cache, it can only wait for the first one.
+        while cache.lookup_count < 2:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        compilation_released.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertIsInstance(outcomes[0], _Interruption)
+        self.assertIs(outcomes[0], outcomes[1])
+
+    def test_compilation_finished_after_cache_miss_is_not_repeated(self):
+        cache_key = ('late leader',)
+        compilation_results = []
+
+        def compile_and_store():
+            """Return a new result, and store it in the cache."""
+            compilation_result = object()
+            compilation_results.append(compilation_result)
+            cache.put(cache_key, compilation_result)
+            return compilation_result
+
+        class _RacingCompilationCache(CompilationCache):
+            """A cache in which another compilation finishes right after the first lookup."""
+
+            def get(self, cache_key):
+                """Look up the key, then finish a compilation of it if this is the first lookup."""
+                compilation_result = super(_RacingCompilationCache, self).get(cache_key)
+                if self.stats.misses == 1:
+                    _, lookup_token = _look_up_compilation(self, cache_key)
+                    _compile_single_flight(self, cache_key, compile_and_store, lookup_token)
+                return compilation_result
+
+        cache = _RacingCompilationCache()
+        compilation_result, lookup_token = _look_up_compilation(cache, cache_key)
+        self.assertIsNone(compilation_result)
+        compilation_result = _compile_single_flight(
+            cache, cache_key, compile_and_store, lookup_token)
+
+        self.assertEqual(1, len(compilation_results))
+        self.assertIs(compilation_results[0], compilation_result)
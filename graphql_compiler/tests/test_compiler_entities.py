@@ -0,0 +1,71 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from graphql import GraphQLInt, GraphQLList, GraphQLString
+
+from ..compiler.blocks import CoerceType, ConstructResult, Filter, GlobalOperationsStart
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.expressions import (
+    BinaryComposition, ContextField, LocalField, OutputContextField, Variable
+)
+from ..compiler.helpers import Location
+from .test_helpers import get_schema, get_test_input_queries
+
+
+class CompilerEntityHashingTests(unittest.TestCase):
+    def test_equal_entities_have_equal_hashes(self):
+        location = Location(('Animal',), u'name')
+        equal_pairs = (
+            (Variable('$names', GraphQLList(GraphQLString)),
+             Variable('$names', GraphQLList(GraphQLString))),
+            (OutputContextField(location, GraphQLString),
+             OutputContextField(Location(('Animal',), u'name'), GraphQLString)),
+            (BinaryComposition(u'=', LocalField(u'name'), ContextField(location, GraphQLString)),
+             BinaryComposition(u'=', LocalField(u'name'), ContextField(location, GraphQLString))),
+            (CoerceType({u'Animal', u'Species'}), CoerceType({u'Species', u'Animal'})),
+            (ConstructResult({u'name': OutputContextField(location, GraphQLString)}),
+             ConstructResult({u'name': OutputContextField(location, GraphQLString)})),
+            (GlobalOperationsStart(), GlobalOperationsStart()),
+        )
+        for first, second in equal_pairs:
+            self.assertIsNot(first, second)
+            self.assertEqual(first, second)
+            self.assertEqual(hash(first), hash(second))
+
+    def test_unequal_entities(self):
+        unequal_pairs = (
+            (Variable('$names', GraphQLList(GraphQLString)),
+             Variable('$names', GraphQLList(GraphQLInt))),
+            (Variable('$name', GraphQLString), Variable('$other_name', GraphQLString)),
+            (LocalField(u'name'), LocalField(u'uuid')),
+            (Filter(BinaryComposition(u'=', LocalField(u'name'), Variable('$a', GraphQLString))),
+             Filter(BinaryComposition(u'!=', LocalField(u'name'), Variable('$a', GraphQLString)))),
+        )
+        for first, second in unequal_pairs:
+            self.assertNotEqual(first, second)
+
+    def test_entities_in_sets_and_dicts(self):
+        expressions = [
+            BinaryComposition(u'=', LocalField(u'name'), Variable('$wanted', GraphQLString)),
+            LocalField(u'name'),
+            BinaryComposition(u'=', LocalField(u'name'), Variable('$wanted', GraphQLString)),
+            LocalField(u'name'),
+        ]
+        self.assertEqual(2, len(set(expressions)))
+
+        expression_indexes = {}
+        for index, expression in enumerate(expressions):
+            expression_indexes.setdefault(expression, index)
+        self.assertEqual(
+            {expressions[0]: 0, expressions[1]: 1}, expression_indexes)
+
+    def test_ir_blocks_of_test_queries_are_hashable(self):
+        schema = get_schema()
+        for query_name, graphql_string, type_equivalence_hints in get_test_input_queries(schema):
+            ir_blocks = graphql_to_ir(
+                schema, graphql_string, type_equivalence_hints=type_equivalence_hints).ir_blocks
+            same_ir_blocks = graphql_to_ir(
+                schema, graphql_string, type_equivalence_hints=type_equivalence_hints).ir_blocks
+
+            self.assertEqual([hash(block) for block in ir_blocks],
+                             [hash(block) for block in same_ir_blocks], msg=query_name)
@@ -0,0 +1,165 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import logging
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from sqlalchemy.dialects import sqlite
+
+from ..compiler import (
+    DiskCompilationCache, compile_graphql_to_gremlin, compile_graphql_to_match,
+    compile_graphql_to_sql, disk_cache
+)
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import compare_compilation_results, get_schema
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf @fold {
+            uuid @output(out_name: "child_uuids")
+        }
+    }
+}'''
+
+
+class _RecordingHandler(logging.Handler):
+    """A logging handler that keeps all records it handles."""
+
+    def __init__(self):
+        """Create a new _RecordingHandler with no records."""
+        super(_RecordingHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        """Keep the record."""
+        self.records.append(record)
+
+
+class DiskCompilationCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema and an empty cache directory for each test."""
+        self.schema = get_schema()
+        self.cache_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the cache directory."""
+        shutil.rmtree(self.cache_directory)
+
+    def test_entries_are_shared_across_cache_instances(self):
+        expected_result = compile_graphql_to_match(self.schema, QUERY)
+
+        first_cache = DiskCompilationCache(self.cache_directory, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=first_cache)
+        self.assertEqual(1, len(first_cache))
+
+        # A new cache instance and schema object, as in a newly started process.
+        new_schema = get_schema()
+        second_cache = DiskCompilationCache(self.cache_directory, new_schema)
+        cached_result = compile_graphql_to_match(new_schema, QUERY, compilation_cache=second_cache)
+
+        compare_compilation_results(self, expected_result, cached_result)
+        self.assertEqual(1, second_cache.stats.hits)
+        self.assertEqual(0, second_cache.stats.misses)
+
+        # The types of the cached metadata belong to the cache's schema.
+        self.assertIs(new_schema.get_type('String'),
+                      cached_result.output_metadata['animal_name'].type)
+
+    def test_cache_key_includes_language(self):
+        cache = DiskCompilationCache(self.cache_directory, self.schema)
+
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        gremlin_result = compile_graphql_to_gremlin(self.schema, QUERY, compilation_cache=cache)
+
+        self.assertEqual(2, len(cache))
+        compare_compilation_results(
+            self, compile_graphql_to_gremlin(self.schema, QUERY), gremlin_result)
+
+    def test_corrupt_entries_are_recompiled(self):
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=DiskCompilationCache(
+            self.cache_directory, self.schema))
+
+        corrupt_contents = ('{"key": ', '{"key": [], "compilation_result": {}}', '[1, 2]')
+        for corrupt_content in corrupt_contents:
+            for file_name in os.listdir(self.cache_directory):
+                with open(os.path.join(self.cache_directory, file_name), 'w') as entry_file:
+                    entry_file.write(corrupt_content)
+
+            cache = DiskCompilationCache(self.cache_directory, self.schema)
+            compilation_result = compile_graphql_to_match(
+                self.schema, QUERY, compilation_cache=cache)
+
+            compare_compilation_results(
+                self, compile_graphql_to_match(self.schema, QUERY), compilation_result)
+            self.assertEqual(0, cache.stats.hits)
+            self.assertEqual(1, cache.stats.misses)
+
+            # The corrupt entry was replaced by a valid one.
+            new_cache = DiskCompilationCache(self.cache_directory, self.schema)
+            compile_graphql_to_match(self.schema, QUERY, compilation_cache=new_cache)
+            self.assertEqual(1, new_cache.stats.hits)
+
+    def test_unwritable_cache_directory_does_not_fail_compilation(self):
+        cache = DiskCompilationCache(self.cache_directory, self.schema)
+        expected_result = compile_graphql_to_match(self.schema, QUERY)
+
+        # Remove write permissions, which are however ignored if the tests run as a superuser.
+        os.chmod(self.cache_directory, stat.S_IRUSR | stat.S_IXUSR)
+        if os.access(self.cache_directory, os.W_OK):
+            # Storing entries also fails if the cache directory is not a directory at all.
+            os.rmdir(self.cache_directory)
+            with open(self.cache_directory, 'w'):
+                pass
+
+        recording_handler = _RecordingHandler()
+        disk_cache.logger.addHandler(recording_handler)
+        try:
+            compilation_result = compile_graphql_to_match(
+                self.schema, QUERY, compilation_cache=cache)
+        finally:
+            disk_cache.logger.removeHandler(recording_handler)
+            if os.path.isdir(self.cache_directory):
+                os.chmod(self.cache_directory, stat.S_IRWXU)
+            else:
+                os.remove(self.cache_directory)
+                os.mkdir(self.cache_directory)
+
+        self.assertEqual([logging.WARNING],
+                         [record.levelno for record in recording_handler.records])
+
+        compare_compilation_results(self, expected_result, compilation_result)
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+        # The result is still cached in memory.
+        self.assertIs(compilation_result, compile_graphql_to_match(
+            self.schema, QUERY, compilation_cache=cache))
+
+    def test_sql_queries_are_not_cached(self):
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+        query = '''{
+            Animal {
+                name @output(out_name: "animal_name")
+            }
+        }'''
+        cache = DiskCompilationCache(self.cache_directory, self.schema)
+
+        compile_graphql_to_sql(self.schema, query, sql_metadata, compilation_cache=cache)
+        compile_graphql_to_sql(self.schema, query, sql_metadata, compilation_cache=cache)
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(2, cache.stats.misses)
+
+    def test_clear(self):
+        cache = DiskCompilationCache(self.cache_directory, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        self.assertEqual(2, cache.stats.misses)
@@ -0,0 +1,89 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from ..compiler import (
+    CompilationProfile, DocumentCache, compile_graphql_to_gremlin, compile_graphql_to_match,
+    parse_and_validate_graphql
+)
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.instrumentation import IR_GENERATION_PHASE, PARSE_PHASE, VALIDATION_PHASE
+from ..exceptions import GraphQLParsingError, GraphQLValidationError
+from .test_helpers import compare_ir_blocks, get_schema
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf {
+            uuid @output(out_name: "child_uuid")
+        }
+    }
+}'''
+
+
+class DocumentCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def test_document_is_shared_across_languages(self):
+        document_cache = DocumentCache()
+
+        match_result = compile_graphql_to_match(
+            self.schema, QUERY, document_cache=document_cache)
+        gremlin_result = compile_graphql_to_gremlin(
+            self.schema, QUERY, document_cache=document_cache)
+
+        self.assertEqual(1, document_cache.stats.misses)
+        self.assertEqual(1, document_cache.stats.hits)
+        self.assertEqual(compile_graphql_to_match(self.schema, QUERY), match_result)
+        self.assertEqual(compile_graphql_to_gremlin(self.schema, QUERY), gremlin_result)
+
+    def test_cache_key_is_based_on_schema_contents(self):
+        document_cache = DocumentCache()
+
+        first_document = parse_and_validate_graphql(
+            self.schema, QUERY, document_cache=document_cache)
+        second_document = parse_and_validate_graphql(
+            get_schema(), QUERY, document_cache=document_cache)
+
+        self.assertIs(first_document, second_document)
+        self.assertEqual(1, len(document_cache))
+
+    def test_invalid_queries_are_not_cached(self):
+        document_cache = DocumentCache()
+        unparseable_query = '{ Animal { name @output(out_name: "name") }'
+        invalid_query = '''{
+            Animal {
+                nonexistent_field @output(out_name: "name")
+            }
+        }'''
+
+        for _ in range(2):
+            with self.assertRaises(GraphQLParsingError):
+                parse_and_validate_graphql(
+                    self.schema, unparseable_query, document_cache=document_cache)
+            with self.assertRaises(GraphQLValidationError):
+                parse_and_validate_graphql(
+                    self.schema, invalid_query, document_cache=document_cache)
+
+        self.assertEqual(0, len(document_cache))
+        self.assertEqual(4, document_cache.stats.misses)
+
+    def test_validated_document_skips_parsing_and_validation(self):
+        validated_document = parse_and_validate_graphql(self.schema, QUERY)
+        expected_ir_and_metadata = graphql_to_ir(self.schema, QUERY)
+
+        profile = CompilationProfile()
+        ir_and_metadata = graphql_to_ir(
+            self.schema, QUERY, instrumentation=profile, validated_document=validated_document)
+
+        compare_ir_blocks(self, expected_ir_and_metadata.ir_blocks, ir_and_metadata.ir_blocks)
+        self.assertEqual(expected_ir_and_metadata.output_metadata,
+                         ir_and_metadata.output_metadata)
+        self.assertEqual([IR_GENERATION_PHASE], list(profile.phase_times))
+
+        profile = CompilationProfile()
+        graphql_to_ir(self.schema, QUERY, instrumentation=profile)
+        self.assertEqual([PARSE_PHASE, VALIDATION_PHASE, IR_GENERATION_PHASE],
+                         list(profile.phase_times))
@@ -0,0 +1,157 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from graphql import GraphQLString
+
+from ..compiler.blocks import ConstructResult, Filter
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.expression_rewriting import ExpressionRewriter, ExpressionRewriteRule
+from ..compiler.expressions import (
+    BinaryComposition, Literal, LocalField, NullLiteral, OutputContextField, TrueLiteral, Variable
+)
+from ..compiler.helpers import Location
+from ..compiler.ir_lowering_common import (
+    BOOLEAN_EXPRESSION_COMPARISON_RULE, get_context_field_existence_lowering_rules,
+    lower_context_field_existence, optimize_boolean_expression_comparisons
+)
+from ..compiler.ir_lowering_match.ir_lowering import (
+    HAS_SUBSTRING_LOWERING_RULE, TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE,
+    lower_has_substring_binary_compositions, rewrite_binary_composition_inside_ternary_conditional
+)
+from .test_helpers import compare_ir_blocks, get_schema, get_test_input_queries
+
+
+def _rewrite_contains_into_has_substring(expression):
+    """Rewrite a BinaryComposition with the "contains" operator into one with "has_substring"."""
+    if expression.operator != u'contains':
+        return expression
+    return BinaryComposition(u'has_substring', expression.left, expression.right)
+
+
+CONTAINS_REWRITE_RULE = ExpressionRewriteRule(
+    u'rewrite_contains', (BinaryComposition,), _rewrite_contains_into_has_substring, None)
+
+
+def _make_has_substring(left, right):
+    """Return the MATCH-representable form of a "has_substring" BinaryComposition."""
+    return BinaryComposition(
+        u'LIKE', left,
+        BinaryComposition(u'+', Literal('%'), BinaryComposition(u'+', right, Literal('%'))))
+
+
+class ExpressionRewritingTests(unittest.TestCase):
+    def setUp(self):
+        """Disable max diff limits for all tests."""
+        self.maxDiff = None
+        self.schema = get_schema()
+
+    def test_fused_rewriting_matches_separate_passes(self):
+        for query_name, graphql_string, type_equivalence_hints in (
+                get_test_input_queries(self.schema)):
+            ir_and_metadata = graphql_to_ir(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            ir_blocks = ir_and_metadata.ir_blocks
+            query_metadata_table = ir_and_metadata.query_metadata_table
+
+            expected_ir_blocks = lower_has_substring_binary_compositions(
+                rewrite_binary_composition_inside_ternary_conditional(
+                    optimize_boolean_expression_comparisons(
+                        lower_context_field_existence(ir_blocks, query_metadata_table))))
+
+            rewriter = ExpressionRewriter(
+                get_context_field_existence_lowering_rules(query_metadata_table) + (
+                    BOOLEAN_EXPRESSION_COMPARISON_RULE,
+                    TERNARY_CONDITIONAL_BINARY_COMPOSITION_RULE,
+                    HAS_SUBSTRING_LOWERING_RULE,
+                ))
+            self.assertEqual(expected_ir_blocks, rewriter.rewrite_blocks(ir_blocks),
+                             msg=query_name)
+
+    def test_rules_see_output_of_earlier_rules(self):
+        name_field = LocalField(u'name')
+        wanted = Variable(u'$wanted', GraphQLString)
+        ir_blocks = [
+            Filter(BinaryComposition(
+                u'=',
+                BinaryComposition(u'has_substring', name_field, wanted),
+                TrueLiteral)),
+            Filter(BinaryComposition(
+                u'=',
+                TrueLiteral,
+                BinaryComposition(u'has_substring', name_field, wanted))),
+        ]
+
+        # The boolean comparison is optimized away at the parent expression, after its child
+        # was already lowered by the has_substring rule.
+        expected_ir_blocks = [
+            Filter(_make_has_substring(name_field, wanted)),
+            Filter(_make_has_substring(name_field, wanted)),
+        ]
+        rewriter = ExpressionRewriter(
+            (HAS_SUBSTRING_LOWERING_RULE, BOOLEAN_EXPRESSION_COMPARISON_RULE))
+        compare_ir_blocks(self, expected_ir_blocks, rewriter.rewrite_blocks(ir_blocks))
+
+    def test_rules_are_chosen_by_the_type_of_the_rewritten_expression(self):
+        mark_first = ExpressionRewriteRule(
+            u'mark_first', (Literal,), lambda literal: Literal(literal.value + u'_first'), None)
+        field_to_literal = ExpressionRewriteRule(
+            u'field_to_literal', (LocalField,), lambda field: Literal(field.field_name), None)
+        mark_last = ExpressionRewriteRule(
+            u'mark_last', (Literal,), lambda literal: Literal(literal.value + u'_last'), None)
+        ir_blocks = [Filter(BinaryComposition(u'=', LocalField(u'name'), Literal(u'Bob')))]
+
+        # The LocalField becomes a Literal, so only the Literal rules after its own rule apply.
+        expected_ir_blocks = [
+            Filter(BinaryComposition(u'=', Literal(u'name_last'), Literal(u'Bob_first_last'))),
+        ]
+        rewriter = ExpressionRewriter((mark_first, field_to_literal, mark_last))
+        compare_ir_blocks(self, expected_ir_blocks, rewriter.rewrite_blocks(ir_blocks))
+
+    def test_block_types(self):
+        expression = BinaryComposition(u'contains', LocalField(u'alias'), Literal('Bob'))
+        output = OutputContextField(Location(('Animal',), u'name'), GraphQLString)
+        ir_blocks = [
+            Filter(expression),
+            ConstructResult({'name': output}),
+        ]
+        construct_result_only_rule = CONTAINS_REWRITE_RULE._replace(block_types=(ConstructResult,))
+        output_rule = ExpressionRewriteRule(
+            u'replace_outputs', (OutputContextField,), lambda _: NullLiteral, (ConstructResult,))
+
+        rewriter = ExpressionRewriter((construct_result_only_rule, output_rule))
+        expected_ir_blocks = [
+            Filter(expression),
+            ConstructResult({'name': NullLiteral}),
+        ]
+        compare_ir_blocks(self, expected_ir_blocks, rewriter.rewrite_blocks(ir_blocks))
+
+    def test_fixed_point(self):
+        name_field = LocalField(u'name')
+        wanted = Variable(u'$wanted', GraphQLString)
+        ir_blocks = [Filter(BinaryComposition(u'contains', name_field, wanted))]
+        rules = (HAS_SUBSTRING_LOWERING_RULE, CONTAINS_REWRITE_RULE)
+
+        # Without a fixed point, the has_substring rule is not applied again to the output
+        # of the rule after it.
+        rewriter = ExpressionRewriter(rules)
+        compare_ir_blocks(
+            self, [Filter(BinaryComposition(u'has_substring', name_field, wanted))],
+            rewriter.rewrite_blocks(ir_blocks))
+
+        fixed_point_rewriter = ExpressionRewriter(rules, fixed_point=True)
+        compare_ir_blocks(
+            self, [Filter(_make_has_substring(name_field, wanted))],
+            fixed_point_rewriter.rewrite_blocks(ir_blocks))
+
+    def test_unchanged_blocks_are_reused(self):
+        ir_blocks = [
+            Filter(BinaryComposition(u'=', LocalField(u'name'), Variable(u'$a', GraphQLString))),
+            ConstructResult({
+                'name': OutputContextField(Location(('Animal',), u'name'), GraphQLString),
+            }),
+        ]
+        rewriter = ExpressionRewriter((HAS_SUBSTRING_LOWERING_RULE, CONTAINS_REWRITE_RULE),
+                                      fixed_point=True)
+        new_ir_blocks = rewriter.rewrite_blocks(ir_blocks)
+        for block, new_block in zip(ir_blocks, new_ir_blocks):
+            self.assertIs(block, new_block)
@@ -1,5 +1,6 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Common test data and helper functions."""
+import inspect
 from pprint import pformat
 import re
 
@@ -7,6 +8,7 @@ from graphql import parse
 from graphql.utils.build_ast_schema import build_ast_schema
 import six
 
+from . import test_input_data
 from .. import get_graphql_schema_from_orientdb_schema_data
 from ..debugging_utils import pretty_print_gremlin, pretty_print_match
 from ..schema_generation.schema_graph import SchemaGraph
@@ -258,6 +260,14 @@ def compare_input_metadata(test_case, expected, received):
                              msg=u'{} != {}'.format(str(expected_value), str(received_value)))
 
 
+def compare_compilation_results(test_case, expected, received):
+    """Compare two CompilationResult objects, asserting they describe the same compiled query."""
+    test_case.assertEqual(expected.query, received.query)
+    test_case.assertEqual(expected.language, received.language)
+    test_case.assertEqual(expected.output_metadata, received.output_metadata)
+    compare_input_metadata(test_case, expected.input_metadata, received.input_metadata)
+
+
 def compare_ignoring_whitespace(test_case, expected, received, msg):
     """Compare expected and received code, ignoring whitespace, with the given failure message."""
     test_case.assertEqual(transform(expected), transform(received), msg=msg)
@@ -270,6 +280,36 @@ def get_schema():
     return schema
 
 
+def get_test_input_queries(schema):
+    """Return a list of (query name, GraphQL string, type equivalence hints) for all test inputs.
+
+    Args:
+        schema: GraphQL schema object against which the type equivalence hints are resolved,
+                usually the one returned by get_schema()
+
+    Returns:
+        list of (query name, GraphQL string, type equivalence hints) tuples, one for each
+        test input in test_input_data, where the type equivalence hints are a dict of GraphQL
+        type to equivalent GraphQL union, or None if the test input has no hints
+    """
+    test_input_queries = []
+    test_data_functions = inspect.getmembers(test_input_data, inspect.isfunction)
+    for query_name, test_data_function in test_data_functions:
+        if test_data_function.__module__ != test_input_data.__name__:
+            continue
+
+        test_data = test_data_function()
+        type_equivalence_hints = None
+        if test_data.type_equivalence_hints:
+            type_equivalence_hints = {
+                schema.get_type(key): schema.get_type(value)
+                for key, value in six.iteritems(test_data.type_equivalence_hints)
+            }
+        test_input_queries.append((query_name, test_data.graphql_input, type_equivalence_hints))
+
+    return test_input_queries
+
+
 def generate_schema_graph(graph_client):
     """Generate SchemaGraph from a pyorient client"""
     schema_records = graph_client.command(ORIENTDB_SCHEMA_RECORDS_QUERY)
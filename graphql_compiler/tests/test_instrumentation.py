@@ -0,0 +1,135 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from sqlalchemy.dialects import sqlite
+
+from . import test_input_data
+from ..compiler import (
+    CompilationCache, CompilationInstrumentation, CompilationProfile, compile_graphql_to_gremlin,
+    compile_graphql_to_match, compile_graphql_to_sql
+)
+from ..compiler.instrumentation import (
+    EMIT_PHASE, IR_BLOCK_COUNT, IR_GENERATION_PHASE, LOWERED_IR_BLOCK_COUNT, LOWERING_PHASE,
+    MATCH_QUERY_COUNT, PARSE_PHASE, SANITY_CHECKS_PHASE, VALIDATION_PHASE
+)
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from ..exceptions import GraphQLValidationError
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import get_schema
+
+
+ALL_PHASES = (
+    PARSE_PHASE, VALIDATION_PHASE, IR_GENERATION_PHASE, SANITY_CHECKS_PHASE, LOWERING_PHASE,
+    EMIT_PHASE,
+)
+
+
+class InstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def _assert_all_phases_recorded(self, profile):
+        """Assert that the profile contains a non-negative time for each compilation phase."""
+        self.assertEqual(set(ALL_PHASES), set(profile.phase_times))
+        for elapsed_seconds in profile.phase_times.values():
+            self.assertGreaterEqual(elapsed_seconds, 0.0)
+
+    def test_match_compilation_is_profiled(self):
+        profile = CompilationProfile()
+        graphql_input = test_input_data.optional_and_deep_traverse().graphql_input
+
+        compile_graphql_to_match(self.schema, graphql_input, instrumentation=profile)
+
+        self._assert_all_phases_recorded(profile)
+        self.assertEqual(
+            {IR_BLOCK_COUNT, LOWERED_IR_BLOCK_COUNT, MATCH_QUERY_COUNT}, set(profile.counts))
+        self.assertGreater(profile.counts[IR_BLOCK_COUNT], 0)
+        self.assertGreater(profile.counts[LOWERED_IR_BLOCK_COUNT], 0)
+
+        # The complex @optional traversal in this query is compiled into several subqueries.
+        self.assertGreater(profile.counts[MATCH_QUERY_COUNT], 1)
+
+    def test_match_lowering_passes_are_profiled(self):
+        graphql_input = test_input_data.optional_and_deep_traverse().graphql_input
+
+        profile = CompilationProfile()
+        compile_graphql_to_match(self.schema, graphql_input, instrumentation=profile)
+
+        pass_names = [measurement.name for measurement in profile.lowering_passes]
+        self.assertEqual(len(pass_names), len(set(pass_names)))
+        self.assertEqual('remove_end_optionals', pass_names[0])
+        self.assertIn('convert_to_match_query', pass_names)
+        self.assertIn('convert_optional_traversals_to_compound_match_query', pass_names)
+        for measurement in profile.lowering_passes:
+            self.assertGreaterEqual(measurement.elapsed_seconds, 0.0)
+            self.assertGreater(measurement.ir_size, 0)
+            self.assertIsNone(measurement.ir_snapshot)
+        self.assertEqual(profile.counts[LOWERED_IR_BLOCK_COUNT],
+                         profile.lowering_passes[-1].ir_size)
+
+    def test_match_lowering_pass_snapshots(self):
+        graphql_input = test_input_data.optional_and_deep_traverse().graphql_input
+
+        profile = CompilationProfile(snapshot_lowering_passes=True)
+        compile_graphql_to_match(self.schema, graphql_input, instrumentation=profile)
+
+        snapshots = {
+            measurement.name: measurement.ir_snapshot
+            for measurement in profile.lowering_passes
+        }
+        self.assertTrue(snapshots['remove_end_optionals'].startswith('['))
+        self.assertTrue(snapshots['convert_to_match_query'].startswith('MatchQuery('))
+        self.assertTrue(snapshots['orientdb_query_execution'].startswith('CompoundMatchQuery('))
+
+        # Taking snapshots does not affect the compiled query.
+        self.assertEqual(compile_graphql_to_match(self.schema, graphql_input).query,
+                         compile_graphql_to_match(self.schema, graphql_input,
+                                                  instrumentation=profile).query)
+
+    def test_gremlin_and_sql_compilation_is_profiled(self):
+        graphql_input = test_input_data.immediate_output().graphql_input
+
+        gremlin_profile = CompilationProfile()
+        compile_graphql_to_gremlin(self.schema, graphql_input, instrumentation=gremlin_profile)
+        self._assert_all_phases_recorded(gremlin_profile)
+        self.assertEqual({IR_BLOCK_COUNT, LOWERED_IR_BLOCK_COUNT}, set(gremlin_profile.counts))
+
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+        sql_profile = CompilationProfile()
+        compile_graphql_to_sql(self.schema, graphql_input, sql_metadata,
+                               instrumentation=sql_profile)
+        self._assert_all_phases_recorded(sql_profile)
+        self.assertEqual({IR_BLOCK_COUNT, LOWERED_IR_BLOCK_COUNT}, set(sql_profile.counts))
+
+    def test_failed_compilation_reports_completed_phases(self):
+        profile = CompilationProfile()
+        invalid_query = '''{
+            Animal {
+                nonexistent_field @output(out_name: "value")
+            }
+        }'''
+
+        with self.assertRaises(GraphQLValidationError):
+            compile_graphql_to_match(self.schema, invalid_query, instrumentation=profile)
+
+        self.assertEqual([PARSE_PHASE, VALIDATION_PHASE], list(profile.phase_times))
+        self.assertEqual({}, profile.counts)
+
+    def test_cached_compilation_is_not_profiled(self):
+        cache = CompilationCache()
+        graphql_input = test_input_data.immediate_output().graphql_input
+        compile_graphql_to_match(self.schema, graphql_input, compilation_cache=cache)
+
+        profile = CompilationProfile()
+        compile_graphql_to_match(
+            self.schema, graphql_input, compilation_cache=cache, instrumentation=profile)
+        self.assertEqual({}, profile.phase_times)
+
+    def test_base_instrumentation_ignores_measurements(self):
+        graphql_input = test_input_data.immediate_output().graphql_input
+        self.assertEqual(
+            compile_graphql_to_match(self.schema, graphql_input),
+            compile_graphql_to_match(self.schema, graphql_input,
+                                     instrumentation=CompilationInstrumentation()))
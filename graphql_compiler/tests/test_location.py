@@ -1,4 +1,5 @@
 # Copyright 2017-present Kensho Technologies, LLC.
+import pickle
 import unittest
 
 from ..compiler.helpers import FoldScopeLocation, Location
@@ -94,3 +95,48 @@ class LocationTests(unittest.TestCase):
         ]
 
         compare_sorted_locations_list(self, sorted_locations)
+
+    def test_derived_locations_are_equal(self):
+        base_location = Location(('Animal',))
+        child_location = base_location.navigate_to_subpath(u'out_Animal_ParentOf')
+        fold_location = base_location.navigate_to_fold(u'out_Animal_ParentOf')
+
+        self.assertEqual(child_location, base_location.navigate_to_subpath(u'out_Animal_ParentOf'))
+        self.assertEqual(base_location.revisit(), base_location.revisit())
+        self.assertEqual(fold_location, base_location.navigate_to_fold(u'out_Animal_ParentOf'))
+
+        for location in (base_location, child_location, fold_location):
+            field_location = location.navigate_to_field(u'name')
+            self.assertEqual(field_location, location.navigate_to_field(u'name'))
+            self.assertEqual(hash(field_location), hash(location.navigate_to_field(u'name')))
+            self.assertEqual(location, field_location.at_vertex())
+            self.assertIs(location, location.at_vertex())
+
+        independent_location = Location(('Animal', u'out_Animal_ParentOf'), u'name')
+        self.assertEqual(independent_location, child_location.navigate_to_field(u'name'))
+        self.assertEqual(hash(independent_location),
+                         hash(child_location.navigate_to_field(u'name')))
+        self.assertNotEqual(independent_location, child_location)
+
+    def test_locations_are_immutable(self):
+        location = Location(('Animal',), u'name')
+        fold_location = Location(('Animal',)).navigate_to_fold(u'out_Animal_ParentOf')
+
+        with self.assertRaises(AttributeError):
+            location.field = u'uuid'
+        with self.assertRaises(AttributeError):
+            del location.visit_counter
+        with self.assertRaises(AttributeError):
+            fold_location.fold_path = ()
+        with self.assertRaises(AttributeError):
+            location.new_attribute = 1
+
+    def test_locations_can_be_pickled(self):
+        location = Location(('Animal', u'out_Animal_ParentOf'), u'name', 2)
+        fold_location = Location(('Animal',)).navigate_to_fold(
+            u'out_Animal_ParentOf').navigate_to_field(u'name')
+
+        for original in (location, fold_location):
+            unpickled = pickle.loads(pickle.dumps(original))
+            self.assertEqual(original, unpickled)
+            self.assertEqual(hash(original), hash(unpickled))
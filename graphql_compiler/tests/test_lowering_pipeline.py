@@ -0,0 +1,100 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from . import test_input_data
+from ..compiler import CompilationProfile
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.ir_lowering_common import (
+    lower_context_field_existence, optimize_boolean_expression_comparisons, remove_end_optionals
+)
+from ..compiler.ir_lowering_gremlin.ir_lowering import (
+    lower_coerce_type_blocks, lower_folded_outputs, rewrite_filters_in_optional_blocks
+)
+from ..compiler.lowering_pipeline import (
+    FOLD_FEATURE, OPTIONAL_FEATURE, RECURSE_FEATURE, TYPE_COERCION_FEATURE, LoweringPass,
+    get_ir_features, run_lowering_passes
+)
+from ..compiler.workarounds import orientdb_eval_scheduling
+from .test_helpers import get_schema, get_test_input_queries
+
+
+def _append_to_ir(name):
+    """Return a lowering pass function appending the given name to a tuple IR."""
+    return lambda ir: ir + (name,)
+
+
+class LoweringPipelineTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def _get_ir_features(self, test_data):
+        """Return the IR features of the query in the given test data."""
+        query_metadata_table = graphql_to_ir(
+            self.schema, test_data.graphql_input,
+            type_equivalence_hints=test_data.type_equivalence_hints).query_metadata_table
+        return get_ir_features(query_metadata_table)
+
+    def test_get_ir_features(self):
+        self.assertEqual(frozenset(), self._get_ir_features(test_input_data.immediate_output()))
+        self.assertEqual(frozenset({OPTIONAL_FEATURE}),
+                         self._get_ir_features(test_input_data.optional_and_deep_traverse()))
+        self.assertEqual(frozenset({FOLD_FEATURE}),
+                         self._get_ir_features(test_input_data.fold_on_output_variable()))
+        self.assertEqual(frozenset({RECURSE_FEATURE}),
+                         self._get_ir_features(test_input_data.simple_recurse()))
+        self.assertEqual(
+            frozenset({FOLD_FEATURE, TYPE_COERCION_FEATURE}),
+            self._get_ir_features(test_input_data.coercion_on_interface_within_fold_scope()))
+
+    def test_irrelevant_passes_are_skipped(self):
+        lowering_passes = (
+            LoweringPass('always', _append_to_ir('always')),
+            LoweringPass('optional', _append_to_ir('optional'), {OPTIONAL_FEATURE}),
+            LoweringPass('fold_or_recurse', _append_to_ir('fold_or_recurse'),
+                         {FOLD_FEATURE, RECURSE_FEATURE}),
+        )
+
+        self.assertEqual(
+            ('always', 'optional', 'fold_or_recurse'),
+            run_lowering_passes((), lowering_passes, len))
+        self.assertEqual(
+            ('always',),
+            run_lowering_passes((), lowering_passes, len, ir_features=frozenset()))
+
+        profile = CompilationProfile()
+        self.assertEqual(
+            ('always', 'fold_or_recurse'),
+            run_lowering_passes((), lowering_passes, len, instrumentation=profile,
+                                ir_features=frozenset({RECURSE_FEATURE})))
+        self.assertEqual(['always', 'fold_or_recurse'],
+                         [measurement.name for measurement in profile.lowering_passes])
+
+    def test_skipped_passes_do_not_change_ir_without_their_features(self):
+        # Each of these passes is skipped for queries without any of the given features.
+        feature_specific_passes = (
+            (remove_end_optionals, {OPTIONAL_FEATURE}),
+            (lower_coerce_type_blocks, {TYPE_COERCION_FEATURE}),
+            (rewrite_filters_in_optional_blocks, {OPTIONAL_FEATURE}),
+            (lower_folded_outputs, {FOLD_FEATURE}),
+        )
+        for query_name, graphql_string, type_equivalence_hints in (
+                get_test_input_queries(self.schema)):
+            ir_and_metadata = graphql_to_ir(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            ir_blocks = ir_and_metadata.ir_blocks
+            query_metadata_table = ir_and_metadata.query_metadata_table
+            ir_features = get_ir_features(query_metadata_table)
+
+            if OPTIONAL_FEATURE not in ir_features:
+                self.assertEqual(ir_blocks, optimize_boolean_expression_comparisons(
+                    lower_context_field_existence(ir_blocks, query_metadata_table)),
+                    msg=query_name)
+                self.assertEqual(ir_blocks, orientdb_eval_scheduling.workaround_lowering_pass(
+                    ir_blocks, query_metadata_table), msg=query_name)
+
+            for lowering_func, relevant_features in feature_specific_passes:
+                lowered_ir_blocks = lowering_func(ir_blocks)
+                if relevant_features.isdisjoint(ir_features):
+                    self.assertEqual(ir_blocks, lowered_ir_blocks, msg=query_name)
+                ir_blocks = lowered_ir_blocks
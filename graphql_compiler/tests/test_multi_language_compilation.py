@@ -0,0 +1,214 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import threading
+import time
+import unittest
+
+from sqlalchemy.dialects import sqlite
+
+from ..compiler import (
+    GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE, CompilationCache, CompilationProfile,
+    compile_graphql_to_gremlin, compile_graphql_to_languages, compile_graphql_to_match,
+    compile_graphql_to_sql, ir_lowering_gremlin, ir_lowering_match
+)
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.instrumentation import EMIT_PHASE, LOWERING_PHASE, PARSE_PHASE
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import compare_compilation_results, get_schema, get_test_input_queries
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf @optional {
+            uuid @output(out_name: "child_uuid")
+        }
+    }
+}'''
+
+# The SQL test schema only has tables for some types, and only some of the Animal fields.
+SQL_COMPATIBLE_QUERY = '''{
+    Animal {
+        name @output(out_name: "animal_name")
+    }
+}'''
+
+
+class _PhaseCountingProfile(CompilationProfile):
+    """A CompilationProfile that also counts the number of times each phase was recorded."""
+
+    def __init__(self):
+        """Create a new _PhaseCountingProfile with no recorded phases."""
+        super(_PhaseCountingProfile, self).__init__()
+        self.phase_counts = {}
+
+    def record_phase_time(self, phase_name, elapsed_seconds):
+        """Count the phase, then record its time."""
+        self.phase_counts[phase_name] = self.phase_counts.get(phase_name, 0) + 1
+        super(_PhaseCountingProfile, self).record_phase_time(phase_name, elapsed_seconds)
+
+
+class _BlockingProfile(CompilationProfile):
+    """A CompilationProfile that blocks the compilation at its first phase, until it is released."""
+
+    def __init__(self):
+        """Create a new _BlockingProfile that has not started blocking yet."""
+        super(_BlockingProfile, self).__init__()
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def record_phase_time(self, phase_name, elapsed_seconds):
+        """Block until the compilation is released, then record the phase time."""
+        self.started.set()
+        self.released.wait()
+        super(_BlockingProfile, self).record_phase_time(phase_name, elapsed_seconds)
+
+
+def _get_metadata_repr(query_metadata_table):
+    """Return a repr of the QueryMetadataTable state, excluding its lazily-built location indexes.
+
+    The location indexes are derived from the registered locations on first use by a backend,
+    so building them does not modify the metadata that other backends see.
+    """
+    return repr({
+        attribute_name: value
+        for attribute_name, value in sorted(vars(query_metadata_table).items())
+        if attribute_name != '_location_indexes'
+    })
+
+
+class MultiLanguageCompilationTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def test_results_match_single_language_compilation(self):
+        for _, graphql_string, type_equivalence_hints in get_test_input_queries(self.schema):
+            try:
+                expected_match_result = compile_graphql_to_match(
+                    self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+                expected_gremlin_result = compile_graphql_to_gremlin(
+                    self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            except Exception as e:  # pylint: disable=broad-except
+                # Some test queries use features that are not supported in Gremlin.
+                with self.assertRaises(type(e)):
+                    compile_graphql_to_languages(
+                        self.schema, graphql_string, (MATCH_LANGUAGE, GREMLIN_LANGUAGE),
+                        type_equivalence_hints=type_equivalence_hints)
+                continue
+
+            compilation_results = compile_graphql_to_languages(
+                self.schema, graphql_string, (MATCH_LANGUAGE, GREMLIN_LANGUAGE),
+                type_equivalence_hints=type_equivalence_hints)
+
+            self.assertEqual({MATCH_LANGUAGE, GREMLIN_LANGUAGE}, set(compilation_results))
+            compare_compilation_results(
+                self, expected_match_result, compilation_results[MATCH_LANGUAGE])
+            compare_compilation_results(
+                self, expected_gremlin_result, compilation_results[GREMLIN_LANGUAGE])
+
+    def test_lowering_does_not_modify_shared_ir(self):
+        for _, graphql_string, type_equivalence_hints in get_test_input_queries(self.schema):
+            ir_and_metadata = graphql_to_ir(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            ir_blocks = ir_and_metadata.ir_blocks
+            query_metadata_table = ir_and_metadata.query_metadata_table
+
+            original_ir_blocks = list(ir_blocks)
+            original_ir_blocks_repr = repr(ir_blocks)
+            original_metadata_repr = _get_metadata_repr(query_metadata_table)
+
+            for lowering_func in (ir_lowering_match.lower_ir, ir_lowering_gremlin.lower_ir):
+                try:
+                    lowering_func(ir_blocks, query_metadata_table,
+                                  type_equivalence_hints=type_equivalence_hints)
+                except NotImplementedError:
+                    # Some test queries use features that are not supported in Gremlin.
+                    pass
+
+                self.assertEqual(original_ir_blocks, ir_blocks)
+                self.assertEqual(original_ir_blocks_repr, repr(ir_blocks))
+                self.assertEqual(original_metadata_repr, _get_metadata_repr(query_metadata_table))
+
+    def test_sql_compilation(self):
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+
+        compilation_results = compile_graphql_to_languages(
+            self.schema, SQL_COMPATIBLE_QUERY, (SQL_LANGUAGE, MATCH_LANGUAGE),
+            compiler_metadata=sql_metadata)
+
+        expected_sql_result = compile_graphql_to_sql(
+            self.schema, SQL_COMPATIBLE_QUERY, sql_metadata)
+        self.assertEqual(str(expected_sql_result.query),
+                         str(compilation_results[SQL_LANGUAGE].query))
+        compare_compilation_results(
+            self, compile_graphql_to_match(self.schema, SQL_COMPATIBLE_QUERY),
+            compilation_results[MATCH_LANGUAGE])
+
+    def test_frontend_runs_once(self):
+        profile = _PhaseCountingProfile()
+        compile_graphql_to_languages(
+            self.schema, QUERY, (MATCH_LANGUAGE, GREMLIN_LANGUAGE), instrumentation=profile)
+
+        self.assertEqual(1, profile.phase_counts[PARSE_PHASE])
+        self.assertEqual(2, profile.phase_counts[LOWERING_PHASE])
+        self.assertEqual(2, profile.phase_counts[EMIT_PHASE])
+
+    def test_compilation_cache(self):
+        cache = CompilationCache(max_size=10)
+        match_result = compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+
+        profile = _PhaseCountingProfile()
+        compilation_results = compile_graphql_to_languages(
+            self.schema, QUERY, (MATCH_LANGUAGE, GREMLIN_LANGUAGE),
+            compilation_cache=cache, instrumentation=profile)
+
+        # Only the Gremlin query was compiled, since the MATCH query was found in the cache.
+        self.assertIs(match_result, compilation_results[MATCH_LANGUAGE])
+        self.assertEqual(1, profile.phase_counts[LOWERING_PHASE])
+        self.assertIs(compilation_results[GREMLIN_LANGUAGE],
+                      compile_graphql_to_gremlin(self.schema, QUERY, compilation_cache=cache))
+
+    def test_unsupported_language(self):
+        with self.assertRaises(AssertionError):
+            compile_graphql_to_languages(self.schema, QUERY, (MATCH_LANGUAGE, 'Cypher'))
+
+    def test_concurrent_compilations_are_deduplicated(self):
+        languages = (MATCH_LANGUAGE, GREMLIN_LANGUAGE)
+        follower_count = 8
+        cache = CompilationCache(max_size=10)
+        blocking_profile = _BlockingProfile()
+        outcomes = [None] * (follower_count + 1)
+
+        def compile_query(thread_index, instrumentation):
+            """Compile the query to all languages, storing the results in the outcomes list."""
+            outcomes[thread_index] = compile_graphql_to_languages(
+                self.schema, QUERY, languages, compilation_cache=cache,
+                instrumentation=instrumentation)
+
+        threads = [threading.Thread(target=compile_query, args=(0, blocking_profile))]
+        threads[0].start()
+        blocking_profile.started.wait()
+
+        threads.extend(
+            threading.Thread(target=compile_query, args=(thread_index + 1, None))
+            for thread_index in range(follower_count)
+        )
+        for thread in threads[1:]:
+            thread.start()
+
+        # Once all threads looked up the query in the cache, they can only wait for
+        # the in-flight compilation.
+        while cache.stats.hits + cache.stats.misses < follower_count + 1:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        blocking_profile.released.set()
+
+        for thread in threads:
+            thread.join()
+
+        # Each language was compiled once, and all threads received the same results.
+        for language in languages:
+            for outcome in outcomes:
+                self.assertIs(outcomes[0][language], outcome[language])
@@ -0,0 +1,132 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from sqlalchemy.dialects import sqlite
+
+from .. import graphql_to_gremlin, graphql_to_match
+from ..compiler import GREMLIN_LANGUAGE, MATCH_LANGUAGE, SQL_LANGUAGE
+from ..compiler.ir_lowering_sql.metadata import SqlMetadata
+from ..exceptions import GraphQLCompilationError, GraphQLInvalidArgumentError
+from ..query_formatting import PersistedQueryRegistry
+from .test_data_tools.data_tool import get_animal_schema_sql_metadata
+from .test_helpers import get_schema
+
+
+ANIMAL_BY_NAME_QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        uuid @output(out_name: "animal_uuid")
+    }
+}'''
+
+SPECIES_QUERY = '''{
+    Species {
+        name @output(out_name: "species_name")
+    }
+}'''
+
+# The SQL test schema only has tables for some types, and only some of the Animal fields.
+ANIMAL_NAMES_QUERY = '''{
+    Animal {
+        name @output(out_name: "animal_name")
+    }
+}'''
+
+INVALID_QUERY = '''{
+    Animal {
+        nonexistent_field @output(out_name: "nonexistent")
+    }
+}'''
+
+QUERIES = {
+    'animal_by_name': ANIMAL_BY_NAME_QUERY,
+    'species': SPECIES_QUERY,
+}
+
+
+class PersistedQueryRegistryTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema and an empty query directory for each test."""
+        self.schema = get_schema()
+        self.query_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the query directory."""
+        shutil.rmtree(self.query_directory)
+
+    def _write_file(self, file_name, contents):
+        """Write the text to the file with the given name in the query directory."""
+        file_path = os.path.join(self.query_directory, file_name)
+        with io.open(file_path, 'w', encoding='utf-8') as f:
+            f.write(contents)
+        return file_path
+
+    def test_insert_arguments_matches_direct_compilation(self):
+        registry = PersistedQueryRegistry(
+            self.schema, QUERIES, languages=(MATCH_LANGUAGE, GREMLIN_LANGUAGE))
+        arguments = {'wanted': 'Bob'}
+
+        self.assertEqual(frozenset(QUERIES), registry.query_ids)
+        self.assertEqual(
+            graphql_to_match(self.schema, ANIMAL_BY_NAME_QUERY, arguments).query,
+            registry.insert_arguments('animal_by_name', MATCH_LANGUAGE, arguments))
+        self.assertEqual(
+            graphql_to_gremlin(self.schema, ANIMAL_BY_NAME_QUERY, arguments).query,
+            registry.insert_arguments('animal_by_name', GREMLIN_LANGUAGE, arguments))
+        self.assertEqual(
+            GREMLIN_LANGUAGE,
+            registry.get_compilation_result('species', GREMLIN_LANGUAGE).language)
+
+    def test_sql_compilation(self):
+        _, sqlalchemy_metadata = get_animal_schema_sql_metadata()
+        sql_metadata = SqlMetadata(sqlite.dialect.name, sqlalchemy_metadata)
+        queries = {'animal_names': ANIMAL_NAMES_QUERY}
+        registry = PersistedQueryRegistry(
+            self.schema, queries, languages=(SQL_LANGUAGE,), compiler_metadata=sql_metadata)
+
+        self.assertEqual(
+            SQL_LANGUAGE, registry.get_compilation_result('animal_names', SQL_LANGUAGE).language)
+
+    def test_from_directory(self):
+        for query_id, graphql_string in QUERIES.items():
+            self._write_file(query_id + '.graphql', graphql_string)
+        self._write_file('README.txt', 'Not a query.')
+
+        registry = PersistedQueryRegistry.from_directory(self.schema, self.query_directory)
+        self.assertEqual(frozenset(QUERIES), registry.query_ids)
+        self.assertEqual(
+            graphql_to_match(self.schema, SPECIES_QUERY, {}).query,
+            registry.insert_arguments('species', MATCH_LANGUAGE, {}))
+
+    def test_from_manifest(self):
+        manifest_path = self._write_file('manifest.json', json.dumps(QUERIES))
+
+        registry = PersistedQueryRegistry.from_manifest(
+            self.schema, manifest_path, languages=(GREMLIN_LANGUAGE,))
+        self.assertEqual(frozenset(QUERIES), registry.query_ids)
+        self.assertEqual((GREMLIN_LANGUAGE,), registry.languages)
+
+    def test_invalid_queries_are_reported_eagerly(self):
+        queries = dict(QUERIES, broken=INVALID_QUERY, unparseable='{ Animal {')
+
+        with self.assertRaises(GraphQLCompilationError) as context:
+            PersistedQueryRegistry(self.schema, queries)
+
+        error_message = str(context.exception)
+        self.assertIn('broken', error_message)
+        self.assertIn('unparseable', error_message)
+        self.assertNotIn('species', error_message)
+
+    def test_lookup_errors(self):
+        registry = PersistedQueryRegistry(self.schema, QUERIES)
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            registry.insert_arguments('nonexistent', MATCH_LANGUAGE, {})
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            registry.insert_arguments('animal_by_name', MATCH_LANGUAGE, {})
+        with self.assertRaises(AssertionError):
+            registry.get_prepared_query('species', GREMLIN_LANGUAGE)
@@ -0,0 +1,129 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+from decimal import Decimal
+import inspect
+import unittest
+
+from graphql import GraphQLList, GraphQLString
+import six
+
+from . import test_input_data
+from ..compiler import compile_graphql_to_gremlin, compile_graphql_to_match
+from ..compiler.common import GREMLIN_LANGUAGE, MATCH_LANGUAGE, CompilationResult
+from ..exceptions import GraphQLInvalidArgumentError
+from ..query_formatting import PreparedQuery, insert_arguments_into_query
+from .test_helpers import get_schema
+
+
+# The Date and DateTime scalars of the test schema do not know how to serialize values,
+# so queries with arguments of those types are not used in these tests.
+REPRESENTATIVE_VALUE_FOR_EACH_TYPE_NAME = {
+    'Boolean': True,
+    'Decimal': Decimal('123456789.0123456'),
+    'Float': 3.14159,
+    'ID': 'some-id',
+    'Int': 42,
+    'String': 'ab"c\'d$e{f}',
+}
+
+
+def _get_representative_value(graphql_type):
+    """Return a valid argument value of the given GraphQL type, or None if there isn't one."""
+    if isinstance(graphql_type, GraphQLList):
+        inner_value = _get_representative_value(graphql_type.of_type)
+        return None if inner_value is None else [inner_value] * 3
+    return REPRESENTATIVE_VALUE_FOR_EACH_TYPE_NAME.get(graphql_type.name, None)
+
+
+def _get_all_test_data():
+    """Return a list of all CommonTestData objects defined in the test_input_data module."""
+    return [
+        test_data_function()
+        for _, test_data_function in inspect.getmembers(test_input_data, inspect.isfunction)
+        if test_data_function.__module__ == test_input_data.__name__
+    ]
+
+
+class PreparedQueryTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def _assert_prepared_query_matches_direct_insertion(self, compilation_result):
+        """Assert that preparing the query does not change the outcome of inserting arguments."""
+        arguments = {
+            argument_name: _get_representative_value(argument_type)
+            for argument_name, argument_type in six.iteritems(compilation_result.input_metadata)
+        }
+        if None in six.itervalues(arguments):
+            return
+        prepared_query = PreparedQuery(compilation_result)
+
+        expected_query = insert_arguments_into_query(compilation_result, arguments)
+        self.assertEqual(expected_query, prepared_query.insert_arguments(arguments))
+
+        # Inserting arguments must not affect subsequent insertions.
+        self.assertEqual(expected_query, prepared_query.insert_arguments(arguments))
+
+    def test_prepared_queries_match_direct_insertion(self):
+        for test_data in _get_all_test_data():
+            if test_data.type_equivalence_hints:
+                type_equivalence_hints = {
+                    self.schema.get_type(key): self.schema.get_type(value)
+                    for key, value in six.iteritems(test_data.type_equivalence_hints)
+                }
+            else:
+                type_equivalence_hints = None
+
+            compilation_functions = (compile_graphql_to_match, compile_graphql_to_gremlin)
+            for compilation_function in compilation_functions:
+                try:
+                    compilation_result = compilation_function(
+                        self.schema, test_data.graphql_input,
+                        type_equivalence_hints=type_equivalence_hints)
+                except NotImplementedError:
+                    continue
+
+                self._assert_prepared_query_matches_direct_insertion(compilation_result)
+
+    def test_repeated_and_escaped_parameters(self):
+        input_metadata = {
+            'first': GraphQLString,
+            'second': GraphQLString,
+        }
+        arguments = {
+            'first': 'x',
+            'second': 'y',
+        }
+
+        match_result = CompilationResult(
+            query=u'{{a}} {first} {{{second}}} {first}',
+            language=MATCH_LANGUAGE,
+            output_metadata={},
+            input_metadata=input_metadata)
+        self.assertEqual(u'{a} "x" {"y"} "x"',
+                         PreparedQuery(match_result).insert_arguments(arguments))
+
+        gremlin_result = CompilationResult(
+            query=u'$$a $first ${second}$$ $first',
+            language=GREMLIN_LANGUAGE,
+            output_metadata={},
+            input_metadata=input_metadata)
+        self.assertEqual(u'$a \'x\' \'y\'$ \'x\'',
+                         PreparedQuery(gremlin_result).insert_arguments(arguments))
+
+    def test_invalid_arguments_are_rejected(self):
+        query = '''{
+            Animal @filter(op_name: "name_or_alias", value: ["$wanted_name"]) {
+                name @output(out_name: "name")
+            }
+        }'''
+        prepared_query = PreparedQuery(compile_graphql_to_match(self.schema, query))
+
+        invalid_arguments_list = (
+            {},
+            {'wanted_name': 'Felix', 'unexpected': 'Garfield'},
+            {'wanted_name': 123},
+        )
+        for invalid_arguments in invalid_arguments_list:
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                prepared_query.insert_arguments(invalid_arguments)
@@ -0,0 +1,128 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from ..compiler import CompilationCache, compile_graphql_to_match
+from ..exceptions import GraphQLCompilationError, GraphQLParsingError
+from ..query_formatting.graphql_formatting import canonicalize_graphql, compute_query_fingerprint
+from .test_helpers import compare_input_metadata, get_schema, get_test_input_queries
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        uuid @output(out_name: "animal_uuid")
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf {
+            net_worth @output(out_name: "child_net_worth")
+            birthday @filter(op_name: ">=", value: ["$min_birthday"])
+        }
+    }
+}'''
+
+EQUIVALENT_QUERY = '''# Animals with the wanted name.
+{  Animal @filter(value: ["$wanted"], op_name: "name_or_alias")
+    {
+      name @output(out_name: "animal_name")  # The name is output too.
+      uuid   @output(out_name: "animal_uuid")
+      out_Animal_ParentOf {
+          birthday @filter(value: ["$min_birthday"], op_name: ">=")
+          net_worth @output(out_name: "child_net_worth")
+      }
+    }
+}'''
+
+DIFFERENT_QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        uuid @output(out_name: "animal_uuid")
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf {
+            net_worth @output(out_name: "child_net_worth")
+            birthday @filter(op_name: "<=", value: ["$min_birthday"])
+        }
+    }
+}'''
+
+
+class QueryCanonicalizationTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def test_equivalent_queries_have_same_canonical_form(self):
+        self.assertEqual(canonicalize_graphql(QUERY), canonicalize_graphql(EQUIVALENT_QUERY))
+        self.assertEqual(compute_query_fingerprint(QUERY),
+                         compute_query_fingerprint(EQUIVALENT_QUERY))
+
+        self.assertNotEqual(canonicalize_graphql(QUERY), canonicalize_graphql(DIFFERENT_QUERY))
+        self.assertNotEqual(compute_query_fingerprint(QUERY),
+                            compute_query_fingerprint(DIFFERENT_QUERY))
+
+    def test_canonicalization_is_idempotent(self):
+        canonical_query = canonicalize_graphql(EQUIVALENT_QUERY)
+        self.assertEqual(canonical_query, canonicalize_graphql(canonical_query))
+
+    def test_vertex_fields_are_not_reordered(self):
+        query = '''{
+            Animal {
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+                in_Animal_ParentOf {
+                    name @output(out_name: "parent_name")
+                }
+            }
+        }'''
+        canonical_query = canonicalize_graphql(query)
+        self.assertLess(canonical_query.index('out_Animal_ParentOf'),
+                        canonical_query.index('in_Animal_ParentOf'))
+
+    def test_property_fields_are_not_reordered_at_vertex_with_tag(self):
+        query = '''{
+            Animal {
+                uuid @tag(tag_name: "uuid")
+                name @filter(op_name: "=", value: ["%uuid"])
+                     @output(out_name: "animal_name")
+            }
+        }'''
+        canonical_query = canonicalize_graphql(query)
+        self.assertLess(canonical_query.index('uuid @tag'), canonical_query.index('name @filter'))
+
+    def test_property_fields_after_vertex_fields_are_still_rejected(self):
+        query = '''{
+            Animal {
+                out_Animal_ParentOf {
+                    uuid @output(out_name: "child_uuid")
+                }
+                name @output(out_name: "animal_name")
+            }
+        }'''
+        with self.assertRaises(GraphQLCompilationError):
+            compile_graphql_to_match(self.schema, canonicalize_graphql(query))
+
+    def test_invalid_query_raises_parsing_error(self):
+        with self.assertRaises(GraphQLParsingError):
+            canonicalize_graphql('{ Animal { name @output(out_name: "name") }')
+
+    def test_canonical_form_is_shared_cache_key(self):
+        cache = CompilationCache(max_size=10)
+
+        first_result = compile_graphql_to_match(
+            self.schema, canonicalize_graphql(QUERY), compilation_cache=cache)
+        second_result = compile_graphql_to_match(
+            self.schema, canonicalize_graphql(EQUIVALENT_QUERY), compilation_cache=cache)
+
+        self.assertIs(first_result, second_result)
+        self.assertEqual(1, len(cache))
+
+    def test_canonical_form_of_test_queries_compiles_equivalently(self):
+        for query_name, graphql_string, type_equivalence_hints in (
+                get_test_input_queries(self.schema)):
+            expected_result = compile_graphql_to_match(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            canonical_result = compile_graphql_to_match(
+                self.schema, canonicalize_graphql(graphql_string),
+                type_equivalence_hints=type_equivalence_hints)
+
+            self.assertEqual(expected_result.output_metadata, canonical_result.output_metadata,
+                             msg=query_name)
+            compare_input_metadata(
+                self, expected_result.input_metadata, canonical_result.input_metadata)
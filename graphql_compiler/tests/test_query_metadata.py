@@ -0,0 +1,122 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..compiler.helpers import FoldScopeLocation, Location
+from ..compiler.metadata import LocationInfo, QueryMetadataTable
+from .test_helpers import get_schema, get_test_input_queries
+
+
+class QueryMetadataTableIndexTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def _make_query_metadata_table(self):
+        """Return a QueryMetadataTable with only an Animal root location, and the root location."""
+        root_location = Location(('Animal',))
+        root_location_info = LocationInfo(
+            parent_location=None,
+            type=self.schema.get_type('Animal'),
+            coerced_from_type=None,
+            optional_scopes_depth=0,
+            recursive_scopes_depth=0,
+            is_within_fold=False,
+        )
+        return QueryMetadataTable(root_location, root_location_info), root_location_info
+
+    def test_indexes_match_registered_locations(self):
+        for query_name, graphql_string, type_equivalence_hints in (
+                get_test_input_queries(self.schema)):
+            query_metadata_table = graphql_to_ir(
+                self.schema, graphql_string,
+                type_equivalence_hints=type_equivalence_hints).query_metadata_table
+            registered_locations = list(query_metadata_table.registered_locations)
+
+            self.assertEqual(
+                {location: location_info.type
+                 for location, location_info in registered_locations},
+                query_metadata_table.location_types, msg=query_name)
+            self.assertEqual(
+                {location
+                 for location, location_info in registered_locations
+                 if location_info.coerced_from_type is not None},
+                query_metadata_table.coerced_locations, msg=query_name)
+            self.assertEqual(
+                {location
+                 for location, location_info in registered_locations
+                 if location_info.optional_scopes_depth > 0},
+                query_metadata_table.optional_locations, msg=query_name)
+            self.assertEqual(
+                {location
+                 for location, location_info in registered_locations
+                 if location_info.recursive_scopes_depth > 0},
+                query_metadata_table.recursive_locations, msg=query_name)
+            self.assertEqual(
+                {location
+                 for location, location_info in registered_locations
+                 if location_info.is_within_fold},
+                query_metadata_table.folded_locations, msg=query_name)
+
+            for location, location_info in registered_locations:
+                self.assertIn(
+                    location,
+                    query_metadata_table.get_locations_of_type(location_info.type.name))
+                self.assertIn(
+                    location,
+                    query_metadata_table.get_locations_at_optional_scopes_depth(
+                        location_info.optional_scopes_depth))
+                self.assertIn(
+                    location,
+                    query_metadata_table.get_locations_at_recursive_scopes_depth(
+                        location_info.recursive_scopes_depth))
+                if isinstance(location, Location):
+                    self.assertIn(
+                        location, query_metadata_table.locations_by_query_path[location.query_path])
+
+    def test_locations_by_query_path(self):
+        query_metadata_table, root_location_info = self._make_query_metadata_table()
+        root_location = query_metadata_table.root_location
+
+        child_location = root_location.navigate_to_subpath('out_Animal_ParentOf')
+        child_location_info = root_location_info._replace(parent_location=root_location)
+        query_metadata_table.register_location(child_location, child_location_info)
+        revisited_root_location = query_metadata_table.revisit_location(root_location)
+
+        fold_scope_location = FoldScopeLocation(root_location, (('out', 'Animal_ParentOf'),))
+        fold_scope_location_info = root_location_info._replace(
+            parent_location=root_location, is_within_fold=True)
+        query_metadata_table.register_location(fold_scope_location, fold_scope_location_info)
+
+        self.assertEqual({
+            ('Animal',): (root_location, revisited_root_location),
+            ('Animal', 'out_Animal_ParentOf'): (child_location,),
+        }, query_metadata_table.locations_by_query_path)
+        self.assertEqual(frozenset({fold_scope_location}), query_metadata_table.folded_locations)
+
+    def test_indexes_are_updated_after_changes(self):
+        query_metadata_table, root_location_info = self._make_query_metadata_table()
+        root_location = query_metadata_table.root_location
+        self.assertEqual(frozenset({root_location}),
+                         query_metadata_table.get_locations_of_type('Animal'))
+        self.assertEqual(frozenset(), query_metadata_table.optional_locations)
+
+        child_location = root_location.navigate_to_subpath('out_Animal_ParentOf')
+        child_location_info = root_location_info._replace(
+            parent_location=root_location, optional_scopes_depth=1)
+        query_metadata_table.register_location(child_location, child_location_info)
+        self.assertEqual(frozenset({child_location}), query_metadata_table.optional_locations)
+        self.assertEqual(frozenset({child_location}),
+                         query_metadata_table.get_locations_at_optional_scopes_depth(1))
+        self.assertEqual(frozenset({root_location, child_location}),
+                         query_metadata_table.get_locations_of_type('Animal'))
+
+        entity_type = self.schema.get_type('Entity')
+        query_metadata_table.record_coercion_at_location(child_location, entity_type)
+        self.assertEqual(frozenset({child_location}), query_metadata_table.coerced_locations)
+        self.assertIs(entity_type, query_metadata_table.location_types[child_location])
+        self.assertEqual(frozenset({root_location}),
+                         query_metadata_table.get_locations_of_type('Animal'))
+        self.assertEqual(frozenset({child_location}),
+                         query_metadata_table.get_locations_of_type('Entity'))
+        self.assertEqual(frozenset(), query_metadata_table.get_locations_of_type('Species'))
@@ -1,4 +1,5 @@
 # Copyright 2017-present Kensho Technologies, LLC.
+import array
 from datetime import date, datetime
 import unittest
 
@@ -8,8 +9,10 @@ import pytz
 import six
 
 from ..exceptions import GraphQLInvalidArgumentError
-from ..query_formatting.gremlin_formatting import _safe_gremlin_argument
-from ..query_formatting.match_formatting import _safe_match_argument
+from ..query_formatting.gremlin_formatting import (
+    _safe_gremlin_argument, get_gremlin_argument_serializer
+)
+from ..query_formatting.match_formatting import _safe_match_argument, get_match_argument_serializer
 from ..schema import GraphQLDate, GraphQLDateTime
 
 
@@ -35,6 +38,28 @@ REPRESENTATIVE_DATA_FOR_EACH_TYPE = {
 }
 
 
+class FakeNumpyArray(object):
+    """Minimal stand-in for a NumPy array, exposing the attributes used by the compiler."""
+
+    def __init__(self, values, ndim=1):
+        """Create a new array-like object with the given values and number of dimensions."""
+        self.values = values
+        self.ndim = ndim
+
+    def tolist(self):
+        """Return the values of the array as a Python list."""
+        return list(self.values)
+
+
+def _make_int_array_values(values):
+    """Return a list of non-list array objects containing the given int values."""
+    array_values = [array.array('l', values), FakeNumpyArray(values)]
+    if six.PY3:
+        # In Python 2, array.array objects do not support the buffer interface used by memoryview.
+        array_values.append(memoryview(array.array('l', values)))
+    return array_values
+
+
 class SafeMatchFormattingTests(unittest.TestCase):
     def test_safe_match_argument_for_strings(self):
         test_data = {
@@ -89,6 +114,48 @@ class SafeMatchFormattingTests(unittest.TestCase):
         with self.assertRaises(GraphQLInvalidArgumentError):
             _safe_match_argument(graphql_type, value)
 
+    def test_argument_serializer_is_reusable(self):
+        for graphql_type, value in six.iteritems(REPRESENTATIVE_DATA_FOR_EACH_TYPE):
+            serializer = get_match_argument_serializer(graphql_type)
+            expected_value = _safe_match_argument(graphql_type, value)
+            self.assertEqual(expected_value, serializer(value))
+            self.assertEqual(expected_value, serializer(value))
+
+        list_serializer = get_match_argument_serializer(GraphQLList(GraphQLInt))
+        self.assertEqual(u'[]', list_serializer([]))
+        self.assertEqual(u'[1,2,3]', list_serializer([1, 2, 3]))
+        for invalid_value in ([1, True], [1, '2'], (1, 2), 1):
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                list_serializer(invalid_value)
+
+    def test_array_list_arguments(self):
+        int_list_serializer = get_match_argument_serializer(GraphQLList(GraphQLInt))
+        for array_value in _make_int_array_values([1, -2, 3]):
+            self.assertEqual(u'[1,-2,3]', int_list_serializer(array_value))
+
+        for invalid_value in (FakeNumpyArray([[1], [2]], ndim=2), array.array('d', [1.0])):
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                int_list_serializer(invalid_value)
+
+        string_list_serializer = get_match_argument_serializer(GraphQLList(GraphQLString))
+        self.assertEqual(u'["a","b\\"c"]', string_list_serializer(FakeNumpyArray(['a', 'b"c'])))
+
+    def test_large_list_arguments_match_element_wise_representation(self):
+        test_data = {
+            GraphQLInt: list(range(-1000, 1000)),
+            GraphQLString: [u'item-{}: \u2603 "\\\n'.format(i) for i in range(1000)],
+            GraphQLID: [u'id-{}'.format(i) for i in range(1000)],
+        }
+        for inner_type, values in six.iteritems(test_data):
+            expected_value = u'[' + u','.join(
+                _safe_match_argument(inner_type, value) for value in values) + u']'
+            list_serializer = get_match_argument_serializer(GraphQLList(inner_type))
+            self.assertEqual(expected_value, list_serializer(values))
+
+        # Lists with values that require conversion are represented element by element.
+        id_list_serializer = get_match_argument_serializer(GraphQLList(GraphQLID))
+        self.assertEqual(u'["1","a","c"]', id_list_serializer([1, u'a', b'c']))
+
 
 class SafeGremlinFormattingTests(unittest.TestCase):
     def test_safe_gremlin_argument_for_strings(self):
@@ -145,3 +212,27 @@ class SafeGremlinFormattingTests(unittest.TestCase):
 
         expected_output = u'[[1,2,3],[4,5,6]]'
         self.assertEqual(expected_output, _safe_gremlin_argument(graphql_type, value))
+
+    def test_argument_serializer_is_reusable(self):
+        for graphql_type, value in six.iteritems(REPRESENTATIVE_DATA_FOR_EACH_TYPE):
+            serializer = get_gremlin_argument_serializer(graphql_type)
+            expected_value = _safe_gremlin_argument(graphql_type, value)
+            self.assertEqual(expected_value, serializer(value))
+            self.assertEqual(expected_value, serializer(value))
+
+        list_serializer = get_gremlin_argument_serializer(GraphQLList(GraphQLString))
+        self.assertEqual(u'[]', list_serializer([]))
+        self.assertEqual(u"['a','b']", list_serializer(['a', 'b']))
+        for invalid_value in (['a', 1], ('a', 'b'), 'a'):
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                list_serializer(invalid_value)
+
+    def test_array_list_arguments(self):
+        int_list_serializer = get_gremlin_argument_serializer(GraphQLList(GraphQLInt))
+        for array_value in _make_int_array_values([1, -2, 3]):
+            self.assertEqual(u'[1,-2,3]', int_list_serializer(array_value))
+
+        self.assertEqual(u'[]', int_list_serializer(FakeNumpyArray([])))
+        for invalid_value in ([1, False], FakeNumpyArray([[1], [2]], ndim=2)):
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                int_list_serializer(invalid_value)
@@ -111,3 +111,46 @@ type MyType {
     bar: Int
 }'''.replace('    ', '  ')  # 2 space indentation instead of 4 spaces
         self.assertIn(expected_type_definition, printed_schema)
+
+    def test_schema_fingerprint_is_deterministic(self):
+        first_schema = get_schema()
+        second_schema = get_schema()
+
+        first_fingerprint = schema.compute_schema_fingerprint(first_schema)
+        self.assertEqual(first_fingerprint, schema.compute_schema_fingerprint(first_schema))
+        self.assertEqual(first_fingerprint, schema.compute_schema_fingerprint(second_schema))
+
+    def test_schema_fingerprint_includes_type_equivalence_hints(self):
+        test_schema = get_schema()
+        type_equivalence_hints = {
+            test_schema.get_type('Event'):
+                test_schema.get_type('Union__BirthEvent__Event__FeedingEvent'),
+        }
+
+        fingerprint_without_hints = schema.compute_schema_fingerprint(test_schema)
+        fingerprint_with_hints = schema.compute_schema_fingerprint(
+            test_schema, type_equivalence_hints=type_equivalence_hints)
+        self.assertNotEqual(fingerprint_without_hints, fingerprint_with_hints)
+        self.assertEqual(fingerprint_with_hints, schema.compute_schema_fingerprint(
+            get_schema(), type_equivalence_hints=type_equivalence_hints))
+
+    def test_schema_fingerprint_changes_when_schema_changes(self):
+        def _make_schema(field_type):
+            """Return a schema whose only non-root type has a single field of the given type."""
+            graphql_type = GraphQLObjectType('MyType', OrderedDict((
+                ('foo', GraphQLField(field_type)),
+            )))
+            root_type = GraphQLObjectType('RootQuery', OrderedDict((
+                ('MyType', GraphQLField(graphql_type)),
+            )))
+            return GraphQLSchema(root_type, directives=schema.DIRECTIVES)
+
+        string_schema = _make_schema(GraphQLString)
+        int_schema = _make_schema(GraphQLInt)
+        self.assertNotEqual(schema.compute_schema_fingerprint(string_schema),
+                            schema.compute_schema_fingerprint(int_schema))
+
+        # Inserting meta fields mutates the schema, and therefore has to change its fingerprint.
+        original_fingerprint = schema.compute_schema_fingerprint(string_schema)
+        schema.insert_meta_fields_into_existing_schema(string_schema)
+        self.assertNotEqual(original_fingerprint, schema.compute_schema_fingerprint(string_schema))
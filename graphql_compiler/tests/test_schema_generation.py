@@ -12,6 +12,7 @@ from ..schema_generation.schema_properties import (
     ORIENTDB_BASE_EDGE_CLASS_NAME, ORIENTDB_BASE_VERTEX_CLASS_NAME, PROPERTY_TYPE_EMBEDDED_LIST_ID,
     PROPERTY_TYPE_EMBEDDED_SET_ID, PROPERTY_TYPE_LINK_ID, PROPERTY_TYPE_STRING_ID
 )
+from .benchmarks.synthetic_schema import generate_orientdb_schema_data
 
 
 BASE_VERTEX_SCHEMA_DATA = frozendict({
@@ -289,3 +290,18 @@ class GraphqlSchemaGenerationTests(unittest.TestCase):
         schema_graph = SchemaGraph(schema_data)
         person_subclass_set = schema_graph.get_subclass_set('Person')
         self.assertIsNone(schema.get_type(_get_union_type_name(person_subclass_set)))
+
+    def test_synthetic_schema_data(self):
+        schema_data = generate_orientdb_schema_data(
+            30, inheritance_depth=3, edges_per_class=2, properties_per_class=4)
+        schema_graph = SchemaGraph(schema_data)
+
+        # 10 vertex classes and 20 edge classes are generated, in addition to V and E.
+        self.assertEqual(32, len(schema_data))
+        self.assertEqual({'Vertex_0', 'Vertex_1', 'Vertex_2', ORIENTDB_BASE_VERTEX_CLASS_NAME},
+                         schema_graph.get_inheritance_set('Vertex_2'))
+        self.assertTrue(schema_graph.get_element_by_class_name('Vertex_0').abstract)
+        self.assertTrue(schema_graph.get_element_by_class_name('Edge_19').is_edge)
+
+        schema, _ = get_graphql_schema_from_orientdb_schema_data(schema_data)
+        self.assertIsNotNone(schema.get_type('Vertex_9'))
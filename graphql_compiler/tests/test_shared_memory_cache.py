@@ -0,0 +1,185 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..compiler import (
+    MATCH_LANGUAGE, SharedMemoryCompilationCache, compile_graphql_to_gremlin,
+    compile_graphql_to_match
+)
+from ..compiler.common import get_compilation_cache_key
+from .test_helpers import compare_compilation_results, get_schema
+
+
+QUERY = '''{
+    Animal @filter(op_name: "name_or_alias", value: ["$wanted"]) {
+        name @output(out_name: "animal_name")
+        out_Animal_ParentOf @fold {
+            uuid @output(out_name: "child_uuids")
+        }
+    }
+}'''
+
+
+def _get_numbered_query(number):
+    """Return a distinct query for each number, to fill the cache with."""
+    return '''{
+        Animal {
+            name @filter(op_name: "=", value: ["$wanted"]) @output(out_name: "animal_name_%d")
+        }
+    }''' % (number,)
+
+
+def _compile_in_child_process(path):
+    """Compile the test query to MATCH using the shared cache at the given path."""
+    schema = get_schema()
+    cache = SharedMemoryCompilationCache(path, schema)
+    compile_graphql_to_match(schema, QUERY, compilation_cache=cache)
+    cache.close()
+
+
+class SharedMemoryCompilationCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema and the path of the shared log in an empty directory."""
+        self.schema = get_schema()
+        self.cache_directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_directory, 'compilation_cache.log')
+
+    def tearDown(self):
+        """Remove the cache directory."""
+        shutil.rmtree(self.cache_directory)
+
+    def test_entries_are_shared_across_cache_instances(self):
+        expected_result = compile_graphql_to_match(self.schema, QUERY)
+        first_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        second_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+
+        # The second cache already mapped the log, and sees the entry appended to it afterward.
+        self.assertEqual(0, len(second_cache))
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=first_cache)
+        cached_result = compile_graphql_to_match(
+            self.schema, QUERY, compilation_cache=second_cache)
+
+        compare_compilation_results(self, expected_result, cached_result)
+        self.assertEqual(1, len(second_cache))
+        self.assertEqual(1, second_cache.stats.hits)
+        self.assertEqual(0, second_cache.stats.misses)
+
+    def test_entries_are_shared_with_forked_processes(self):
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+
+        child_process = multiprocessing.Process(
+            target=_compile_in_child_process, args=(self.cache_path,))
+        child_process.start()
+        child_process.join()
+        self.assertEqual(0, child_process.exitcode)
+
+        cached_result = compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        compare_compilation_results(
+            self, compile_graphql_to_match(self.schema, QUERY), cached_result)
+        self.assertEqual(1, cache.stats.hits)
+
+    def test_cache_key_includes_language(self):
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        gremlin_result = compile_graphql_to_gremlin(self.schema, QUERY, compilation_cache=cache)
+
+        self.assertEqual(2, len(cache))
+        compare_compilation_results(
+            self, compile_graphql_to_gremlin(self.schema, QUERY), gremlin_result)
+
+    def test_uncommitted_and_corrupt_records_are_ignored(self):
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=(
+            SharedMemoryCompilationCache(self.cache_path, self.schema)))
+        with open(self.cache_path, 'ab') as log_file:
+            # A partially written record that was never committed.
+            log_file.write(b'\xff' * 100)
+
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        self.assertEqual(1, cache.stats.hits)
+
+        # Flip the last byte of the committed record, which breaks its checksum.
+        with open(self.cache_path, 'r+b') as log_file:
+            log_contents = bytearray(log_file.read())
+            last_record_byte_index = len(log_contents) - 101
+            log_contents[last_record_byte_index] ^= 0xff
+            log_file.seek(0)
+            log_file.write(log_contents)
+
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compilation_result = compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        compare_compilation_results(
+            self, compile_graphql_to_match(self.schema, QUERY), compilation_result)
+        self.assertEqual(0, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+
+        # The recompiled query was appended over the uncommitted bytes, and supersedes the
+        # corrupt record.
+        new_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=new_cache)
+        self.assertEqual(1, new_cache.stats.hits)
+
+    def test_compaction(self):
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compile_graphql_to_match(self.schema, _get_numbered_query(0), compilation_cache=cache)
+        record_size = os.path.getsize(self.cache_path)
+
+        # Room for roughly ten records, so that compactions keep about five of them.
+        max_file_size = record_size * 10
+        cache = SharedMemoryCompilationCache(
+            self.cache_path, self.schema, max_file_size=max_file_size)
+        reader_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        self.assertEqual(1, len(reader_cache))
+
+        for number in range(30):
+            compile_graphql_to_match(
+                self.schema, _get_numbered_query(number), compilation_cache=cache)
+            self.assertLessEqual(os.path.getsize(self.cache_path), max_file_size)
+
+        self.assertGreater(cache.stats.evictions, 0)
+
+        # The reader maps the compacted log, which still holds the most recent entries.
+        self.assertLess(len(reader_cache), 10)
+        self.assertGreater(len(reader_cache), 0)
+        compile_graphql_to_match(
+            self.schema, _get_numbered_query(29), compilation_cache=reader_cache)
+        compile_graphql_to_match(
+            self.schema, _get_numbered_query(0), compilation_cache=reader_cache)
+        self.assertEqual(1, reader_cache.stats.hits)
+        self.assertEqual(1, reader_cache.stats.misses)
+
+    def test_compaction_drops_superseded_records(self):
+        first_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        second_cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=first_cache)
+        log_size = os.path.getsize(self.cache_path)
+
+        # Both caches compile the query before seeing the other's entry, so it is stored twice.
+        cache_key = get_compilation_cache_key(MATCH_LANGUAGE, self.schema, QUERY, None, None)
+        second_cache.put(cache_key, compile_graphql_to_match(self.schema, QUERY))
+        self.assertGreater(os.path.getsize(self.cache_path), log_size)
+
+        second_cache.compact()
+        self.assertEqual(log_size, os.path.getsize(self.cache_path))
+        self.assertEqual(0, second_cache.stats.evictions)
+        self.assertEqual(1, len(first_cache))
+
+    def test_clear(self):
+        cache = SharedMemoryCompilationCache(self.cache_path, self.schema)
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        compile_graphql_to_match(self.schema, QUERY, compilation_cache=cache)
+        self.assertEqual(2, cache.stats.misses)
+
+    def test_invalid_log_file(self):
+        with open(self.cache_path, 'wb') as log_file:
+            log_file.write(b'not a compilation cache log')
+
+        with self.assertRaises(AssertionError):
+            len(SharedMemoryCompilationCache(self.cache_path, self.schema))
@@ -0,0 +1,132 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import threading
+import unittest
+
+from .. import set_trusted_mode, trusted_mode
+from ..compiler import (
+    CompilationProfile, compile_graphql_to_gremlin, compile_graphql_to_match,
+    is_trusted_mode_enabled
+)
+from ..compiler.expressions import Literal, UnaryTransformation
+from ..compiler.instrumentation import LOWERING_PHASE, SANITY_CHECKS_PHASE
+from ..exceptions import GraphQLCompilationError
+from .test_helpers import compare_input_metadata, get_schema, get_test_input_queries
+
+
+class TrustedModeTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def tearDown(self):
+        """Make sure that no test leaves trusted mode enabled for the tests after it."""
+        set_trusted_mode(False)
+
+    def test_trusted_mode_is_off_by_default(self):
+        self.assertFalse(is_trusted_mode_enabled())
+
+    def test_trusted_mode_context_manager(self):
+        with trusted_mode():
+            self.assertTrue(is_trusted_mode_enabled())
+            with trusted_mode(False):
+                self.assertFalse(is_trusted_mode_enabled())
+            self.assertTrue(is_trusted_mode_enabled())
+        self.assertFalse(is_trusted_mode_enabled())
+
+        with self.assertRaises(ValueError):
+            with trusted_mode():
+                raise ValueError()
+        self.assertFalse(is_trusted_mode_enabled())
+
+        with self.assertRaises(TypeError):
+            set_trusted_mode(1)
+
+    def test_trusted_mode_is_per_thread(self):
+        graphql_string = '''{
+            Animal {
+                name @output(out_name: "animal_name")
+            }
+        }'''
+        thread_profile = CompilationProfile()
+        thread_trusted_mode_enabled = []
+
+        def compile_in_thread():
+            """Compile the query in another thread, recording whether trusted mode was on."""
+            thread_trusted_mode_enabled.append(is_trusted_mode_enabled())
+            compile_graphql_to_match(self.schema, graphql_string, instrumentation=thread_profile)
+
+        with trusted_mode():
+            thread = threading.Thread(target=compile_in_thread)
+            thread.start()
+            thread.join()
+            self.assertTrue(is_trusted_mode_enabled())
+
+        self.assertEqual([False], thread_trusted_mode_enabled)
+        self.assertIn(SANITY_CHECKS_PHASE, thread_profile.phase_times)
+
+    def test_trusted_mode_compiles_identical_queries(self):
+        for query_name, graphql_string, type_equivalence_hints in (
+                get_test_input_queries(self.schema)):
+            for compilation_func in (compile_graphql_to_match, compile_graphql_to_gremlin):
+                try:
+                    expected_result = compilation_func(
+                        self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+                except Exception as e:  # pylint: disable=broad-except
+                    # Some test queries use features that are not supported in Gremlin.
+                    with self.assertRaises(type(e)):
+                        with trusted_mode():
+                            compilation_func(self.schema, graphql_string,
+                                             type_equivalence_hints=type_equivalence_hints)
+                    continue
+
+                with trusted_mode():
+                    trusted_result = compilation_func(
+                        self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+                self.assertEqual(expected_result.query, trusted_result.query, msg=query_name)
+                self.assertEqual(expected_result.output_metadata, trusted_result.output_metadata,
+                                 msg=query_name)
+                compare_input_metadata(
+                    self, expected_result.input_metadata, trusted_result.input_metadata)
+
+    def test_trusted_mode_skips_sanity_checks(self):
+        graphql_string = '''{
+            Animal {
+                name @output(out_name: "animal_name")
+            }
+        }'''
+        for compilation_func in (compile_graphql_to_match, compile_graphql_to_gremlin):
+            profile = CompilationProfile()
+            compilation_func(self.schema, graphql_string, instrumentation=profile)
+            self.assertIn(SANITY_CHECKS_PHASE, profile.phase_times)
+
+            profile = CompilationProfile()
+            with trusted_mode():
+                compilation_func(self.schema, graphql_string, instrumentation=profile)
+            self.assertNotIn(SANITY_CHECKS_PHASE, profile.phase_times)
+            self.assertIn(LOWERING_PHASE, profile.phase_times)
+
+    def test_user_input_is_validated_in_trusted_mode(self):
+        invalid_queries = (
+            '''{
+                Animal {
+                    name @output(out_name: "illegal-output-name")
+                }
+            }''',
+            '''{
+                Animal {
+                    name @filter(op_name: "=", value: ["$illegal-variable-name"])
+                         @output(out_name: "animal_name")
+                }
+            }''',
+        )
+        with trusted_mode():
+            for graphql_string in invalid_queries:
+                for compilation_func in (compile_graphql_to_match, compile_graphql_to_gremlin):
+                    with self.assertRaises(GraphQLCompilationError):
+                        compilation_func(self.schema, graphql_string)
+
+            # Compiler entities still validate their arguments when constructed.
+            with self.assertRaises(GraphQLCompilationError):
+                Literal(u'illegal"literal')
+            with self.assertRaises(GraphQLCompilationError):
+                UnaryTransformation(u'unsupported_operator', Literal(u'value'))
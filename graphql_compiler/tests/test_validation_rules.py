@@ -0,0 +1,127 @@
+# Copyright 2019-present Kensho Technologies, LLC.
+import unittest
+
+from ..compiler import COMPILER_VALIDATION_RULES, DocumentCache, parse_and_validate_graphql
+from ..compiler.compiler_frontend import graphql_to_ir
+from ..exceptions import GraphQLCompilationError, GraphQLValidationError
+from .test_helpers import compare_ir_blocks, get_schema, get_test_input_queries
+
+
+QUERY = '''{
+    Animal {
+        name @output(out_name: "animal_name")
+    }
+}'''
+
+
+class CompilerValidationRulesTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize the test schema once for all tests."""
+        self.schema = get_schema()
+
+    def test_test_input_queries_produce_same_ir(self):
+        for _, graphql_string, type_equivalence_hints in get_test_input_queries(
+                self.schema):
+            expected_ir_and_metadata = graphql_to_ir(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints)
+            ir_and_metadata = graphql_to_ir(
+                self.schema, graphql_string, type_equivalence_hints=type_equivalence_hints,
+                validation_rules=COMPILER_VALIDATION_RULES)
+
+            compare_ir_blocks(self, expected_ir_and_metadata.ir_blocks, ir_and_metadata.ir_blocks)
+
+    def test_unsupported_definitions_are_rejected(self):
+        invalid_queries = (
+            # Multiple operations.
+            '''query First { Animal { name @output(out_name: "first") } }
+            query Second { Animal { name @output(out_name: "second") } }''',
+            # A named fragment and a spread of it.
+            '''{
+                Animal {
+                    ...AnimalName
+                }
+            }
+            fragment AnimalName on Animal {
+                name @output(out_name: "animal_name")
+            }''',
+            # A spread of an unknown fragment.
+            '''{
+                Animal {
+                    ...AnimalName
+                }
+            }''',
+            # A GraphQL variable.
+            '''query Animals($wanted: String) {
+                Animal {
+                    name @output(out_name: "animal_name")
+                }
+            }''',
+            # A field that does not exist.
+            '''{
+                Animal {
+                    nonexistent_field @output(out_name: "animal_name")
+                }
+            }''',
+            # A directive argument of the wrong type.
+            '''{
+                Animal {
+                    name @output(out_name: 1)
+                }
+            }''',
+        )
+        for invalid_query in invalid_queries:
+            with self.assertRaises(GraphQLValidationError):
+                graphql_to_ir(self.schema, invalid_query,
+                              validation_rules=COMPILER_VALIDATION_RULES)
+
+    def test_repeated_field_is_rejected(self):
+        repeated_field_query = '''{
+            Animal {
+                name @output(out_name: "name")
+                alias: name @output(out_name: "alias")
+            }
+        }'''
+        for validation_rules in (None, COMPILER_VALIDATION_RULES):
+            with self.assertRaises((GraphQLValidationError, GraphQLCompilationError)):
+                graphql_to_ir(self.schema, repeated_field_query, validation_rules=validation_rules)
+
+    def test_impossible_type_coercion_is_rejected(self):
+        # Animal_ParentOf edges only ever lead to Animal vertices, never to Location vertices.
+        impossible_coercion_query = '''{
+            Animal {
+                out_Animal_ParentOf {
+                    ... on Location {
+                        name @output(out_name: "location_name")
+                    }
+                }
+            }
+        }'''
+        for validation_rules in (None, COMPILER_VALIDATION_RULES):
+            with self.assertRaises(GraphQLValidationError):
+                graphql_to_ir(self.schema, impossible_coercion_query,
+                              validation_rules=validation_rules)
+
+    def test_conflicting_field_aliases_are_rejected(self):
+        # The alias "name" refers to two different fields, which cannot be merged.
+        conflicting_alias_query = '''{
+            Animal {
+                name @output(out_name: "animal_name")
+                name: uuid @output(out_name: "animal_uuid")
+            }
+        }'''
+        for validation_rules in (None, COMPILER_VALIDATION_RULES):
+            with self.assertRaises(GraphQLValidationError):
+                graphql_to_ir(self.schema, conflicting_alias_query,
+                              validation_rules=validation_rules)
+
+    def test_document_cache_key_includes_validation_rules(self):
+        document_cache = DocumentCache()
+
+        parse_and_validate_graphql(self.schema, QUERY, document_cache=document_cache)
+        parse_and_validate_graphql(self.schema, QUERY, document_cache=document_cache,
+                                   validation_rules=COMPILER_VALIDATION_RULES)
+        parse_and_validate_graphql(self.schema, QUERY, document_cache=document_cache,
+                                   validation_rules=list(COMPILER_VALIDATION_RULES))
+
+        self.assertEqual(2, document_cache.stats.misses)
+        self.assertEqual(1, document_cache.stats.hits)